@@ -0,0 +1,119 @@
+"""
+Compares one query per lookup with lookups batched by the DataLoader.
+
+Simulates concurrent requests that each look a user up by id after a cache
+miss, once with a session and query per lookup and once through the loader
+used with DB_BATCH_LOADS, against a SQLite file, and prints the lookups and
+queries per second for every concurrency level. Absolute numbers depend on
+the driver, the ratio of queries to lookups is what matters.
+
+Usage:
+    python -m bin.benchmark_batched_lookups --lookups 5000 --concurrency 1 10 100
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.auth.models.user import UserModel
+from src.auth.repositories import user as user_repository
+from src.auth.repositories.user import SELECT_USER_BY, UserRepository
+from src.config.database.engine import db_helper
+from src.libs.base_model import Base
+from src.libs.dataloader import DataLoader
+from src.libs.replicas import RoutingSession
+
+USERS = 1000
+
+
+async def seed(engine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(UserModel),
+            [
+                {
+                    "name": f"User {i}",
+                    "login": f"user{i}",
+                    "email": f"user{i}@example.com",
+                    "password": "x",
+                }
+                for i in range(1, USERS + 1)
+            ],
+        )
+
+
+async def measure(lookup, lookups: int, concurrency: int) -> float:
+    """Runs `lookups` lookups from `concurrency` tasks, returns the seconds taken."""
+
+    async def worker(count: int) -> None:
+        for _ in range(count):
+            await lookup(random.randint(1, USERS))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(lookups // concurrency) for _ in range(concurrency)))
+    return time.perf_counter() - started
+
+
+async def run(lookups: int, levels: list[int], window_ms: float) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+        await seed(engine)
+        factory = async_sessionmaker(
+            bind=engine, sync_session_class=RoutingSession, expire_on_commit=False
+        )
+        # the loader's batches open their sessions through db_helper
+        db_helper.session_factory = factory
+
+        queries = 0
+
+        def count(*args) -> None:
+            nonlocal queries
+            queries += 1
+
+        event.listen(engine.sync_engine, "before_cursor_execute", count)
+
+        async def query_per_lookup(pk: int):
+            async with factory() as session:
+                return await UserRepository(session)._fetch_one(
+                    SELECT_USER_BY["id"], value=pk
+                )
+
+        print(
+            f"{'concurrency':>11}{'mode':>10}{'lookups/s':>12}"
+            f"{'queries/s':>12}{'lookups/query':>15}"
+        )
+        for concurrency in levels:
+            loader = DataLoader(user_repository._load_users, window=window_ms / 1000)
+            for mode, lookup in (
+                ("single", query_per_lookup),
+                ("batched", loader.load),
+            ):
+                queries = 0
+                seconds = await measure(lookup, lookups, concurrency)
+                done = lookups // concurrency * concurrency
+                print(
+                    f"{concurrency:>11}{mode:>10}{done / seconds:>12.0f}"
+                    f"{queries / seconds:>12.0f}{done / queries:>15.1f}"
+                )
+
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lookups", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--window-ms", type=float, default=1.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.lookups, args.concurrency, args.window_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Measures the cost of building repository DTOs from database rows.
+
+Compares validated construction (`Model(**row)`), `model_construct` and
+the trusted path used by the repositories (`construct_trusted`), and plain
+dataclass entities with slotted ones. Prints CPU time per object from
+`timeit` and bytes allocated per object from `tracemalloc`.
+
+Usage:
+    python -m bin.benchmark_dto_hydration --number 100000
+"""
+
+import argparse
+import timeit
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from src.auth.dto import BaseUserDTO, SessionDTO
+from src.auth.entities import SessionEntity, UserEntity
+from src.libs.trusted import construct_trusted
+
+USER_ROW = {
+    "id": 42,
+    "name": "Benchmark User",
+    "login": "benchmark",
+    "email": "benchmark@example.com",
+    "password": "$argon2id$v=19$m=65536,t=3,p=4$c2FsdHNhbHQ$aGFzaGhhc2hoYXNo",
+}
+SESSION_ROW = {
+    "id": 7,
+    "user_id": 42,
+    "refresh_token_jti": "6f1c1b0e-3f5d-4d8a-9a57-2f8f0d3c1e4b",
+    "expires_at": datetime.now() + timedelta(days=30),
+    "created_at": datetime.now(),
+    "user_agent": "Mozilla/5.0",
+    "ip_address": "203.0.113.10",
+}
+
+
+@dataclass
+class DictUserEntity:
+    """`UserEntity` as it was before it was slotted."""
+
+    name: str
+    login: str
+    email: str
+    password: str | None = None
+    id: int | None = None
+
+
+def allocated_bytes(factory, number: int) -> float:
+    """Returns the bytes still allocated per object after building `number` of them."""
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    objects = [factory() for _ in range(number)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return (after - before) / number
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=100_000)
+    args = parser.parse_args()
+
+    entity_fields = dict(USER_ROW)
+    cases = (
+        ("user validated", lambda: BaseUserDTO(**USER_ROW)),
+        ("user model_construct", lambda: BaseUserDTO.model_construct(**USER_ROW)),
+        ("user trusted", lambda: construct_trusted(BaseUserDTO, dict(USER_ROW))),
+        ("session validated", lambda: SessionDTO(**SESSION_ROW)),
+        ("session model_construct", lambda: SessionDTO.model_construct(**SESSION_ROW)),
+        ("session trusted", lambda: construct_trusted(SessionDTO, dict(SESSION_ROW))),
+        ("entity dict", lambda: DictUserEntity(**entity_fields)),
+        ("entity slots", lambda: UserEntity(**entity_fields)),
+        (
+            "session entity slots",
+            lambda: SessionEntity(
+                user_id=42,
+                refresh_token_jti=SESSION_ROW["refresh_token_jti"],
+                expires_at=SESSION_ROW["expires_at"],
+                user_agent=SESSION_ROW["user_agent"],
+                ip_address=SESSION_ROW["ip_address"],
+            ),
+        ),
+    )
+
+    print(f"{'case':<26}{'us/object':>12}{'bytes/object':>14}")
+    for name, factory in cases:
+        seconds = min(timeit.repeat(factory, number=args.number, repeat=3))
+        per_object_us = seconds / args.number * 1_000_000
+        size = allocated_bytes(factory, min(args.number, 20_000))
+        print(f"{name:<26}{per_object_us:>12.2f}{size:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
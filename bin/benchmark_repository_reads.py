@@ -0,0 +1,136 @@
+"""
+Compares ORM and Core paths of the hot repository lookups.
+
+Runs the user-by-id, user-by-login and session-by-jti queries the way
+the repositories did with ORM entities and the way they do now with
+prebuilt Core statements, against an in-memory SQLite database, and prints
+the mean time per call. Absolute numbers depend on the driver, the
+relative overhead of the ORM layer is what matters.
+
+Usage:
+    python -m bin.benchmark_repository_reads --calls 5000
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.auth.models.session import UserSessionModel
+from src.auth.models.user import UserModel
+from src.auth.repositories.session import SELECT_SESSION_BY_JTI, SessionRepository
+from src.auth.repositories.user import SELECT_USER_BY, UserRepository
+from src.libs.base_model import Base
+
+USERS = 1000
+
+
+async def seed(session: AsyncSession) -> None:
+    await session.execute(
+        insert(UserModel),
+        [
+            {
+                "name": f"User {i}",
+                "login": f"user{i}",
+                "email": f"user{i}@example.com",
+                "password": "x",
+            }
+            for i in range(1, USERS + 1)
+        ],
+    )
+    expires_at = datetime.now() + timedelta(days=1)
+    await session.execute(
+        insert(UserSessionModel),
+        [
+            {"user_id": i, "refresh_token_jti": f"jti-{i}", "expires_at": expires_at}
+            for i in range(1, USERS + 1)
+        ],
+    )
+    await session.commit()
+
+
+async def orm_get(session: AsyncSession, i: int):
+    instance = await session.get(UserModel, i)
+    return UserRepository._get_dto(instance)
+
+
+async def orm_find(session: AsyncSession, i: int):
+    result = await session.execute(select(UserModel).filter_by(login=f"user{i}"))
+    return UserRepository._get_dto(result.scalar_one())
+
+
+async def orm_get_by_jti(session: AsyncSession, i: int):
+    result = await session.execute(
+        select(UserSessionModel).where(UserSessionModel.refresh_token_jti == f"jti-{i}")
+    )
+    return SessionRepository._get_dto(result.scalar_one())
+
+
+async def core_get(session: AsyncSession, i: int):
+    connection = await session.connection()
+    result = await connection.execute(SELECT_USER_BY["id"], {"value": i})
+    return UserRepository._get_dto(result.one())
+
+
+async def core_find(session: AsyncSession, i: int):
+    connection = await session.connection()
+    result = await connection.execute(SELECT_USER_BY["login"], {"value": f"user{i}"})
+    return UserRepository._get_dto(result.one())
+
+
+async def core_get_by_jti(session: AsyncSession, i: int):
+    connection = await session.connection()
+    result = await connection.execute(SELECT_SESSION_BY_JTI, {"jti": f"jti-{i}"})
+    return SessionRepository._get_dto(result.one())
+
+
+async def measure_us(session: AsyncSession, lookup, calls: int) -> float:
+    """Returns the mean latency of the lookup in microseconds."""
+    for i in range(1, 101):  # warm up the compiled statement cache
+        await lookup(session, i)
+        session.expunge_all()
+
+    started = time.perf_counter()
+    for n in range(calls):
+        await lookup(session, n % USERS + 1)
+        # requests start with an empty identity map
+        session.expunge_all()
+    return (time.perf_counter() - started) / calls * 1_000_000
+
+
+async def run(calls: int) -> None:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_factory = async_sessionmaker(
+        engine, expire_on_commit=False, autoflush=False
+    )
+    async with session_factory() as session:
+        await seed(session)
+
+        print(f"{'query':<16}{'orm us':>10}{'core us':>10}{'speedup':>10}")
+        for name, orm_lookup, core_lookup in (
+            ("user by id", orm_get, core_get),
+            ("user by login", orm_find, core_find),
+            ("session by jti", orm_get_by_jti, core_get_by_jti),
+        ):
+            orm_us = await measure_us(session, orm_lookup, calls)
+            core_us = await measure_us(session, core_lookup, calls)
+            print(f"{name:<16}{orm_us:>10.1f}{core_us:>10.1f}{orm_us / core_us:>9.2f}x")
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(run(args.calls))
+
+
+if __name__ == "__main__":
+    main()
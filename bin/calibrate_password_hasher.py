@@ -0,0 +1,121 @@
+"""
+Picks password hashing cost parameters for the current machine.
+
+Measures single-core verify latency for increasing costs and prints the
+strongest settings whose verify time stays under the target, ready to be
+pasted into `.env`.
+
+Usage:
+    python -m bin.calibrate_password_hasher --scheme argon2 --target-ms 50
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+from src.auth.service.hashers import Argon2Hasher, BcryptHasher, PasswordHasher
+
+SAMPLE_PASSWORD = "calibration-password"
+# OWASP minimum for argon2id
+ARGON2_MIN_MEMORY_COST = 19456
+
+
+def measure_verify_ms(hasher: PasswordHasher, samples: int) -> float:
+    """Returns the median verify latency of the hasher in milliseconds."""
+    hashed = hasher.hash(SAMPLE_PASSWORD)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        hasher.verify(SAMPLE_PASSWORD, hashed)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate_bcrypt(target_ms: float, samples: int) -> tuple[dict, float]:
+    best, best_ms = {"PASSWORD_BCRYPT_ROUNDS": 4}, 0.0
+    for rounds in range(4, 32):
+        elapsed = measure_verify_ms(BcryptHasher(rounds=rounds), samples)
+        print(f"  bcrypt rounds={rounds}: {elapsed:.1f} ms")
+        if elapsed > target_ms:
+            break
+        best, best_ms = {"PASSWORD_BCRYPT_ROUNDS": rounds}, elapsed
+    return best, best_ms
+
+
+def calibrate_argon2(
+    target_ms: float, samples: int, memory_cost: int, parallelism: int
+) -> tuple[dict, float]:
+    # shrink memory until a single iteration fits, then add iterations
+    while memory_cost > ARGON2_MIN_MEMORY_COST:
+        hasher = Argon2Hasher(
+            time_cost=1, memory_cost=memory_cost, parallelism=parallelism
+        )
+        if measure_verify_ms(hasher, samples) <= target_ms:
+            break
+        memory_cost = max(ARGON2_MIN_MEMORY_COST, memory_cost // 2)
+
+    best, best_ms = None, 0.0
+    for time_cost in range(1, 64):
+        hasher = Argon2Hasher(
+            time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism
+        )
+        elapsed = measure_verify_ms(hasher, samples)
+        print(
+            f"  argon2id m={memory_cost} t={time_cost} p={parallelism}: "
+            f"{elapsed:.1f} ms"
+        )
+        if elapsed > target_ms and best is not None:
+            break
+        best, best_ms = (
+            {
+                "PASSWORD_ARGON2_TIME_COST": time_cost,
+                "PASSWORD_ARGON2_MEMORY_COST": memory_cost,
+                "PASSWORD_ARGON2_PARALLELISM": parallelism,
+            },
+            elapsed,
+        )
+        if elapsed > target_ms:
+            break
+    return best, best_ms
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scheme", choices=["argon2", "bcrypt"], default="argon2")
+    parser.add_argument(
+        "--target-ms", type=float, default=50.0, help="max verify latency per core"
+    )
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--memory-cost", type=int, default=65536, help="argon2 KiB")
+    parser.add_argument(
+        "--parallelism",
+        type=int,
+        default=1,
+        help="argon2 lanes, 1 keeps one hash on one core",
+    )
+    args = parser.parse_args()
+
+    print(f"Calibrating {args.scheme} for {args.target_ms} ms per verify...")
+    if args.scheme == "bcrypt":
+        params, elapsed = calibrate_bcrypt(args.target_ms, args.samples)
+    else:
+        params, elapsed = calibrate_argon2(
+            args.target_ms, args.samples, args.memory_cost, args.parallelism
+        )
+
+    if elapsed > args.target_ms:
+        print(f"Warning: the cheapest safe setting takes {elapsed:.1f} ms")
+
+    cores = os.cpu_count() or 1
+    print(
+        f"\nExpected: {elapsed:.1f} ms per verify, "
+        f"~{cores * 1000 / elapsed:.0f} logins/s on {cores} cores\n"
+    )
+    print(f"PASSWORD_HASH_SCHEME={args.scheme}")
+    for key, value in params.items():
+        print(f"{key}={value}")
+
+
+if __name__ == "__main__":
+    main()
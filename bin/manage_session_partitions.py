@@ -0,0 +1,82 @@
+"""
+Creates and drops daily partitions of the user_sessions table.
+
+Run it from cron or a deploy hook when the session reaper is disabled, or
+to pre-create partitions further ahead than the reaper does. Partitions
+whose whole day lies before now only hold expired sessions and are dropped
+unless --keep-expired is given. With sharded users every shard is handled.
+
+Usage:
+    python -m bin.manage_session_partitions --ahead-days 40
+    python -m bin.manage_session_partitions --status
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.auth.service.session_reaper import session_partitions, session_reaper
+from src.config.database.engine import db_helper
+
+
+async def run(args: argparse.Namespace) -> None:
+    for shard, engine in enumerate(db_helper.shards.engines):
+        if len(db_helper.shards) > 1:
+            print(f"shard {shard}")
+        await manage(engine, args)
+
+    await db_helper.dispose()
+
+
+async def manage(engine: AsyncEngine, args: argparse.Namespace) -> None:
+    async with engine.connect() as connection:
+        if not await session_partitions.is_partitioned(connection):
+            raise SystemExit(
+                f"{session_partitions.table} is not partitioned, "
+                "run the migrations first"
+            )
+
+        if not args.status:
+            now = datetime.now()
+            horizon = (
+                timedelta(days=args.ahead_days)
+                if args.ahead_days is not None
+                else session_reaper.partition_horizon
+            )
+            for partition in await session_partitions.create_until(
+                connection, start=now, until=now + horizon
+            ):
+                print(f"created {partition.name}")
+            if not args.keep_expired:
+                for partition in await session_partitions.drop_before(
+                    connection, before=now
+                ):
+                    print(f"dropped {partition.name}")
+
+        for partition in await session_partitions.existing(connection):
+            print(
+                f"{partition.name}  [{partition.lower:%Y-%m-%d %H:%M}, "
+                f"{partition.upper:%Y-%m-%d %H:%M})"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--ahead-days",
+        type=int,
+        default=None,
+        help="days of partitions to create, defaults to the refresh token "
+        "lifetime plus SESSION_PARTITION_AHEAD_DAYS",
+    )
+    parser.add_argument(
+        "--keep-expired", action="store_true", help="do not drop partitions"
+    )
+    parser.add_argument("--status", action="store_true", help="only list partitions")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
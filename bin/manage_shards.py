@@ -0,0 +1,143 @@
+"""
+Sets up and inspects the databases users are sharded across.
+
+The main database is shard 0, DB_SHARD_URLS lists the others. Setting up
+a cluster runs the migrations on every shard, gives each shard's users_id_seq
+its stride (shard k hands out ids k+1, k+1+N, ...) and fills the user
+directory from the users already stored. Run it before the application
+starts with a new list of shards, existing users must already live on the
+shard their id maps to.
+
+Usage:
+    python -m bin.manage_shards --setup
+    python -m bin.manage_shards --rebuild-directory
+    python -m bin.manage_shards --status
+"""
+
+import argparse
+import asyncio
+from argparse import Namespace
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import delete, func, insert, select
+
+from src.auth.models.user import UserModel
+from src.auth.models.user_directory import UserDirectoryModel
+from src.config.database.engine import db_helper
+from src.config.database.settings import settings
+from src.libs.shards import configure_sequence
+
+# directory rows inserted per statement
+BATCH_SIZE = 1000
+
+
+def migrate() -> None:
+    for shard, url in enumerate([settings.database_url, *settings.db_shard_urls]):
+        print(f"shard {shard}: alembic upgrade head")
+        config = Config("alembic.ini")
+        config.cmd_opts = Namespace(x=[f"url={url}"])
+        command.upgrade(config, "head")
+
+
+async def configure_sequences() -> None:
+    router = db_helper.shards
+    for shard, engine in enumerate(router.engines):
+        async with engine.begin() as connection:
+            if connection.dialect.name != "postgresql":
+                dialect = connection.dialect.name
+                print(f"shard {shard}: {dialect} has no sequences, skipped")
+                continue
+            start = await configure_sequence(
+                connection, UserModel.__tablename__, shard, len(router)
+            )
+        print(
+            f"shard {shard}: users_id_seq increments by {len(router)}, next id {start}"
+        )
+
+
+async def rebuild_directory() -> None:
+    router = db_helper.shards
+    for engine in router.engines:
+        async with engine.begin() as connection:
+            await connection.execute(delete(UserDirectoryModel))
+
+    for shard, engine in enumerate(router.engines):
+        entries: dict[int, list[dict]] = {target: [] for target in router.shards()}
+        async with engine.connect() as connection:
+            result = await connection.stream(
+                select(UserModel.id, UserModel.login, UserModel.email)
+            )
+            async for user in result:
+                for kind in ("login", "email"):
+                    value = getattr(user, kind)
+                    entries[router.shard_for_key(value)].append(
+                        {"kind": kind, "value": value, "user_id": user.id}
+                    )
+        for target, rows in entries.items():
+            async with router.engines[target].begin() as connection:
+                for i in range(0, len(rows), BATCH_SIZE):
+                    await connection.execute(
+                        insert(UserDirectoryModel), rows[i : i + BATCH_SIZE]
+                    )
+        added = sum(map(len, entries.values())) // 2
+        print(f"shard {shard}: {added} users added to the directory")
+
+
+async def status() -> None:
+    router = db_helper.shards
+    for shard, engine in enumerate(router.engines):
+        async with engine.connect() as connection:
+            users = await connection.scalar(select(func.count()).select_from(UserModel))
+            # users whose id maps to another shard are unreachable by id
+            misplaced = await connection.scalar(
+                select(func.count())
+                .select_from(UserModel)
+                .where((UserModel.id - 1) % len(router) != shard)
+            )
+            entries = await connection.scalar(
+                select(func.count()).select_from(UserDirectoryModel)
+            )
+        print(
+            f"shard {shard}: {users} users ({misplaced} misplaced), "
+            f"{entries} directory entries"
+        )
+
+
+async def run(args: argparse.Namespace) -> None:
+    if args.setup or args.sequences:
+        await configure_sequences()
+    if args.setup or args.rebuild_directory:
+        await rebuild_directory()
+    await status()
+    await db_helper.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--setup",
+        action="store_true",
+        help="migrate, configure sequences and rebuild the directory",
+    )
+    parser.add_argument(
+        "--migrate", action="store_true", help="run the migrations on every shard"
+    )
+    parser.add_argument(
+        "--sequences", action="store_true", help="configure the id sequences"
+    )
+    parser.add_argument(
+        "--rebuild-directory", action="store_true", help="refill the user directory"
+    )
+    parser.add_argument(
+        "--status", action="store_true", help="only print users per shard"
+    )
+    args = parser.parse_args()
+    if args.setup or args.migrate:
+        # alembic runs its own event loop
+        migrate()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Prints the on-disk size of the session tables and their indexes.
+
+PostgreSQL only. Partitions of user_sessions are summed into the parent.
+Run it before and after a migration that changes the row layout, e.g.
+
+    python -m bin.measure_session_table_size
+    alembic upgrade head
+    python -m bin.measure_session_table_size
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import text
+
+from src.config.database.engine import db_helper
+
+TABLES = ("user_sessions", "user_agents")
+
+SIZE_QUERY = """
+    SELECT
+        coalesce(sum(pg_table_size(t.relid)), 0) AS heap,
+        coalesce(sum(pg_indexes_size(t.relid)), 0) AS indexes,
+        (SELECT count(*) FROM {table}) AS row_count
+    FROM pg_partition_tree(CAST(:table AS regclass)) t
+"""
+
+
+def _format(size: int) -> str:
+    for unit in ("B", "kB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+async def run() -> None:
+    async with db_helper.engine.connect() as connection:
+        print(
+            f"{'table':<16}{'rows':>12}{'heap':>12}{'indexes':>12}{'total':>12}{'bytes/row':>12}"
+        )
+        for table in TABLES:
+            exists = await connection.scalar(
+                text("SELECT CAST(to_regclass(:table) AS text)"), {"table": table}
+            )
+            if exists is None:
+                print(f"{table:<16}{'missing':>12}")
+                continue
+            quoted = connection.dialect.identifier_preparer.quote(table)
+            result = await connection.execute(
+                text(SIZE_QUERY.format(table=quoted)), {"table": table}
+            )
+            row = result.one()
+            total = row.heap + row.indexes
+            per_row = total / row.row_count if row.row_count else 0
+            print(
+                f"{table:<16}{row.row_count:>12}{_format(row.heap):>12}"
+                f"{_format(row.indexes):>12}{_format(total):>12}{per_row:>12.1f}"
+            )
+
+    await db_helper.engine.dispose()
+
+
+def main() -> None:
+    argparse.ArgumentParser(description=__doc__.splitlines()[1]).parse_args()
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Signs a request for the sampling profiler.
+
+Prints the X-Profile header value that makes the application profile one
+request outside of APP_DEBUG. The key must be listed in PROFILER_KEYS of
+the running application, the signature covers the method and path and
+expires after --ttl seconds. The response's X-Profile header names the
+folded stacks written to PROFILER_DIR, render them with flamegraph.pl or
+speedscope.
+
+Usage:
+    TOKEN=$(python -m bin.sign_profile_request --key $KEY POST /v1/auth/login)
+    curl -H "X-Profile: $TOKEN" ...
+"""
+
+import argparse
+import time
+
+from src.libs.profiler import sign
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("method")
+    parser.add_argument("path", help="request path without the query string")
+    parser.add_argument("--key", required=True, help="one of PROFILER_KEYS")
+    parser.add_argument(
+        "--ttl", type=int, default=300, help="seconds the signature is valid"
+    )
+    args = parser.parse_args()
+    print(sign(args.key, args.method, args.path, int(time.time()) + args.ttl))
+
+
+if __name__ == "__main__":
+    main()
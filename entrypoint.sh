@@ -13,4 +13,9 @@ else
   echo "Skipping Alembic migrations due to DB_RUN_AUTO_MIGRATE flag."
 fi
 
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+  # files of the previous run would be added to the new workers' metrics
+  rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
 uvicorn src.app:app --host "$APP_HOST" --port "$APP_PORT" --log-level "debug" --reload --use-colors
@@ -1,4 +1,5 @@
 import asyncio
+import re
 from logging.config import fileConfig
 
 from sqlalchemy import pool
@@ -18,7 +19,11 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
-config.set_main_option("sqlalchemy.url", database_settings.database_url)
+# `alembic -x url=...` migrates another database, e.g. a shard
+config.set_main_option(
+    "sqlalchemy.url",
+    context.get_x_argument(as_dictionary=True).get("url", database_settings.database_url),
+)
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
@@ -34,6 +39,17 @@ target_metadata = Base.metadata
 # ... etc.
 
 
+# daily and default partitions of user_sessions are managed at runtime,
+# see src/libs/partitions.py, autogenerate must not drop them
+PARTITION_NAME = re.compile(r"^user_sessions_(p\d{8}|default)$")
+
+
+def include_name(name, type_, parent_names) -> bool:
+    if type_ == "table":
+        return not PARTITION_NAME.match(name)
+    return not PARTITION_NAME.match(parent_names.get("table_name") or "")
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -50,6 +66,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -59,7 +76,9 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection, target_metadata=target_metadata, include_name=include_name
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -1,2 +1,4 @@
 from src.auth.models.user import *
 from src.auth.models.session import *
+from src.auth.models.user_agent import *
+from src.auth.models.user_directory import *
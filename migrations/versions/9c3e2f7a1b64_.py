@@ -0,0 +1,28 @@
+"""index user_sessions.expires_at for the session reaper
+
+Revision ID: 9c3e2f7a1b64
+Revises: 474c10cb1c44
+Create Date: 2026-10-16 10:12:41.530112
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3e2f7a1b64'
+down_revision: Union[str, Sequence[str], None] = '474c10cb1c44'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_user_sessions_expires_at'), 'user_sessions', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_user_sessions_expires_at'), table_name='user_sessions')
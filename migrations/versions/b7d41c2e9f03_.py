@@ -0,0 +1,141 @@
+"""partition user_sessions by expires_at
+
+Revision ID: b7d41c2e9f03
+Revises: 9c3e2f7a1b64
+Create Date: 2026-10-16 14:03:27.118904
+
+PostgreSQL only, other dialects keep the plain table. The table becomes
+`PARTITION BY RANGE (expires_at)` with daily partitions named
+`user_sessions_pYYYYMMDD` (see src/libs/partitions.py), created for the
+default refresh token lifetime plus SESSION_PARTITION_AHEAD_DAYS (frozen
+below, the session reaper extends them with the configured values), and a
+DEFAULT partition `user_sessions_default` catching rows
+beyond them until the reaper or `python -m bin.manage_session_partitions`
+creates their partition. Unexpired sessions are copied over, expired ones
+are dropped with the old table.
+
+A partitioned table's unique constraints must contain the partition key,
+so the primary key becomes (id, expires_at) and refresh_token_jti is only
+unique together with expires_at (uq_user_sessions_refresh_token_jti_expires_at). jtis are random UUIDs, and lookups by jti
+use a plain index on every partition.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d41c2e9f03'
+down_revision: Union[str, Sequence[str], None] = '9c3e2f7a1b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "id, user_id, refresh_token_jti, expires_at, created_at, user_agent, ip_address, updated_at"
+# REFRESH_TOKEN_LIFETIME_SECONDS and SESSION_PARTITION_AHEAD_DAYS defaults
+REFRESH_TOKEN_LIFETIME = timedelta(seconds=86400)
+PARTITION_AHEAD = timedelta(days=2)
+HORIZON = REFRESH_TOKEN_LIFETIME + PARTITION_AHEAD
+
+
+def _partition_days(today: date, latest: Optional[datetime]) -> list[date]:
+    last_day = (datetime.combine(today, time.min) + HORIZON).date()
+    if latest is not None:
+        last_day = max(last_day, latest.date())
+    return [today + timedelta(days=i) for i in range((last_day - today).days + 1)]
+
+
+def _create_partition(day: date) -> None:
+    lower = datetime.combine(day, time.min)
+    upper = lower + timedelta(days=1)
+    op.execute(
+        f"CREATE TABLE user_sessions_p{day:%Y%m%d} PARTITION OF user_sessions "
+        f"FOR VALUES FROM ('{lower.isoformat(' ')}') TO ('{upper.isoformat(' ')}')"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("ALTER TABLE user_sessions RENAME TO user_sessions_unpartitioned")
+    op.execute("ALTER TABLE user_sessions_unpartitioned RENAME CONSTRAINT user_sessions_pkey TO user_sessions_unpartitioned_pkey")
+    for index in ("ix_user_sessions_refresh_token_jti", "ix_user_sessions_user_id", "ix_user_sessions_expires_at"):
+        op.execute(f"ALTER INDEX {index} RENAME TO {index}_unpartitioned")
+    # keep the id sequence alive when the old table is dropped
+    op.execute("ALTER SEQUENCE user_sessions_id_seq OWNED BY NONE")
+
+    op.execute(
+        """
+        CREATE TABLE user_sessions (
+            id INTEGER NOT NULL DEFAULT nextval('user_sessions_id_seq'),
+            user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            refresh_token_jti VARCHAR(36) NOT NULL,
+            expires_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            user_agent VARCHAR(255),
+            ip_address VARCHAR(45),
+            updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            CONSTRAINT user_sessions_pkey PRIMARY KEY (id, expires_at)
+        ) PARTITION BY RANGE (expires_at)
+        """
+    )
+    op.create_index(op.f('ix_user_sessions_refresh_token_jti'), 'user_sessions', ['refresh_token_jti'], unique=False)
+    op.create_unique_constraint('uq_user_sessions_refresh_token_jti_expires_at', 'user_sessions', ['refresh_token_jti', 'expires_at'])
+    op.create_index(op.f('ix_user_sessions_user_id'), 'user_sessions', ['user_id'], unique=False)
+    op.create_index(op.f('ix_user_sessions_expires_at'), 'user_sessions', ['expires_at'], unique=False)
+
+    today = datetime.now().date()
+    latest = bind.execute(sa.text("SELECT max(expires_at) FROM user_sessions_unpartitioned")).scalar()
+    for day in _partition_days(today, latest):
+        _create_partition(day)
+    op.execute("CREATE TABLE user_sessions_default PARTITION OF user_sessions DEFAULT")
+
+    op.execute(
+        f"INSERT INTO user_sessions ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM user_sessions_unpartitioned "
+        f"WHERE expires_at >= '{datetime.combine(today, time.min).isoformat(' ')}'"
+    )
+    op.execute("DROP TABLE user_sessions_unpartitioned")
+    op.execute("ALTER SEQUENCE user_sessions_id_seq OWNED BY user_sessions.id")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("ALTER TABLE user_sessions RENAME TO user_sessions_partitioned")
+    op.execute("ALTER TABLE user_sessions_partitioned RENAME CONSTRAINT user_sessions_pkey TO user_sessions_partitioned_pkey")
+    for index in ("ix_user_sessions_refresh_token_jti", "ix_user_sessions_user_id", "ix_user_sessions_expires_at", "uq_user_sessions_refresh_token_jti_expires_at"):
+        op.execute(f"ALTER INDEX {index} RENAME TO {index}_partitioned")
+    op.execute("ALTER SEQUENCE user_sessions_id_seq OWNED BY NONE")
+
+    op.execute(
+        """
+        CREATE TABLE user_sessions (
+            id INTEGER NOT NULL DEFAULT nextval('user_sessions_id_seq'),
+            user_id INTEGER NOT NULL,
+            refresh_token_jti VARCHAR(36) NOT NULL,
+            expires_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            user_agent VARCHAR(255),
+            ip_address VARCHAR(45),
+            updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            CONSTRAINT user_sessions_pkey PRIMARY KEY (id),
+            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+        )
+        """
+    )
+    op.execute(f"INSERT INTO user_sessions ({COLUMNS}) SELECT {COLUMNS} FROM user_sessions_partitioned")
+    op.execute("DROP TABLE user_sessions_partitioned")
+    op.execute("ALTER SEQUENCE user_sessions_id_seq OWNED BY user_sessions.id")
+
+    op.create_index(op.f('ix_user_sessions_refresh_token_jti'), 'user_sessions', ['refresh_token_jti'], unique=True)
+    op.create_index(op.f('ix_user_sessions_user_id'), 'user_sessions', ['user_id'], unique=False)
+    op.create_index(op.f('ix_user_sessions_expires_at'), 'user_sessions', ['expires_at'], unique=False)
@@ -0,0 +1,101 @@
+"""compact user_sessions: uuid jti, inet ip, user_agents lookup table
+
+Revision ID: d2a8f5c61e7b
+Revises: b7d41c2e9f03
+Create Date: 2026-10-16 17:41:09.402551
+
+On PostgreSQL refresh_token_jti becomes a native UUID (16 bytes instead of
+37) and ip_address an INET (7 bytes for IPv4 instead of up to 46). Addresses
+that do not parse are set to NULL. Other dialects keep the string columns,
+the jti is stored as 32 hex chars there like SQLAlchemy's Uuid type does.
+
+user_agent strings move to the user_agents table and sessions reference
+them by id.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a8f5c61e7b'
+down_revision: Union[str, Sequence[str], None] = 'b7d41c2e9f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+
+    op.create_table('user_agents',
+    sa.Column('value', sa.String(length=255), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id')
+    )
+    op.create_index(op.f('ix_user_agents_value'), 'user_agents', ['value'], unique=True)
+    op.execute(
+        "INSERT INTO user_agents (value) "
+        "SELECT DISTINCT user_agent FROM user_sessions WHERE user_agent IS NOT NULL"
+    )
+
+    with op.batch_alter_table('user_sessions') as batch_op:
+        batch_op.add_column(sa.Column('user_agent_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('user_sessions_user_agent_id_fkey', 'user_agents', ['user_agent_id'], ['id'])
+    op.execute(
+        "UPDATE user_sessions SET user_agent_id = "
+        "(SELECT id FROM user_agents WHERE user_agents.value = user_sessions.user_agent)"
+    )
+    with op.batch_alter_table('user_sessions') as batch_op:
+        batch_op.drop_column('user_agent')
+
+    if bind.dialect.name == "postgresql":
+        op.execute("ALTER TABLE user_sessions ALTER COLUMN refresh_token_jti TYPE uuid USING refresh_token_jti::uuid")
+        op.execute(
+            """
+            CREATE FUNCTION pg_temp.try_inet(value text) RETURNS inet AS $$
+            BEGIN
+                RETURN value::inet;
+            EXCEPTION WHEN invalid_text_representation THEN
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql IMMUTABLE
+            """
+        )
+        op.execute("ALTER TABLE user_sessions ALTER COLUMN ip_address TYPE inet USING pg_temp.try_inet(ip_address)")
+    else:
+        op.execute("UPDATE user_sessions SET refresh_token_jti = replace(refresh_token_jti, '-', '')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+
+    if bind.dialect.name == "postgresql":
+        op.execute("ALTER TABLE user_sessions ALTER COLUMN ip_address TYPE varchar(45) USING host(ip_address)")
+        op.execute("ALTER TABLE user_sessions ALTER COLUMN refresh_token_jti TYPE varchar(36) USING refresh_token_jti::text")
+    else:
+        op.execute(
+            "UPDATE user_sessions SET refresh_token_jti = "
+            "substr(refresh_token_jti, 1, 8) || '-' || substr(refresh_token_jti, 9, 4) || '-' || "
+            "substr(refresh_token_jti, 13, 4) || '-' || substr(refresh_token_jti, 17, 4) || '-' || "
+            "substr(refresh_token_jti, 21) "
+            "WHERE length(refresh_token_jti) = 32"
+        )
+
+    with op.batch_alter_table('user_sessions') as batch_op:
+        batch_op.add_column(sa.Column('user_agent', sa.String(length=255), nullable=True))
+    op.execute(
+        "UPDATE user_sessions SET user_agent = "
+        "(SELECT value FROM user_agents WHERE user_agents.id = user_sessions.user_agent_id)"
+    )
+    with op.batch_alter_table('user_sessions') as batch_op:
+        batch_op.drop_constraint('user_sessions_user_agent_id_fkey', type_='foreignkey')
+        batch_op.drop_column('user_agent_id')
+
+    op.drop_index(op.f('ix_user_agents_value'), table_name='user_agents')
+    op.drop_table('user_agents')
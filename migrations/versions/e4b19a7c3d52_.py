@@ -0,0 +1,42 @@
+"""user_directory for sharded users
+
+Revision ID: e4b19a7c3d52
+Revises: d2a8f5c61e7b
+Create Date: 2026-10-16 20:26:53.771340
+
+Created on every database, it stays empty until users are sharded. Fill it
+with `python -m bin.manage_shards --rebuild-directory`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b19a7c3d52'
+down_revision: Union[str, Sequence[str], None] = 'd2a8f5c61e7b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_directory',
+    sa.Column('kind', sa.String(length=16), nullable=False),
+    sa.Column('value', sa.String(length=50), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id'),
+    sa.UniqueConstraint('kind', 'value', name='uq_user_directory_kind_value')
+    )
+    op.create_index(op.f('ix_user_directory_user_id'), 'user_directory', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_user_directory_user_id'), table_name='user_directory')
+    op.drop_table('user_directory')
@@ -6,6 +6,7 @@ from fastapi import FastAPI
 from src.config.project import settings as main_settings
 from src.config.swagger import settings as swagger_settings
 from src.config.logging import settings as logging_settings, logger_config
+from src.config.metrics import settings as metrics_settings
 
 from src.lifespan import lifespan
 
@@ -14,6 +15,7 @@ from src.middleware import init_middleware
 from src.exception_handlers import exception_handlers
 
 from src.routes import router
+from src.metrics import router as metrics_router
 
 
 def get_app() -> FastAPI:
@@ -42,6 +44,8 @@ def get_app() -> FastAPI:
     init_middleware(app)
 
     app.include_router(router)
+    if metrics_settings.enabled:
+        app.include_router(metrics_router)
 
     return app
 
@@ -0,0 +1,55 @@
+import dataclasses
+from typing import Optional
+
+from src.auth.dto import SessionDTO
+from src.config.cache.backend import cache
+from src.config.cache.settings import settings as cache_settings
+from src.libs.cache.base import Cache
+from src.libs.lru import CacheStats
+
+
+class SessionCache:
+    """
+    Read-through cache of sessions keyed by refresh token jti.
+
+    The repository invalidates entries whenever a jti is rotated or a
+    session is revoked. A `ttl` of 0 disables the cache.
+    """
+
+    def __init__(self, cache: Cache, ttl: float) -> None:
+        self.cache = cache
+        self.ttl = ttl
+        self._hits = 0
+        self._misses = 0
+
+    async def get(self, jti: str) -> Optional[SessionDTO]:
+        if not self.ttl:
+            return None
+        raw = await self.cache.get(jti)
+        if raw is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        return SessionDTO.model_validate_json(raw)
+
+    async def set(self, session: SessionDTO) -> None:
+        if not self.ttl:
+            return
+        await self.cache.set(
+            session.refresh_token_jti, session.model_dump_json().encode(), ttl=self.ttl
+        )
+
+    async def invalidate(self, *jtis: str) -> None:
+        await self.cache.delete(*jtis)
+
+    def stats(self) -> CacheStats:
+        """Hit and miss counts of this process, see UserCache.stats."""
+        backend_stats = getattr(self.cache.backend, "stats", None)
+        base = backend_stats() if backend_stats else CacheStats(0, 0, 0, 0, 0, 0)
+        return dataclasses.replace(base, hits=self._hits, misses=self._misses)
+
+
+session_cache = SessionCache(
+    cache=cache.namespace("session"),
+    ttl=cache_settings.session_cache_ttl_seconds,
+)
@@ -0,0 +1,194 @@
+import asyncio
+import dataclasses
+import json
+from typing import Literal, Mapping, Optional, Sequence, Union
+
+from src.auth.dto import BaseUserDTO
+from src.config.cache.backend import cache
+from src.config.cache.settings import settings as cache_settings
+from src.libs.cache.base import Cache
+from src.libs.lru import CacheStats
+from src.libs.trusted import construct_trusted
+from src.metrics import cache_metrics
+
+LookupField = Literal["id", "login", "email"]
+
+# value stored for lookups that found no user
+NOT_FOUND = b"\x00"
+
+
+class UserCache:
+    """
+    Read-through cache of users, addressable by id, login and email.
+
+    Users are stored once under their id, logins and emails are aliases
+    pointing to the id. An alias is only trusted if the user it points to
+    still has that login/email, so aliases left over after a rename heal
+    themselves. Lookups that found nothing are cached for `negative_ttl`.
+
+    Only the public `UserDTO` fields are stored, users read from the cache
+    have no password: credential checks must read the database.
+
+    The repository invalidates entries on every write. With a shared backend
+    (redis) this is visible to all workers, with the in-memory backend other
+    workers see changes after at most `ttl` seconds.
+    """
+
+    def __init__(self, cache: Cache, ttl: float, negative_ttl: float) -> None:
+        self.cache = cache
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._hits = 0
+        self._misses = 0
+
+    async def _get_by_id(self, pk: int) -> Optional[bytes]:
+        return await self.cache.get(f"id:{pk}")
+
+    @staticmethod
+    def _decode(raw: bytes) -> BaseUserDTO:
+        # written by `store_many` from validated users, only the public
+        # fields are read: older entries may still hold a password
+        data = json.loads(raw)
+        return construct_trusted(
+            BaseUserDTO,
+            {
+                "id": data["id"],
+                "name": data["name"],
+                "login": data["login"],
+                "email": data["email"],
+                "password": None,
+            },
+        )
+
+    async def lookup(
+        self, field: LookupField, value: Union[int, str]
+    ) -> tuple[bool, Optional[BaseUserDTO]]:
+        """
+        Looks a user up in the cache.
+
+        Returns:
+            tuple[bool, Optional[BaseUserDTO]]: Whether the cache had an answer,
+                and the user without password, None for a cached "not found".
+        """
+        raw = await self.cache.get(f"{field}:{value}")
+
+        if raw == NOT_FOUND:
+            self._hits += 1
+            return True, None
+
+        if raw is not None and field != "id":
+            raw = await self._get_by_id(int(raw))
+
+        user = self._decode(raw) if raw and raw != NOT_FOUND else None
+        if user is None or str(getattr(user, field)) != str(value):
+            self._misses += 1
+            return False, None
+
+        self._hits += 1
+        return True, user
+
+    async def lookup_many(
+        self, field: LookupField, values: Sequence[Union[int, str]]
+    ) -> dict[Union[int, str], Optional[BaseUserDTO]]:
+        """
+        Looks many users up with at most two `mget` calls.
+
+        Returns:
+            dict: The values the cache had an answer for, mapped to the user,
+                None for a cached "not found". Other values are left out.
+        """
+        raws = await self.cache.mget([f"{field}:{value}" for value in values])
+        if field != "id":
+            # aliases hold the user id, resolve them in one more round trip
+            aliased = [raw for raw in raws if raw is not None and raw != NOT_FOUND]
+            users = await self.cache.mget([f"id:{int(raw)}" for raw in aliased])
+            by_id = dict(zip(aliased, users))
+            raws = [by_id.get(raw, raw) if raw != NOT_FOUND else raw for raw in raws]
+
+        answered = {}
+        for value, raw in zip(values, raws):
+            if raw == NOT_FOUND:
+                answered[value] = None
+                continue
+            user = self._decode(raw) if raw else None
+            if user is not None and str(getattr(user, field)) == str(value):
+                answered[value] = user
+        self._hits += len(answered)
+        self._misses += len(values) - len(answered)
+        return answered
+
+    async def store(
+        self, field: LookupField, value: Union[int, str], user: Optional[BaseUserDTO]
+    ) -> None:
+        """Stores the result of a repository lookup, without the password."""
+        await self.store_many(field, {value: user})
+
+    async def store_many(
+        self,
+        field: LookupField,
+        results: Mapping[Union[int, str], Optional[BaseUserDTO]],
+    ) -> None:
+        """
+        Stores the results of many repository lookups with one `set_many`
+        per ttl, so at most two round trips.
+
+        Args:
+            field: The field that was looked up.
+            results: The looked up values mapped to the user found, or None.
+        """
+        found: dict[str, bytes] = {}
+        not_found: dict[str, bytes] = {}
+        for value, user in results.items():
+            if user is None:
+                not_found[f"{field}:{value}"] = NOT_FOUND
+                continue
+            user_id = str(user.id).encode()
+            public = {
+                "id": user.id,
+                "name": user.name,
+                "login": user.login,
+                "email": str(user.email),
+            }
+            found[f"id:{user.id}"] = json.dumps(public).encode()
+            found[f"login:{user.login}"] = user_id
+            found[f"email:{user.email}"] = user_id
+
+        if not self.negative_ttl:
+            not_found = {}
+        await asyncio.gather(
+            self.cache.set_many(found, ttl=self.ttl),
+            self.cache.set_many(not_found, ttl=self.negative_ttl),
+        )
+
+    async def invalidate(
+        self,
+        pk: Optional[int] = None,
+        login: Optional[str] = None,
+        email: Optional[str] = None,
+    ) -> None:
+        """Drops everything cached for a user, including negative lookups."""
+        keys = [
+            f"{field}:{value}"
+            for field, value in (("id", pk), ("login", login), ("email", email))
+            if value is not None
+        ]
+        await self.cache.delete(*keys)
+
+    def stats(self) -> CacheStats:
+        """
+        Hit and miss counts of this process.
+
+        Size and eviction counts come from the in-memory backend and cover all
+        namespaces, they are zero for remote backends.
+        """
+        backend_stats = getattr(self.cache.backend, "stats", None)
+        base = backend_stats() if backend_stats else CacheStats(0, 0, 0, 0, 0, 0)
+        return dataclasses.replace(base, hits=self._hits, misses=self._misses)
+
+
+user_cache = UserCache(
+    cache=cache.namespace("user"),
+    ttl=cache_settings.user_cache_ttl_seconds,
+    negative_ttl=cache_settings.user_cache_negative_ttl_seconds,
+)
+cache_metrics.add("user", user_cache.stats)
@@ -0,0 +1,11 @@
+from typing import Optional
+
+from src.config.cache.settings import settings as cache_settings
+from src.libs.lru import LRUCache
+
+# (shard, user agent string) -> user_agents.id, the shard is None unless users
+# are sharded. Rows are never updated or deleted so entries never go stale;
+# only filled after the inserting transaction committed
+user_agent_ids: LRUCache[tuple[Optional[int], str], int] = LRUCache(
+    maxsize=cache_settings.user_agent_cache_size
+)
@@ -4,6 +4,53 @@ from src.auth.dependencies.token.service import ITokenService
 from src.auth.dependencies.user.service import IUserService
 from src.auth.dto import UserDTO
 from src.auth.exceptions.token import InvalidTokenError, AccessTokenMissing
+from src.auth.service.token_cache import access_token_cache
+from src.libs.trusted import construct_trusted
+
+# claims written by TokenService when ACCESS_TOKEN_EMBED_USER is on
+USER_CLAIMS = ("name", "login", "email")
+
+
+async def _get_access_token_payload(
+    token_service: ITokenService, access_token: Union[str, None]
+) -> dict:
+    """
+    Returns the verified payload of the access token cookie.
+
+    Tokens that were already verified and did not expire are served from
+    the access token cache.
+    """
+    if access_token is None:
+        raise AccessTokenMissing()
+
+    payload = access_token_cache.get(access_token)
+
+    if payload is None:
+        payload = await token_service.verify_access_token(access_token)
+        access_token_cache.set(access_token, payload)
+
+    if payload.get("sub") is None:
+        raise InvalidTokenError
+
+    return payload
+
+
+async def _load_user(user_service: IUserService, user_id: int) -> UserDTO:
+    user = await user_service.get(user_id)
+
+    if user is None:
+        raise InvalidTokenError
+
+    # repository DTOs are built from trusted rows, no need to validate again
+    return construct_trusted(
+        UserDTO,
+        {
+            "id": user.id,
+            "name": user.name,
+            "login": user.login,
+            "email": user.email,
+        },
+    )
 
 
 async def get_current_user(
@@ -15,9 +62,11 @@ async def get_current_user(
     FastAPI Dependency to retrieve the authenticated user from a Cookie.
 
     1. Extracts the 'access_token' cookie.
-    2. Decodes and verifies the JWT signature and expiration.
+    2. Decodes and verifies the JWT signature and expiration, unless the same
+       token was already verified and is still in the access token cache.
     3. Extracts the 'user_id' from the token payload.
-    4. Fetches the full user record from the database.
+    4. Builds the user from the token claims if the token is self-contained
+       (ACCESS_TOKEN_EMBED_USER), otherwise fetches the user record from the database.
 
     Args:
         user_service (IUserService): Service to fetch user data.
@@ -31,30 +80,50 @@ async def get_current_user(
         InvalidTokenError: If the token is missing, invalid, expired, or the user
                            ID in the payload does not exist in the database.
     """
+    payload = await _get_access_token_payload(token_service, access_token)
 
-    if access_token is None:
-        raise AccessTokenMissing()
+    user_id = int(payload["sub"])
 
-    payload: dict = await token_service.verify_access_token(access_token)
+    if all(claim in payload for claim in USER_CLAIMS):
+        # claims were validated when the token was issued and are signed by us
+        return construct_trusted(
+            UserDTO,
+            {
+                "id": user_id,
+                "name": payload["name"],
+                "login": payload["login"],
+                "email": payload["email"],
+            },
+        )
 
-    user_id = payload.get("sub")
+    return await _load_user(user_service, user_id)
 
-    if user_id is None:
-        raise InvalidTokenError
 
-    user_id = int(user_id)
+async def get_fresh_current_user(
+    user_service: IUserService,
+    token_service: ITokenService,
+    access_token: Annotated[Union[str, None], Cookie()] = None,
+) -> UserDTO:
+    """
+    FastAPI Dependency like `get_current_user`, but always reads the user from
+    the database, for routes that must not act on claims issued earlier.
 
-    user = await user_service.get(user_id)
+    Args:
+        user_service (IUserService): Service to fetch user data.
+        token_service (ITokenService): Service to decode tokens.
+        access_token (str, optional): The JWT string extracted from cookies.
 
-    if user is None:
-        raise InvalidTokenError
+    Returns:
+        UserDTO: The authenticated user's current data.
 
-    return UserDTO(
-        id=user.id,
-        name=user.name,
-        login=user.login,
-        email=user.email,
-    )
+    Raises:
+        InvalidTokenError: If the token is invalid, expired, or the user no longer
+            exists.
+    """
+    payload = await _get_access_token_payload(token_service, access_token)
+
+    return await _load_user(user_service, int(payload["sub"]))
 
 
 ICurrentUser: type[UserDTO] = Annotated[UserDTO, Depends(get_current_user)]
+IFreshCurrentUser: type[UserDTO] = Annotated[UserDTO, Depends(get_fresh_current_user)]
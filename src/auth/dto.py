@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional, Annotated, Union
-from pydantic import BaseModel, EmailStr, StringConstraints
+from pydantic import BaseModel, EmailStr, Field, StringConstraints
 
 
 # Token
@@ -8,16 +8,20 @@ class TokenPairDTO(BaseModel):
     access_token: str
     refresh_token: str
 
+
 class BaseTokenDTO(BaseModel):
     token: str
 
+
 class RefreshTokenDTO(BaseTokenDTO):
     jti: str
     expire: datetime
 
+
 class AccessTokenDTO(BaseTokenDTO):
     pass
 
+
 # User
 class BaseUserDTO(BaseModel):
     """
@@ -62,6 +66,46 @@ class UserDTO(BaseModel):
     email: EmailStr
 
 
+class UserProfileDTO(BaseModel):
+    """
+    Profile of a user as shown to other users.
+
+    Returned by the batch user lookup, which any authenticated caller may
+    use: it excludes the email as well as the password.
+
+    Attributes:
+        id (int): The database primary key.
+        name (str): The display name of the user.
+        login (str): The unique username.
+    """
+
+    id: int
+    name: Annotated[str, StringConstraints(max_length=30)]
+    login: Annotated[str, StringConstraints(max_length=50)]
+
+
+# ids and logins accepted by one batch lookup, each
+MAX_LOOKUP_KEYS = 1000
+
+
+class UserLookupDTO(BaseModel):
+    """
+    Request DTO of the batch user lookup.
+
+    Users matching any of the ids or logins are returned, each at most once.
+
+    Attributes:
+        ids (list[int]): User IDs, up to `MAX_LOOKUP_KEYS`.
+        logins (list[str]): Usernames, up to `MAX_LOOKUP_KEYS`.
+    """
+
+    ids: Annotated[list[int], Field(max_length=MAX_LOOKUP_KEYS)] = []
+    logins: Annotated[
+        list[Annotated[str, StringConstraints(max_length=50)]],
+        Field(max_length=MAX_LOOKUP_KEYS),
+    ] = []
+
+
 class CreateUserDTO(BaseModel):
     """
     Data Transfer Object used internally for creating a new user.
@@ -147,7 +191,7 @@ class RegistrationDTO(BaseModel):
     password: Optional[str] = None
 
 
-#Session
+# Session
 class UserSessionInfoDTO(BaseModel):
     """
     Data Transfer Object for User Session requests.
@@ -156,6 +200,7 @@ class UserSessionInfoDTO(BaseModel):
         user_agent: Client browser info.
         ip_address: Client IP address.
     """
+
     user_agent: Optional[str] = None
     ip_address: Optional[str] = None
 
@@ -173,6 +218,7 @@ class SessionDTO(BaseModel):
         user_agent: Client browser info.
         ip_address: Client IP address.
     """
+
     id: int
     user_id: int
     refresh_token_jti: str
@@ -193,6 +239,7 @@ class CreateSessionDTO(BaseModel):
         user_agent: Client browser info.
         ip_address: Client IP address.
     """
+
     user_id: int
     refresh_token_jti: str
     expires_at: datetime
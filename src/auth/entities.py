@@ -2,7 +2,7 @@ from datetime import datetime
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class UserEntity:
     """Domain entity representing a User.
 
@@ -16,7 +16,8 @@ class UserEntity:
     password: str | None = None
     id: int | None = None
 
-@dataclass
+
+@dataclass(slots=True)
 class SessionEntity:
     """
     Domain entity representing a Session.
@@ -1,9 +1,10 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String
+from sqlalchemy import DateTime, ForeignKey, Integer, UniqueConstraint, Uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.libs.base_model import Base
+from src.libs.types import IPAddress
 
 
 class UserSessionModel(Base):
@@ -13,26 +14,40 @@ class UserSessionModel(Base):
     Attributes:
         id: Primary key.
         user_id: Foreign key to users table.
-        refresh_token_jti: Unique UUID for the refresh token.
+        refresh_token_jti: UUID of the refresh token, native UUID on PostgreSQL.
         expires_at: Absolute expiration timestamp.
         created_at: Creation timestamp.
-        user_agent: Client browser info.
-        ip_address: Client IP address.
+        user_agent_id: Foreign key to the user_agents lookup table.
+        ip_address: Client IP address, INET on PostgreSQL.
+
+    On PostgreSQL the table is range-partitioned by `expires_at` (migration
+    b7d41c2e9f03), with primary key (id, expires_at) and refresh_token_jti
+    unique per expires_at. The model keeps `id` as the identity key, which
+    stays unique through the shared sequence.
     """
+
     __tablename__ = "user_sessions"
+    __table_args__ = (
+        # a partitioned table's unique constraints must contain the partition key
+        UniqueConstraint(
+            "refresh_token_jti",
+            "expires_at",
+            name="uq_user_sessions_refresh_token_jti_expires_at",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"), index=True
     )
     refresh_token_jti: Mapped[str] = mapped_column(
-        String(36), unique=True, index=True
+        Uuid(as_uuid=False), unique=False, index=True
     )
-    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.utcnow
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    user_agent_id: Mapped[int | None] = mapped_column(
+        ForeignKey("user_agents.id"), nullable=True
     )
-    user_agent: Mapped[str | None] = mapped_column(String(255), nullable=True)
-    ip_address: Mapped[str | None] = mapped_column(String(45), nullable=True)
+    ip_address: Mapped[str | None] = mapped_column(IPAddress, nullable=True)
 
-    user = relationship("UserModel", backref="sessions")
\ No newline at end of file
+    user = relationship("UserModel", backref="sessions")
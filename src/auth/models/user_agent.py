@@ -0,0 +1,20 @@
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.libs.base_model import Base
+
+
+class UserAgentModel(Base):
+    """
+    SQLAlchemy model for the user_agents lookup table.
+
+    Sessions reference a user agent by id instead of repeating the string,
+    most logins come from a small set of browsers.
+
+    Attributes:
+        value: The User-Agent header, truncated to 255 chars. Unique.
+    """
+
+    __tablename__ = "user_agents"
+
+    value: Mapped[str] = mapped_column(String(255), unique=True, index=True)
@@ -0,0 +1,30 @@
+from sqlalchemy import Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.libs.base_model import Base
+
+
+class UserDirectoryModel(Base):
+    """
+    SQLAlchemy model for the user_directory table, only used when users are
+    sharded (see src/libs/shards.py).
+
+    Maps a login or an email to the id of its user. An entry is stored on
+    the shard its value hashes to, so the unique constraint makes logins
+    and emails unique across all shards.
+
+    Attributes:
+        kind: "login" or "email".
+        value: The login or email.
+        user_id: Id of the user, which also tells its shard. No foreign key,
+            the user usually lives on another shard.
+    """
+
+    __tablename__ = "user_directory"
+    __table_args__ = (
+        UniqueConstraint("kind", "value", name="uq_user_directory_kind_value"),
+    )
+
+    kind: Mapped[str] = mapped_column(String(16))
+    value: Mapped[str] = mapped_column(String(50))
+    user_id: Mapped[int] = mapped_column(Integer, index=True)
@@ -1,22 +1,89 @@
 from datetime import datetime
-from typing import Optional
+from functools import partial
+from typing import Iterable, Optional
 
-from sqlalchemy import delete, select, update
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import DBAPIError
 
+from src.auth.cache.session import session_cache
+from src.auth.cache.user_agent import user_agent_ids
 from src.auth.exceptions.session import SessionNotFound
-from src.auth.dto import SessionDTO
+from src.auth.dto import BaseUserDTO, SessionDTO
 from src.auth.entities import SessionEntity
 from src.auth.models.session import UserSessionModel
+from src.auth.models.user import UserModel
+from src.auth.models.user_agent import UserAgentModel
+from src.auth.repositories.user import IN_CHUNK_SIZE, USER_COLUMNS
+from src.config.database.engine import db_helper
 from src.config.database.session import ISession
+from src.config.database.settings import settings as db_settings
+from src.libs.dataloader import DataLoader
+from src.libs.replicas import fetch_all, fetch_one, has_written, reads_from_replica
+from src.libs.shards import shard_bind, shard_router
+from src.libs.trusted import construct_trusted
+from src.libs.unit_of_work import after_commit, rollback
+
+sessions_table = UserSessionModel.__table__
+user_agents_table = UserAgentModel.__table__
+
+# user agent strings are stored once in user_agents and resolved here
+USER_AGENT = (
+    select(user_agents_table.c.value)
+    .where(user_agents_table.c.id == sessions_table.c.user_agent_id)
+    .correlate(sessions_table)
+    .scalar_subquery()
+    .label("user_agent")
+)
+
+# columns of SessionDTO stored in user_sessions itself
+SESSION_ROW_COLUMNS = (
+    sessions_table.c.id,
+    sessions_table.c.user_id,
+    sessions_table.c.refresh_token_jti,
+    sessions_table.c.expires_at,
+    sessions_table.c.created_at,
+    sessions_table.c.ip_address,
+)
+# columns of SessionDTO, returned by writes instead of re-reading the row
+SESSION_COLUMNS = (*SESSION_ROW_COLUMNS, USER_AGENT)
+
+# user_agents.value length
+USER_AGENT_MAX_LENGTH = 255
+
+SELECT_USER_AGENT_ID = select(user_agents_table.c.id).where(
+    user_agents_table.c.value == bindparam("value")
+)
+
+# raised for an UPDATE of a row a concurrent UPDATE moved to another partition
+SERIALIZATION_FAILURE = "40001"
+
+SELECT_SESSION_BY_JTI = select(*SESSION_COLUMNS).where(
+    sessions_table.c.refresh_token_jti == bindparam("jti")
+)
+SELECT_SESSIONS_BY_JTIS = select(*SESSION_COLUMNS).where(
+    sessions_table.c.refresh_token_jti.in_(bindparam("jtis", expanding=True))
+)
 
 
 class SessionRepository:
     """
     Repository for managing User Sessions using DTOs.
+
+    Lookups by jti read through the session cache, rotating or revoking a
+    jti invalidates its entry once the transaction commits.
+
+    Writes run in the caller's transaction and are not committed here, the
+    request's unit of work (`DatabaseHelper.get_session`) commits them.
+
+    When users are sharded, sessions live on the shard of their user. Calls
+    by jti alone try every shard, pass `user_id` where it is known.
     """
 
     def __init__(self, session: ISession) -> None:
         self.session = session
+        self.shards = shard_router(session)
 
     async def create(self, entity: SessionEntity) -> SessionDTO:
         """
@@ -28,41 +95,120 @@ class SessionRepository:
         Returns:
             The created SessionDTO.
         """
-        instance = UserSessionModel(
-            user_id=entity.user_id,
-        refresh_token_jti=entity.refresh_token_jti,
-        expires_at=entity.expires_at,
-        user_agent=entity.user_agent,
-        ip_address=entity.ip_address,
-
+        shard = self._shard_of(entity.user_id)
+        user_agent = (
+            entity.user_agent[:USER_AGENT_MAX_LENGTH] if entity.user_agent else None
+        )
+        user_agent_id = (
+            await self._get_user_agent_id(user_agent, shard) if user_agent else None
+        )
+        stmt = (
+            insert(UserSessionModel)
+            .values(
+                user_id=entity.user_id,
+                refresh_token_jti=entity.refresh_token_jti,
+                expires_at=entity.expires_at,
+                user_agent_id=user_agent_id,
+                ip_address=entity.ip_address,
+            )
+            # INSERT cannot correlate the USER_AGENT subquery, we know the value anyway
+            .returning(*SESSION_ROW_COLUMNS)
+        )
+        result = await self.session.execute(stmt, bind_arguments=shard_bind(shard))
+        row = result.one()
+        if user_agent_id is not None:
+            # the user agent row may still be rolled back with this session
+            after_commit(
+                self.session,
+                partial(user_agent_ids.set, (shard, user_agent), user_agent_id),
+            )
+        return construct_trusted(
+            SessionDTO, {**row._asdict(), "user_agent": user_agent}
         )
-        self.session.add(instance)
-        await self.session.commit()
-        await self.session.refresh(instance)
-        return self._get_dto(instance)
 
-    async def get_by_jti(self, jti: str) -> Optional[SessionDTO]:
+    async def get_by_jti(
+        self, jti: str, user_id: Optional[int] = None
+    ) -> Optional[SessionDTO]:
         """
         Retrieves a session by its JTI.
 
         Args:
             jti: The unique refresh token identifier.
+            user_id: The owner, if known. Saves the other shards a lookup.
 
         Returns:
             SessionDTO if found, otherwise None.
         """
-        stmt = select(UserSessionModel).where(
-            UserSessionModel.refresh_token_jti == jti
-        )
-        result = await self.session.execute(stmt)
-        instance = result.scalar_one_or_none()
-        return self._get_dto(instance) if instance else None
+        cached = await session_cache.get(jti)
+        if cached is not None:
+            return cached
+
+        if session_loader is not None and not has_written(self.session):
+            # batched with concurrent lookups, see `UserRepository.get`
+            session = await session_loader.load(jti)
+            if session is None:
+                return None
+        else:
+            row = None
+            for shard in self._shards_for(user_id):
+                # a replica, a session missing there is re-read from the primary
+                row = await fetch_one(
+                    self.session, SELECT_SESSION_BY_JTI, {"jti": jti}, shard=shard
+                )
+                if row is not None:
+                    break
+            if row is None:
+                return None
+            session = self._get_dto(row)
+        await session_cache.set(session)
+        return session
+
+    async def get_many_by_jti(
+        self, jtis: Iterable[str], user_id: Optional[int] = None
+    ) -> dict[str, SessionDTO]:
+        """
+        Retrieves sessions by JTI with one `IN (...)` query per chunk and shard.
+
+        Bypasses the session cache. Without `user_id` the shards are asked
+        one after the other for the JTIs not found yet.
+
+        Args:
+            jtis: The refresh token identifiers, duplicates are looked up once.
+            user_id: The owner of all of them, if known.
+
+        Returns:
+            The sessions found, by JTI. Missing JTIs are left out.
+        """
+        missing = list(dict.fromkeys(jtis))
+        sessions = {}
+        for shard in self._shards_for(user_id):
+            for i in range(0, len(missing), IN_CHUNK_SIZE):
+                chunk = missing[i : i + IN_CHUNK_SIZE]
+                rows = await fetch_all(
+                    self.session, SELECT_SESSIONS_BY_JTIS, {"jtis": chunk}, shard=shard
+                )
+                if len(rows) < len(chunk) and reads_from_replica(self.session):
+                    rows = await fetch_all(
+                        self.session,
+                        SELECT_SESSIONS_BY_JTIS,
+                        {"jtis": chunk},
+                        shard=shard,
+                        primary=True,
+                    )
+                sessions.update(
+                    (row.refresh_token_jti, self._get_dto(row)) for row in rows
+                )
+            missing = [jti for jti in missing if jti not in sessions]
+            if not missing:
+                break
+        return sessions
 
     async def update_jti(
         self,
         old_jti: str,
         new_jti: str,
-        new_expires_at: datetime
+        new_expires_at: datetime,
+        user_id: Optional[int] = None,
     ) -> None:
         """
         Updates the JTI and expiration of an existing session.
@@ -71,30 +217,124 @@ class SessionRepository:
             old_jti: The JTI to replace.
             new_jti: The new JTI.
             new_expires_at: The new expiration timestamp.
+            user_id: The owner, if known. Saves the other shards an update.
         """
         stmt = (
             update(UserSessionModel)
             .where(UserSessionModel.refresh_token_jti == old_jti)
             .values(refresh_token_jti=new_jti, expires_at=new_expires_at)
+            .returning(UserSessionModel.id)
         )
-        result = await self.session.execute(stmt)
-        await self.session.commit()
-        instance = result.scalar_one_or_none()
-        if instance is None:
+        updated = None
+        for shard in self._shards_for(user_id):
+            result = await self.session.execute(stmt, bind_arguments=shard_bind(shard))
+            updated = result.scalar_one_or_none()
+            if updated is not None:
+                break
+        after_commit(self.session, partial(session_cache.invalidate, old_jti))
+        if updated is None:
             raise SessionNotFound
 
-    async def delete_by_jti(self, jti: str) -> None:
+    async def rotate_jti(
+        self,
+        user_id: int,
+        old_jti: str,
+        new_jti: str,
+        new_expires_at: datetime,
+    ) -> tuple[SessionDTO, BaseUserDTO]:
+        """
+        Atomically replaces the JTI of a session and returns it with its owner.
+
+        On PostgreSQL this is a single `UPDATE ... FROM users ... RETURNING`
+        statement. The `WHERE jti = old_jti` condition is re-checked after the
+        row lock, so of two concurrent rotations of the same token exactly one wins.
+        On a table partitioned by `expires_at` the winner moves the row to
+        another partition and the loser gets a serialization failure instead,
+        which is reported the same way.
+
+        Args:
+            user_id: The ID of the user the token was issued to.
+            old_jti: The JTI presented by the client.
+            new_jti: The JTI of the newly issued refresh token.
+            new_expires_at: The new expiration timestamp.
+
+        Returns:
+            The rotated session and the user owning it.
+
+        Raises:
+            SessionNotFound: If no session of this user has `old_jti`,
+                e.g. because it was already rotated or revoked.
+        """
+        # the owner id is returned as the session's user_id
+        user_columns = USER_COLUMNS[1:]
+        stmt = (
+            update(UserSessionModel)
+            .where(
+                UserSessionModel.refresh_token_jti == old_jti,
+                UserSessionModel.user_id == user_id,
+            )
+            .values(refresh_token_jti=new_jti, expires_at=new_expires_at)
+            .execution_options(synchronize_session=False)
+        )
+        # the session and its owner live on the same shard
+        bind = shard_bind(self._shard_of(user_id))
+
+        if self.session.get_bind().dialect.name == "postgresql":
+            stmt = stmt.where(UserModel.id == UserSessionModel.user_id).returning(
+                *SESSION_COLUMNS, *user_columns
+            )
+            try:
+                result = await self.session.execute(stmt, bind_arguments=bind)
+                session_row = user_row = result.one_or_none()
+            except DBAPIError as e:
+                if getattr(e.orig, "sqlstate", None) != SERIALIZATION_FAILURE:
+                    raise
+                # the transaction is aborted, nothing else can run in it
+                await rollback(self.session)
+                session_row = user_row = None
+        else:
+            # other dialects (SQLite) cannot return columns of the FROM table
+            result = await self.session.execute(
+                stmt.returning(*SESSION_COLUMNS), bind_arguments=bind
+            )
+            session_row = user_row = result.one_or_none()
+            if session_row is not None:
+                result = await self.session.execute(
+                    select(*user_columns).where(UserModel.id == user_id),
+                    bind_arguments=bind,
+                )
+                user_row = result.one()
+
+        after_commit(self.session, partial(session_cache.invalidate, old_jti))
+
+        if session_row is None:
+            raise SessionNotFound("Session associated with this token no longer exists")
+
+        session = self._get_dto(session_row)
+        owner = construct_trusted(
+            BaseUserDTO,
+            {
+                "id": session.user_id,
+                "name": user_row.name,
+                "login": user_row.login,
+                "email": user_row.email,
+                "password": user_row.password,
+            },
+        )
+        return session, owner
+
+    async def delete_by_jti(self, jti: str, user_id: Optional[int] = None) -> None:
         """
         Revokes a session by JTI.
 
         Args:
             jti: The JTI of the session to delete.
+            user_id: The owner, if known. Saves the other shards a delete.
         """
-        stmt = delete(UserSessionModel).where(
-            UserSessionModel.refresh_token_jti == jti
-        )
-        await self.session.execute(stmt)
-        await self.session.commit()
+        stmt = delete(UserSessionModel).where(UserSessionModel.refresh_token_jti == jti)
+        for shard in self._shards_for(user_id):
+            await self.session.execute(stmt, bind_arguments=shard_bind(shard))
+        after_commit(self.session, partial(session_cache.invalidate, jti))
 
     async def delete_all_for_user(self, user_id: int) -> None:
         """
@@ -103,21 +343,120 @@ class SessionRepository:
         Args:
             user_id: The ID of the user.
         """
-        stmt = delete(UserSessionModel).where(
-            UserSessionModel.user_id == user_id
+        stmt = (
+            delete(UserSessionModel)
+            .where(UserSessionModel.user_id == user_id)
+            .returning(UserSessionModel.refresh_token_jti)
+        )
+        result = await self.session.execute(
+            stmt, bind_arguments=shard_bind(self._shard_of(user_id))
+        )
+        jtis = result.scalars().all()
+        after_commit(self.session, partial(session_cache.invalidate, *jtis))
+
+    async def delete_expired(self, before: datetime, limit: int) -> int:
+        """
+        Deletes up to `limit` sessions that expired before `before`.
+
+        The batch is picked through the `expires_at` index. On PostgreSQL rows
+        locked by concurrent transactions are skipped instead of waited for.
+
+        Args:
+            before: Sessions with `expires_at` earlier than this are deleted.
+            limit: Max number of rows deleted by this call.
+
+        Returns:
+            The number of deleted sessions.
+        """
+        expired = (
+            select(UserSessionModel.id)
+            .where(UserSessionModel.expires_at < before)
+            .limit(limit)
         )
-        await self.session.execute(stmt)
-        await self.session.commit()
+        if self.session.get_bind().dialect.name == "postgresql":
+            expired = expired.with_for_update(skip_locked=True)
+
+        stmt = (
+            delete(UserSessionModel)
+            .where(UserSessionModel.id.in_(expired.scalar_subquery()))
+            .returning(UserSessionModel.refresh_token_jti)
+        )
+        result = await self.session.execute(stmt)
+        jtis = result.scalars().all()
+        after_commit(self.session, partial(session_cache.invalidate, *jtis))
+        return len(jtis)
+
+    async def _get_user_agent_id(
+        self, user_agent: str, shard: Optional[int] = None
+    ) -> int:
+        """
+        Returns the id of the user agent string, inserting it on first use.
+
+        Ids are cached by the caller only after its transaction committed, an
+        id of a rolled back insert must never be reused.
+        """
+        # ids are per database, so the shard is part of the key
+        user_agent_id = user_agent_ids.get((shard, user_agent))
+        if user_agent_id is not None:
+            return user_agent_id
+
+        connection = await self.session.connection(bind_arguments=shard_bind(shard))
+        result = await connection.execute(SELECT_USER_AGENT_ID, {"value": user_agent})
+        user_agent_id = result.scalar_one_or_none()
+        if user_agent_id is not None:
+            return user_agent_id
+
+        dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+        stmt = (
+            dialect.insert(UserAgentModel)
+            .values(value=user_agent)
+            .on_conflict_do_nothing(index_elements=[UserAgentModel.value])
+            .returning(UserAgentModel.id)
+        )
+        result = await connection.execute(stmt)
+        user_agent_id = result.scalar_one_or_none()
+        if user_agent_id is None:
+            # a concurrent transaction inserted it first and has committed by now
+            result = await connection.execute(
+                SELECT_USER_AGENT_ID, {"value": user_agent}
+            )
+            user_agent_id = result.scalar_one()
+        return user_agent_id
+
+    def _shard_of(self, user_id: int) -> Optional[int]:
+        return self.shards.shard_for_user(user_id) if self.shards else None
+
+    def _shards_for(self, user_id: Optional[int]) -> list[Optional[int]]:
+        """Shards that may hold a session of `user_id`, all of them if it is unknown."""
+        if not self.shards:
+            return [None]
+        if user_id is not None:
+            return [self.shards.shard_for_user(user_id)]
+        return list(self.shards.shards())
 
     @staticmethod
-    def _get_dto(instance: UserSessionModel):
-        """Helper function to transform SQLAlchemy instance to pydantic object"""
-        return SessionDTO(
-            id = instance.id,
-            user_id = instance.user_id,
-            refresh_token_jti = instance.refresh_token_jti,
-            expires_at = instance.expires_at,
-            created_at = instance.created_at,
-            user_agent = instance.user_agent,
-            ip_address = instance.ip_address,
-        )
\ No newline at end of file
+    def _get_dto(row: Row) -> SessionDTO:
+        """
+        Helper function to transform a trusted `SESSION_COLUMNS` row to pydantic
+        object without validation
+        """
+        return construct_trusted(SessionDTO, row._asdict())
+
+
+async def _load_sessions(jtis: list[str]) -> dict[str, SessionDTO]:
+    # a session of its own, the batch serves many requests
+    async with db_helper.session_factory() as session:
+        return await SessionRepository(session).get_many_by_jti(jtis)
+
+
+# coalesces `SessionRepository.get_by_jti` calls of concurrent requests,
+# see DB_BATCH_LOADS
+session_loader: Optional[DataLoader[str, SessionDTO]] = (
+    DataLoader(
+        _load_sessions,
+        window=db_settings.db_batch_window_ms / 1000,
+        max_batch_size=db_settings.db_batch_max_size,
+    )
+    if db_settings.db_batch_loads
+    else None
+)
@@ -1,22 +1,88 @@
-from typing import Optional, List
+import heapq
+from collections import defaultdict
+from functools import partial
+from typing import Awaitable, Callable, Iterable, Literal, Optional, List, Union
 
-from sqlalchemy import select, update, delete
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import IntegrityError
 
 from src.auth.entities import UserEntity
 from src.auth.exceptions.user import UserAlreadyExist, UserNotFound
+from src.auth.cache.user import user_cache
+from src.config.database.engine import db_helper
 from src.config.database.session import ISession
+from src.config.database.settings import settings as db_settings
 from src.auth.models.user import UserModel
+from src.auth.models.user_directory import UserDirectoryModel
 from src.auth.dto import UpdateUserDTO, BaseUserDTO, FindUserDTO
+from src.libs.dataloader import DataLoader
+from src.libs.replicas import fetch_all, fetch_one, has_written, reads_from_replica
+from src.libs.shards import next_user_id, shard_bind, shard_router
+from src.libs.trusted import construct_trusted
+from src.libs.unit_of_work import after_commit
+
+users_table = UserModel.__table__
+
+# columns of BaseUserDTO, returned by writes instead of re-reading the row
+USER_COLUMNS = (
+    users_table.c.id,
+    users_table.c.name,
+    users_table.c.login,
+    users_table.c.email,
+    users_table.c.password,
+)
+
+# Core statements for the hot lookups, built once so each call skips
+# statement construction and ORM compilation and hits the compiled cache
+SELECT_USERS = select(*USER_COLUMNS)
+SELECT_USER_BY = {
+    field: SELECT_USERS.where(users_table.c[field] == bindparam("value"))
+    for field in ("id", "login", "email")
+}
+SELECT_USERS_BY_IDS = SELECT_USERS.where(
+    users_table.c.id.in_(bindparam("ids", expanding=True))
+)
+SELECT_USERS_BY_LOGINS = SELECT_USERS.where(
+    users_table.c.login.in_(bindparam("logins", expanding=True))
+)
+# ids per `IN (...)` list, keeps statements and their parameter lists small
+IN_CHUNK_SIZE = 500
+
+directory_table = UserDirectoryModel.__table__
+# user id of a login or email, on the shard the value hashes to
+SELECT_DIRECTORY_USER_ID = select(directory_table.c.user_id).where(
+    directory_table.c.kind == bindparam("kind"),
+    directory_table.c.value == bindparam("value"),
+)
+SELECT_DIRECTORY_USER_IDS = select(
+    directory_table.c.value, directory_table.c.user_id
+).where(
+    directory_table.c.kind == bindparam("kind"),
+    directory_table.c.value.in_(bindparam("values", expanding=True)),
+)
+DIRECTORY_KINDS = ("login", "email")
 
 
 class UserRepository:
     """
     Repository for handling User database operations using SQLAlchemy.
+
+    Lookups by id, login or email read through the user cache, every write
+    invalidates the matching entries once the transaction commits.
+
+    Writes are not committed here, see `DatabaseHelper.get_session`.
+
+    When users are sharded (`DB_SHARD_URLS`) every statement goes to the
+    shard of the user id, logins and emails are first resolved through the
+    user directory and are unique across shards through it. A user and its
+    directory entries may live on different shards, their transactions are
+    committed one after the other, not atomically.
     """
 
     def __init__(self, session: ISession) -> None:
         self.session: ISession = session
+        self.shards = shard_router(session)
 
     async def create(self, entity: UserEntity) -> BaseUserDTO:
         """
@@ -32,20 +98,42 @@ class UserRepository:
         Raises:
             UserAlreadyExist: If a user with the same login or email already exists.
         """
-        instance = UserModel(
+        values = dict(
             name=entity.name,
             login=entity.login,
             email=entity.email,
             password=entity.password,  # Expects hashed password
         )
-        self.session.add(instance)
+        shard = self.shards.shard_for_key(entity.login) if self.shards else None
+        if shard is not None:
+            connection = await self.session.connection(bind_arguments=shard_bind(shard))
+            user_id = await next_user_id(
+                connection, users_table, shard, len(self.shards)
+            )
+            if user_id is not None:
+                values["id"] = user_id
+
+        stmt = insert(UserModel).values(**values).returning(*USER_COLUMNS)
         try:
-            await self.session.commit()
-            await self.session.refresh(instance)
-            return self._get_dto(instance)
+            # a savepoint keeps the rest of the unit of work usable on conflict
+            async with self.session.begin_nested():
+                result = await self.session.execute(
+                    stmt, bind_arguments=shard_bind(shard)
+                )
+                row = result.one()
+                if self.shards:
+                    for kind in DIRECTORY_KINDS:
+                        await self._add_directory_entry(
+                            kind, getattr(row, kind), row.id
+                        )
         except IntegrityError:
-            await self.session.rollback()
             raise UserAlreadyExist
+        # drop cached "not found" answers for the new login and email
+        after_commit(
+            self.session,
+            partial(user_cache.invalidate, pk=row.id, login=row.login, email=row.email),
+        )
+        return self._get_dto(row)
 
     async def get(self, pk: int) -> Optional[BaseUserDTO]:
         """
@@ -57,10 +145,143 @@ class UserRepository:
         Returns:
             Optional[BaseUserDTO]: The user DTO if found, otherwise None.
         """
-        instance = await self.session.get(UserModel, pk)
-        return self._get_dto(instance) if instance else None
+        cached, user = await user_cache.lookup("id", pk)
+        if cached:
+            return user
+
+        if user_loader is not None and not has_written(self.session):
+            # batched with concurrent lookups, this session's writes are not
+            # visible there, hence only for sessions that did not write
+            user = await user_loader.load(pk)
+        else:
+            row = await self._fetch_one(
+                SELECT_USER_BY["id"], shard=self._shard_of(pk), value=pk
+            )
+            user = self._get_dto(row) if row else None
+        await self._cache(partial(user_cache.store, "id", pk, user))
+        return user
+
+    async def find_many(
+        self, field: Literal["id", "login"], values: Iterable[Union[int, str]]
+    ) -> dict[Union[int, str], BaseUserDTO]:
+        """
+        Retrieves users by id or by login, reading through the user cache.
+
+        The cache is asked with one `mget`, the misses with `get_many` or
+        `get_many_by_login` and written back with one `store_many`.
+
+        Args:
+            field (str): "id" or "login".
+            values (Iterable): The IDs or logins, duplicates are looked up once.
+
+        Returns:
+            dict: The users found, by ID or login. Missing values are left out.
+        """
+        values = list(dict.fromkeys(values))
+        cached = await user_cache.lookup_many(field, values)
+        missing = [value for value in values if value not in cached]
+        if field == "id":
+            loaded = await self.get_many(missing)
+        else:
+            loaded = await self.get_many_by_login(missing)
+        await self._cache(
+            partial(
+                user_cache.store_many,
+                field,
+                {value: loaded.get(value) for value in missing},
+            )
+        )
+
+        users = {value: user for value, user in cached.items() if user is not None}
+        users.update(loaded)
+        return users
+
+    async def get_many(self, pks: Iterable[int]) -> dict[int, BaseUserDTO]:
+        """
+        Retrieves users by id with one `IN (...)` query per shard and chunk.
+
+        Bypasses the user cache.
+
+        Args:
+            pks (Iterable[int]): The user IDs, duplicates are looked up once.
 
-    async def find(self, dto: FindUserDTO) -> Optional[BaseUserDTO]:
+        Returns:
+            dict[int, BaseUserDTO]: The users found, by ID. Missing IDs are left out.
+        """
+        by_shard: dict[Optional[int], list[int]] = defaultdict(list)
+        for pk in dict.fromkeys(pks):
+            by_shard[self._shard_of(pk)].append(pk)
+
+        users = {}
+        for shard, shard_pks in by_shard.items():
+            for i in range(0, len(shard_pks), IN_CHUNK_SIZE):
+                chunk = shard_pks[i : i + IN_CHUNK_SIZE]
+                rows = await fetch_all(
+                    self.session, SELECT_USERS_BY_IDS, {"ids": chunk}, shard=shard
+                )
+                missing = len(rows) < len(chunk)
+                if missing and reads_from_replica(self.session):
+                    # like `fetch_one`, rows may not have been replicated yet
+                    rows = await fetch_all(
+                        self.session,
+                        SELECT_USERS_BY_IDS,
+                        {"ids": chunk},
+                        shard=shard,
+                        primary=True,
+                    )
+                users.update((row.id, self._get_dto(row)) for row in rows)
+        return users
+
+    async def get_many_by_login(self, logins: Iterable[str]) -> dict[str, BaseUserDTO]:
+        """
+        Retrieves users by login with one `IN (...)` query per chunk.
+
+        Bypasses the user cache. When sharded, the logins are first resolved
+        through the user directory, then the users are read with `get_many`.
+
+        Args:
+            logins (Iterable[str]): The logins, duplicates are looked up once.
+
+        Returns:
+            dict[str, BaseUserDTO]: The users found, by login. Missing logins are
+                left out.
+        """
+        logins = list(dict.fromkeys(logins))
+        if not self.shards:
+            users = {}
+            for i in range(0, len(logins), IN_CHUNK_SIZE):
+                rows = await fetch_all(
+                    self.session,
+                    SELECT_USERS_BY_LOGINS,
+                    {"logins": logins[i : i + IN_CHUNK_SIZE]},
+                )
+                users.update((row.login, self._get_dto(row)) for row in rows)
+            return users
+
+        by_shard: dict[int, list[str]] = defaultdict(list)
+        for login in logins:
+            by_shard[self.shards.shard_for_key(login)].append(login)
+        pks = {}
+        for shard, shard_logins in by_shard.items():
+            for i in range(0, len(shard_logins), IN_CHUNK_SIZE):
+                rows = await fetch_all(
+                    self.session,
+                    SELECT_DIRECTORY_USER_IDS,
+                    {"kind": "login", "values": shard_logins[i : i + IN_CHUNK_SIZE]},
+                    shard=shard,
+                )
+                pks.update((row.value, row.user_id) for row in rows)
+        users = await self.get_many(pks.values())
+        return {
+            login: users[pk]
+            for login, pk in pks.items()
+            # the directory may point to a user renamed since
+            if pk in users and users[pk].login == login
+        }
+
+    async def find(
+        self, dto: FindUserDTO, with_password: bool = False
+    ) -> Optional[BaseUserDTO]:
         """
         Finds a user based on dynamic criteria.
 
@@ -70,14 +291,35 @@ class UserRepository:
 
         Args:
             dto (FindUserDTO): DTO containing search criteria (id, login, email).
+            with_password (bool): Read the database even on a cache hit, the
+                cache does not hold password hashes.
 
         Returns:
             Optional[BaseUserDTO]: The first matching user, or None if no match found.
         """
-        stmt = select(UserModel).filter_by(**dto.model_dump(exclude_none=True))
-        result = await self.session.execute(stmt)
-        instance = result.scalar_one_or_none()
-        return self._get_dto(instance) if instance else None
+        criteria = dto.model_dump(exclude_none=True)
+        # only single-field lookups are cacheable
+        cache_key = next(iter(criteria)) if len(criteria) == 1 else None
+        if cache_key and not with_password:
+            cached, user = await user_cache.lookup(cache_key, criteria[cache_key])
+            if cached:
+                return user
+
+        row = None
+        if not self.shards:
+            row = await self._select_user(criteria, cache_key)
+        else:
+            pk = await self._resolve_user_id(criteria)
+            if pk is not None:
+                row = await self._select_user(
+                    criteria, cache_key, shard=self._shard_of(pk)
+                )
+        user = self._get_dto(row) if row else None
+        if cache_key:
+            await self._cache(
+                partial(user_cache.store, cache_key, criteria[cache_key], user)
+            )
+        return user
 
     async def get_list(self, limit: int = 100, offset: int = 0) -> List[BaseUserDTO]:
         """
@@ -90,10 +332,18 @@ class UserRepository:
         Returns:
             List[BaseUserDTO]: A list of user DTOs. Returns an empty list if no users exist.
         """
-        stmt = select(UserModel).offset(offset).limit(limit)
-        result = await self.session.execute(stmt)
-        instances = result.scalars().all()
-        return [self._get_dto(instance) for instance in instances]
+        if not self.shards:
+            stmt = SELECT_USERS.offset(offset).limit(limit)
+            return [self._get_dto(row) for row in await fetch_all(self.session, stmt)]
+
+        # every shard returns its first offset + limit users, merged by id
+        stmt = SELECT_USERS.order_by(users_table.c.id).limit(offset + limit)
+        per_shard = [
+            await fetch_all(self.session, stmt, shard=shard)
+            for shard in self.shards.shards()
+        ]
+        rows = heapq.merge(*per_shard, key=lambda row: row.id)
+        return [self._get_dto(row) for row in list(rows)[offset : offset + limit]]
 
     async def update(self, dto: UpdateUserDTO, pk: int) -> BaseUserDTO:
         """
@@ -110,34 +360,178 @@ class UserRepository:
 
         Raises:
             UserNotFound: If the user with the given ID does not exist.
+            UserAlreadyExist: If the new login is taken, only checked when sharded.
         """
+        values = dto.model_dump(exclude_none=True)
+        shard = self._shard_of(pk)
+        old = None
+        if self.shards and "login" in values:
+            old = await self._fetch_one(SELECT_USER_BY["id"], shard=shard, value=pk)
+            if old is None:
+                raise UserNotFound
+
         stmt = (
             update(UserModel)
-            .values(**dto.model_dump(exclude_none=True))
+            .values(**values)
             .where(UserModel.id == pk)
-            .returning(UserModel)
+            .returning(*USER_COLUMNS)
         )
-        result = await self.session.execute(stmt)
-        await self.session.commit()
-        instance = result.scalar_one_or_none()
-        if instance is None:
+        if old is None:
+            result = await self.session.execute(stmt, bind_arguments=shard_bind(shard))
+            row = result.one_or_none()
+        else:
+            try:
+                # moves the login's directory entry, possibly to another shard
+                async with self.session.begin_nested():
+                    result = await self.session.execute(
+                        stmt, bind_arguments=shard_bind(shard)
+                    )
+                    row = result.one_or_none()
+                    if row is not None and old.login != row.login:
+                        await self._add_directory_entry("login", row.login, pk)
+                        await self._delete_directory_entry("login", old.login)
+            except IntegrityError:
+                raise UserAlreadyExist
+        if row is None:
             raise UserNotFound
-        return self._get_dto(instance)
+        after_commit(
+            self.session,
+            partial(user_cache.invalidate, pk=pk, login=row.login, email=row.email),
+        )
+        if old is not None:
+            after_commit(self.session, partial(user_cache.invalidate, login=old.login))
+        return self._get_dto(row)
+
+    async def update_password(self, pk: int, hashed_password: str) -> None:
+        """
+        Replaces the password hash of an existing user.
+
+        Args:
+            pk (int): The primary key of the user to update.
+            hashed_password (str): The new password hash.
+
+        Raises:
+            UserNotFound: If the user with the given ID does not exist.
+        """
+        stmt = (
+            update(UserModel)
+            .values(password=hashed_password)
+            .where(UserModel.id == pk)
+            .returning(UserModel.id)
+        )
+        result = await self.session.execute(stmt, bind_arguments=self._bind_for(pk))
+        updated = result.scalar_one_or_none()
+        if updated is None:
+            raise UserNotFound
+        after_commit(self.session, partial(user_cache.invalidate, pk=pk))
 
     async def delete(self, pk: int) -> None:
-        stmt = delete(UserModel).where(UserModel.id == pk)
-        await self.session.execute(stmt)
-        await self.session.commit()
+        stmt = (
+            delete(UserModel)
+            .where(UserModel.id == pk)
+            .returning(UserModel.login, UserModel.email)
+        )
+        result = await self.session.execute(stmt, bind_arguments=self._bind_for(pk))
+        row = result.one_or_none()
+        if self.shards and row is not None:
+            for kind in DIRECTORY_KINDS:
+                await self._delete_directory_entry(kind, getattr(row, kind))
+        after_commit(self.session, partial(user_cache.invalidate, pk=pk))
 
-    @staticmethod
-    def _get_dto(instance: UserModel) -> BaseUserDTO:
+    async def _cache(self, store: Callable[[], Awaitable[None]]) -> None:
         """
-        Helper method to convert a user instance into a BaseUserDTO.
+        Runs a user cache `store` now, or after the commit when the session
+        wrote: its reads then see uncommitted rows, which must neither reach
+        other workers nor outlive a rollback.
         """
-        return BaseUserDTO(
-            id=instance.id,
-            name=instance.name,
-            login=instance.login,
-            email=instance.email,
-            password=instance.password,
+        if has_written(self.session):
+            after_commit(self.session, store)
+        else:
+            await store()
+
+    async def _fetch_one(
+        self, stmt, shard: Optional[int] = None, **params
+    ) -> Optional[Row]:
+        """
+        Runs a Core select on the session's connection, bypassing the ORM.
+
+        Served by a read replica unless this session already wrote.
+        """
+        return await fetch_one(self.session, stmt, params, shard=shard)
+
+    async def _select_user(
+        self, criteria: dict, cache_key: Optional[str], shard: Optional[int] = None
+    ) -> Optional[Row]:
+        if cache_key:
+            return await self._fetch_one(
+                SELECT_USER_BY[cache_key], shard=shard, value=criteria[cache_key]
+            )
+        stmt = SELECT_USERS.where(
+            *(users_table.c[field] == value for field, value in criteria.items())
+        )
+        return await self._fetch_one(stmt, shard=shard)
+
+    def _shard_of(self, pk: int) -> Optional[int]:
+        return self.shards.shard_for_user(pk) if self.shards else None
+
+    def _bind_for(self, pk: int) -> dict:
+        return shard_bind(self._shard_of(pk))
+
+    async def _resolve_user_id(self, criteria: dict) -> Optional[int]:
+        """Returns the id of the user matching the id, login or email in `criteria`."""
+        if "id" in criteria:
+            return criteria["id"]
+        kind = next(kind for kind in DIRECTORY_KINDS if kind in criteria)
+        return await self._fetch_directory_entry(kind, criteria[kind])
+
+    async def _fetch_directory_entry(self, kind: str, value: str) -> Optional[int]:
+        row = await self._fetch_one(
+            SELECT_DIRECTORY_USER_ID,
+            shard=self.shards.shard_for_key(value),
+            kind=kind,
+            value=value,
+        )
+        return row.user_id if row else None
+
+    async def _add_directory_entry(self, kind: str, value: str, user_id: int) -> None:
+        """Raises IntegrityError when the login or email is taken on any shard."""
+        await self.session.execute(
+            insert(UserDirectoryModel).values(kind=kind, value=value, user_id=user_id),
+            bind_arguments=shard_bind(self.shards.shard_for_key(value)),
+        )
+
+    async def _delete_directory_entry(self, kind: str, value: str) -> None:
+        await self.session.execute(
+            delete(UserDirectoryModel).where(
+                UserDirectoryModel.kind == kind, UserDirectoryModel.value == value
+            ),
+            bind_arguments=shard_bind(self.shards.shard_for_key(value)),
         )
+
+    @staticmethod
+    def _get_dto(row: Row) -> BaseUserDTO:
+        """
+        Helper method to convert a `USER_COLUMNS` row into a BaseUserDTO.
+
+        Rows were validated on their way into the table, so the DTO is
+        built without running validation again.
+        """
+        return construct_trusted(BaseUserDTO, row._asdict())
+
+
+async def _load_users(pks: list[int]) -> dict[int, BaseUserDTO]:
+    # a session of its own, the batch serves many requests
+    async with db_helper.session_factory() as session:
+        return await UserRepository(session).get_many(pks)
+
+
+# coalesces `UserRepository.get` calls of concurrent requests, see DB_BATCH_LOADS
+user_loader: Optional[DataLoader[int, BaseUserDTO]] = (
+    DataLoader(
+        _load_users,
+        window=db_settings.db_batch_window_ms / 1000,
+        max_batch_size=db_settings.db_batch_max_size,
+    )
+    if db_settings.db_batch_loads
+    else None
+)
@@ -1,14 +1,30 @@
 from typing import Annotated, Union
 
 from fastapi import APIRouter, Response, Cookie, Request, Header
+from fastapi.routing import APIRoute
 
 from src.auth.exceptions.token import RefreshTokenMissing
 from src.auth.dependencies.auth.service import IAuthService
-from src.auth.dto import TokenPairDTO, LoginDTO, UserDTO, RegistrationDTO, UserSessionInfoDTO
-from src.auth.dependencies.current_user import ICurrentUser
+from src.auth.dto import (
+    TokenPairDTO,
+    LoginDTO,
+    UserDTO,
+    RegistrationDTO,
+    UserSessionInfoDTO,
+    UserLookupDTO,
+    UserProfileDTO,
+)
+from src.auth.dependencies.current_user import ICurrentUser, IFreshCurrentUser
+from src.auth.dependencies.user.service import IUserService
 from src.auth.service.cookie import set_auth_cookies, clear_auth_cookies
-router = APIRouter(prefix="/auth", tags=["Authentication"])
+from src.config.metrics import settings as metrics_settings
+from src.libs.server_timing import ServerTimingRoute
 
+router = APIRouter(
+    prefix="/auth",
+    tags=["Authentication"],
+    route_class=ServerTimingRoute if metrics_settings.server_timing else APIRoute,
+)
 
 
 @router.post(
@@ -44,15 +60,13 @@ async def login(
         ip_address=request.client.host if request.client else None,
     )
 
-    tokens = await service.login(
-        login_dto=dto,
-        user_session_dto=session_info
-    )
+    tokens = await service.login(login_dto=dto, user_session_dto=session_info)
 
     set_auth_cookies(response, tokens)
 
     return tokens
 
+
 @router.post("/register", response_model=UserDTO)
 async def register(dto: RegistrationDTO, service: IAuthService):
     """
@@ -83,11 +97,40 @@ async def read_users_me(current_user: ICurrentUser):
     """
     return current_user
 
+
+@router.post(
+    "/users/lookup",
+    response_model=list[UserProfileDTO],
+    summary="Get many user profiles at once",
+)
+async def lookup_users(
+    dto: UserLookupDTO, service: IUserService, current_user: IFreshCurrentUser
+):
+    """
+    Resolves user IDs and logins to profiles in one call.
+
+    Meant for other services that would otherwise call `/me`-style endpoints
+    once per user. Requires a valid access token, any user may call it, so
+    profiles leave emails out. The caller is read from the database even when
+    the token embeds the user, so deleted users can't keep listing profiles.
+
+    Args:
+        dto (UserLookupDTO): The IDs and logins to resolve.
+        service (IUserService): The user service dependency.
+        current_user (UserDTO): The authenticated caller.
+
+    Returns:
+        list[UserProfileDTO]: The users found, ids first in request order, each once.
+            Unknown IDs and logins are left out.
+    """
+    return await service.get_many(ids=dto.ids, logins=dto.logins)
+
+
 @router.post("/refresh", response_model=TokenPairDTO)
 async def refresh(
-        response: Response,
-        service: IAuthService,
-        refresh_token: Annotated[Union[str, None], Cookie()] = None
+    response: Response,
+    service: IAuthService,
+    refresh_token: Annotated[Union[str, None], Cookie()] = None,
 ):
     """
     Refreshes the Access Token using a HttpOnly Refresh Token.
@@ -115,11 +158,12 @@ async def refresh(
 
     return new_tokens
 
+
 @router.post("/logout")
 async def logout(
-        response: Response,
-        service: IAuthService,
-        refresh_token: Annotated[Union[str, None], Cookie()] = None
+    response: Response,
+    service: IAuthService,
+    refresh_token: Annotated[Union[str, None], Cookie()] = None,
 ):
     """
     Logs out the user by revoking the specific session.
@@ -134,9 +178,9 @@ async def logout(
 
 @router.post("/logout_all_sessions")
 async def logout_all_sessions(
-        response: Response,
-        service: IAuthService,
-        refresh_token: Annotated[Union[str, None], Cookie()] = None
+    response: Response,
+    service: IAuthService,
+    refresh_token: Annotated[Union[str, None], Cookie()] = None,
 ):
     """
     Logs out all user sessions.
@@ -1,13 +1,18 @@
 from typing import Optional
 
 from src.auth.dto import (
-    CreateSessionDTO, UserSessionInfoDTO, SessionDTO,
-    RefreshTokenDTO, AccessTokenDTO, TokenPairDTO,
-    LoginDTO, RegistrationDTO, CreateUserDTO,
-    FindUserDTO, UserDTO, BaseUserDTO
-
+    CreateSessionDTO,
+    UserSessionInfoDTO,
+    RefreshTokenDTO,
+    AccessTokenDTO,
+    TokenPairDTO,
+    LoginDTO,
+    RegistrationDTO,
+    CreateUserDTO,
+    FindUserDTO,
+    UserDTO,
+    BaseUserDTO,
 )
-from src.auth.exceptions.session import SessionNotFound
 from src.auth.exceptions.auth import CredentialsException
 from src.auth.exceptions.token import InvalidTokenError
 from src.auth.exceptions.user import UserNotFound
@@ -23,12 +28,20 @@ class AuthService:
     """
     Service layer responsible for high-level authentication flows.
     """
-    def __init__(self, user_service: IUserService, token_service: ITokenService, session_service: ISessionService):
+
+    def __init__(
+        self,
+        user_service: IUserService,
+        token_service: ITokenService,
+        session_service: ISessionService,
+    ):
         self.user_service = user_service
         self.token_service = token_service
         self.session_service = session_service
 
-    async def login(self, login_dto: LoginDTO, user_session_dto: UserSessionInfoDTO) -> TokenPairDTO:
+    async def login(
+        self, login_dto: LoginDTO, user_session_dto: UserSessionInfoDTO
+    ) -> TokenPairDTO:
         """
         Authenticates a user and generates JWT tokens.
 
@@ -42,18 +55,36 @@ class AuthService:
         Raise:
             CredentialsException: if the credentials are invalid, username not found, or password not match
         """
-        user: Optional[BaseUserDTO] = await self.user_service.find(FindUserDTO(login=login_dto.login))
+        user: Optional[BaseUserDTO] = await self.user_service.find(
+            FindUserDTO(login=login_dto.login), with_password=True
+        )
+
+        if not user:
+            raise CredentialsException
+
+        verified, new_hash = await PasswordService.averify_and_update(
+            login_dto.password, user.password
+        )
 
-        if not user or not PasswordService.verify_password(login_dto.password, user.password):
+        if not verified:
             raise CredentialsException
 
+        # the stored hash uses an old scheme or cost, replace it while we know
+        # the password
+        if new_hash:
+            await self.user_service.update_password_hash(user.id, new_hash)
+
         user: BaseUserDTO = user
 
-        access_token: AccessTokenDTO = await self.token_service.generate_access_token(user)
-        refresh_token: RefreshTokenDTO = await self.token_service.generate_refresh_token(user)
+        access_token: AccessTokenDTO = await self.token_service.generate_access_token(
+            user
+        )
+        refresh_token: RefreshTokenDTO = (
+            await self.token_service.generate_refresh_token(user)
+        )
 
         session_dto = CreateSessionDTO(
-            user_id = user.id,
+            user_id=user.id,
             refresh_token_jti=refresh_token.jti,
             expires_at=refresh_token.expire,
             user_agent=user_session_dto.user_agent,
@@ -89,6 +120,23 @@ class AuthService:
         return await self.user_service.create(create_user_dto)
 
     async def refresh_session(self, refresh_token: str) -> TokenPairDTO:
+        """
+        Issues a new token pair and rotates the refresh token of the session.
+
+        The session lookup, the jti rotation and loading the user happen in a
+        single repository call, so a refresh token can only be used once even
+        under concurrent requests.
+
+        Args:
+            refresh_token (str): The refresh token presented by the client.
+
+        Returns:
+            TokenPairDTO: New access and refresh tokens.
+
+        Raises:
+            InvalidTokenError: If the token is invalid or its payload incomplete.
+            SessionNotFound: If the session was revoked or the token already used.
+        """
         payload = await self.token_service.verify_refresh_token(refresh_token)
 
         user_id = payload.get("sub")
@@ -96,41 +144,38 @@ class AuthService:
         if not user_id or not jti:
             raise InvalidTokenError("Token payload invalid")
 
-        user = await self.user_service.get(int(user_id))
-
-        if not user:
-            raise UserNotFound("User associated with this token no longer exists")
-
-        session: Optional[SessionDTO] = await self.session_service.get_by_jti(jti=jti)
-
-        if not session:
-            raise SessionNotFound("Session associated with this token no longer exists")
-
-
-        access_token: AccessTokenDTO = await self.token_service.generate_access_token(user)
-        refresh_token: RefreshTokenDTO = await self.token_service.generate_refresh_token(user)
+        new_refresh_token: RefreshTokenDTO = (
+            await self.token_service.generate_refresh_token_for_user_id(int(user_id))
+        )
 
-        await self.session_service.update_jti(
+        _, user = await self.session_service.rotate_jti(
+            user_id=int(user_id),
             old_jti=jti,
-            new_jti=refresh_token.jti,
-            new_expires_at=refresh_token.expire,
+            new_jti=new_refresh_token.jti,
+            new_expires_at=new_refresh_token.expire,
+        )
+
+        access_token: AccessTokenDTO = await self.token_service.generate_access_token(
+            user
         )
 
         return TokenPairDTO(
             access_token=access_token.token,
-            refresh_token=refresh_token.token,
+            refresh_token=new_refresh_token.token,
         )
 
     async def logout(self, refresh_token: str) -> None:
         payload = await self.token_service.verify_refresh_token(refresh_token)
 
+        user_id = payload.get("sub")
         jti = payload.get("jti")
 
         if not jti:
             raise InvalidTokenError("Token payload invalid")
 
+        # the owner tells the shard holding the session
         await self.session_service.delete_by_jti(
-            jti=jti
+            jti=jti, user_id=int(user_id) if user_id else None
         )
 
         return None
@@ -153,4 +198,3 @@ class AuthService:
         await self.session_service.delete_all_for_user(user_id)
 
         return None
-
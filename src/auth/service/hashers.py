@@ -0,0 +1,100 @@
+from abc import ABC, abstractmethod
+
+from argon2 import PasswordHasher as Argon2PasswordHasher, Type
+from argon2.exceptions import InvalidHashError, VerificationError
+from passlib.hash import bcrypt
+
+
+class PasswordHasher(ABC):
+    """
+    Interface of a password hashing backend.
+
+    Attributes:
+        scheme (str): Short name of the algorithm, used in settings.
+    """
+
+    scheme: str
+
+    @abstractmethod
+    def hash(self, password: str) -> str:
+        """Hashes a plain-text password with the configured cost parameters."""
+
+    @abstractmethod
+    def verify(self, password: str, hashed_password: str) -> bool:
+        """Checks a plain-text password against a hash produced by this backend."""
+
+    @abstractmethod
+    def identify(self, hashed_password: str) -> bool:
+        """Returns True if the hash was produced by this backend."""
+
+    @abstractmethod
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Returns True if the hash uses other cost parameters than configured."""
+
+
+class BcryptHasher(PasswordHasher):
+    """
+    bcrypt backend.
+
+    Attributes:
+        rounds (int): log2 of the number of key expansion rounds.
+    """
+
+    scheme = "bcrypt"
+
+    def __init__(self, rounds: int = 12) -> None:
+        self.rounds = rounds
+        self._handler = bcrypt.using(rounds=rounds)
+
+    def hash(self, password: str) -> str:
+        return self._handler.hash(password)
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        return self._handler.verify(password, hashed_password)
+
+    def identify(self, hashed_password: str) -> bool:
+        return self._handler.identify(hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return self._handler.needs_update(hashed_password)
+
+
+class Argon2Hasher(PasswordHasher):
+    """
+    argon2id backend.
+
+    Attributes:
+        time_cost (int): Number of iterations.
+        memory_cost (int): Memory usage in KiB.
+        parallelism (int): Number of parallel lanes.
+    """
+
+    scheme = "argon2"
+
+    def __init__(
+        self, time_cost: int = 3, memory_cost: int = 65536, parallelism: int = 4
+    ) -> None:
+        self.time_cost = time_cost
+        self.memory_cost = memory_cost
+        self.parallelism = parallelism
+        self._hasher = Argon2PasswordHasher(
+            time_cost=time_cost,
+            memory_cost=memory_cost,
+            parallelism=parallelism,
+            type=Type.ID,
+        )
+
+    def hash(self, password: str) -> str:
+        return self._hasher.hash(password)
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        try:
+            return self._hasher.verify(hashed_password, password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    def identify(self, hashed_password: str) -> bool:
+        return hashed_password.startswith("$argon2")
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return self._hasher.check_needs_rehash(hashed_password)
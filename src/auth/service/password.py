@@ -1,13 +1,59 @@
-from passlib.context import CryptContext
+import time
+from typing import Optional
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from src.auth.service.hashers import Argon2Hasher, BcryptHasher, PasswordHasher
+from src.config.password import settings as password_settings
+from src.libs.admission import AdmissionController
+from src.libs.server_timing import timed
+from src.libs.worker_pool import WorkerPool
+from src.metrics import admission_metrics, password_hash_duration, worker_pool_metrics
+
+hashers: dict[str, PasswordHasher] = {
+    "argon2": Argon2Hasher(
+        time_cost=password_settings.argon2_time_cost,
+        memory_cost=password_settings.argon2_memory_cost,
+        parallelism=password_settings.argon2_parallelism,
+    ),
+    "bcrypt": BcryptHasher(rounds=password_settings.bcrypt_rounds),
+}
+default_hasher: PasswordHasher = hashers[password_settings.hash_scheme]
+
+# hashing is CPU-bound, async callers go through this pool instead of the event loop
+password_pool = WorkerPool(
+    kind=password_settings.hash_executor,
+    max_workers=password_settings.hash_workers,
+)
+worker_pool_metrics.add("password", password_pool)
+
+# sheds login/register bursts with 503 instead of queueing them without bound
+password_admission = AdmissionController(
+    max_concurrency=password_settings.admission_concurrency
+    or password_settings.hash_workers,
+    max_queue=password_settings.admission_queue_size,
+    max_wait=password_settings.admission_max_wait_seconds,
+)
+admission_metrics.add("password", password_admission)
 
 
 class PasswordService:
     """
     Utility service for cryptographic password operations.
+
+    New hashes are produced by the hasher selected with `PASSWORD_HASH_SCHEME`,
+    existing hashes are verified by whichever backend produced them.
+
+    The synchronous methods block the calling thread for the whole hashing
+    round, request handlers should use the async variants. Those go through
+    admission control and raise ServiceOverloaded when it is saturated.
     """
 
+    @staticmethod
+    def _identify(hashed_password: str) -> Optional[PasswordHasher]:
+        for hasher in hashers.values():
+            if hasher.identify(hashed_password):
+                return hasher
+        return None
+
     @staticmethod
     def verify_password(plain_password: str, hashed_password: str) -> bool:
         """
@@ -15,17 +61,121 @@ class PasswordService:
 
         Args:
             plain_password (str): The password provided by the user.
-            hashed_password (str): The bcrypt hash stored in the database.
+            hashed_password (str): The hash stored in the database.
 
         Returns:
             bool: True if the password matches the hash, False otherwise.
         """
-        return pwd_context.verify(plain_password, hashed_password)
+        hasher = PasswordService._identify(hashed_password)
+        if hasher is None:
+            return False
+        return hasher.verify(plain_password, hashed_password)
 
     @staticmethod
     def get_password_hash(password: str) -> str:
         """
-        Generates a secure hash for a plain-text password using bcrypt.
+        Generates a secure hash for a plain-text password using the default hasher.
+
+        Args:
+            password (str): The plain-text password.
+
+        Returns:
+            str: The resulting password hash.
+        """
+        return default_hasher.hash(password)
+
+    @staticmethod
+    def needs_rehash(hashed_password: str) -> bool:
+        """
+        Checks whether a stored hash is out of date.
+
+        Args:
+            hashed_password (str): The hash stored in the database.
+
+        Returns:
+            bool: True if the hash uses another scheme or stale cost parameters.
+        """
+        if not default_hasher.identify(hashed_password):
+            return True
+        return default_hasher.needs_rehash(hashed_password)
+
+    @staticmethod
+    def verify_and_update(
+        plain_password: str, hashed_password: str
+    ) -> tuple[bool, Optional[str]]:
+        """
+        Verifies a password and produces a fresh hash if the stored one is stale.
+
+        Args:
+            plain_password (str): The password provided by the user.
+            hashed_password (str): The hash stored in the database.
+
+        Returns:
+            tuple[bool, Optional[str]]: Verification result and the new hash,
+                the new hash is None when verification failed or no rehash is needed.
+        """
+        if not PasswordService.verify_password(plain_password, hashed_password):
+            return False, None
+        if PasswordService.needs_rehash(hashed_password):
+            return True, PasswordService.get_password_hash(plain_password)
+        return True, None
+
+    @staticmethod
+    async def averify(plain_password: str, hashed_password: str) -> bool:
+        """
+        Verifies a password in the hashing worker pool.
+
+        Args:
+            plain_password (str): The password provided by the user.
+            hashed_password (str): The hash stored in the database.
+
+        Returns:
+            bool: True if the password matches the hash, False otherwise.
+        """
+        with timed("password"):
+            async with password_admission.admit():
+                # timed here, a process pool worker would record into its own registry
+                with password_hash_duration.labels("verify").time():
+                    return await password_pool.run(
+                        PasswordService.verify_password, plain_password, hashed_password
+                    )
+
+    @staticmethod
+    async def averify_and_update(
+        plain_password: str, hashed_password: str
+    ) -> tuple[bool, Optional[str]]:
+        """
+        Runs `verify_and_update` in the hashing worker pool.
+
+        Calls that also rehashed are timed as "verify_rehash", they take about
+        twice as long as a plain "verify".
+
+        Args:
+            plain_password (str): The password provided by the user.
+            hashed_password (str): The hash stored in the database.
+
+        Returns:
+            tuple[bool, Optional[str]]: Verification result and the new hash, if any.
+        """
+        with timed("password"):
+            async with password_admission.admit():
+                # timed here, a process pool worker would record into its own registry
+                started_at = time.perf_counter()
+                verified, new_hash = await password_pool.run(
+                    PasswordService.verify_and_update,
+                    plain_password,
+                    hashed_password,
+                )
+                operation = "verify" if new_hash is None else "verify_rehash"
+                password_hash_duration.labels(operation).observe(
+                    time.perf_counter() - started_at
+                )
+                return verified, new_hash
+
+    @staticmethod
+    async def ahash(password: str) -> str:
+        """
+        Hashes a password in the hashing worker pool.
 
         Args:
             password (str): The plain-text password.
@@ -33,4 +183,9 @@ class PasswordService:
         Returns:
             str: The resulting password hash.
         """
-        return pwd_context.hash(password)
+        with timed("password"):
+            async with password_admission.admit():
+                with password_hash_duration.labels("hash").time():
+                    return await password_pool.run(
+                        PasswordService.get_password_hash, password
+                    )
@@ -1,7 +1,7 @@
 from typing import Optional
 from datetime import datetime
 
-from src.auth.dto import CreateSessionDTO, SessionDTO
+from src.auth.dto import BaseUserDTO, CreateSessionDTO, SessionDTO
 from src.auth.entities import SessionEntity
 from src.auth.dependencies.session.repository import ISessionRepository
 
@@ -12,7 +12,7 @@ class SessionService:
 
     async def create(self, dto: CreateSessionDTO):
         session_entity = SessionEntity(
-            user_id = dto.user_id,
+            user_id=dto.user_id,
             refresh_token_jti=dto.refresh_token_jti,
             user_agent=dto.user_agent,
             expires_at=dto.expires_at,
@@ -20,19 +20,37 @@ class SessionService:
         )
         return await self.repository.create(session_entity)
 
-    async def get_by_jti(self, jti: str) -> Optional[SessionDTO]:
-        return await self.repository.get_by_jti(jti)
-
-
-    async def update_jti(self, old_jti: str, new_jti: str, new_expires_at: datetime):
+    async def get_by_jti(
+        self, jti: str, user_id: Optional[int] = None
+    ) -> Optional[SessionDTO]:
+        return await self.repository.get_by_jti(jti, user_id=user_id)
+
+    async def update_jti(
+        self,
+        old_jti: str,
+        new_jti: str,
+        new_expires_at: datetime,
+        user_id: Optional[int] = None,
+    ):
         return await self.repository.update_jti(
             old_jti=old_jti,
             new_jti=new_jti,
             new_expires_at=new_expires_at,
+            user_id=user_id,
+        )
+
+    async def rotate_jti(
+        self, user_id: int, old_jti: str, new_jti: str, new_expires_at: datetime
+    ) -> tuple[SessionDTO, BaseUserDTO]:
+        return await self.repository.rotate_jti(
+            user_id=user_id,
+            old_jti=old_jti,
+            new_jti=new_jti,
+            new_expires_at=new_expires_at,
         )
 
-    async def delete_by_jti(self, jti: str):
-        return await self.repository.delete_by_jti(jti)
+    async def delete_by_jti(self, jti: str, user_id: Optional[int] = None):
+        return await self.repository.delete_by_jti(jti, user_id=user_id)
 
     async def delete_all_for_user(self, user_id: int) -> None:
-        return await self.repository.delete_all_for_user(user_id)
\ No newline at end of file
+        return await self.repository.delete_all_for_user(user_id)
@@ -0,0 +1,242 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from src.auth.models.session import UserSessionModel
+from src.auth.repositories.session import SessionRepository
+from src.config.database.engine import db_helper
+from src.config.jwt import settings as jwt_settings
+from src.config.session_reaper import settings as reaper_settings
+from src.libs.partitions import DailyRangePartitions
+from src.libs.unit_of_work import unit_of_work
+
+logger = logging.getLogger(__name__)
+
+# pg_advisory_lock key, shared by every replica of the app
+REAPER_LOCK_KEY = 0x5E55_10E5
+
+
+@dataclass(frozen=True)
+class ReapResult:
+    """Outcome of a single reaper run."""
+
+    reaped: int
+    batches: int
+    duration_seconds: float
+    skipped: bool = False
+    created_partitions: int = 0
+    dropped_partitions: int = 0
+
+
+class SessionReaper:
+    """
+    Background task deleting expired rows from `user_sessions`.
+
+    Each run deletes expired sessions in batches of `batch_size`, pausing
+    `batch_pause` seconds between batches, until a batch comes back short
+    or `max_batches` were deleted. On PostgreSQL a run holds a session-level
+    advisory lock, replicas that fail to take it skip the run.
+
+    If the table is partitioned by `expires_at` (see the partitioning
+    migration), a run instead creates the daily partitions up to
+    `partition_horizon` ahead, deletes expired rows from the DEFAULT
+    partition in the same batches (rows of days that had no partition, e.g.
+    while no reaper ran) and drops the partitions that fully expired.
+
+    Args:
+        engine: Engine to reap through.
+        interval: Seconds between two runs.
+        batch_size: Max rows per DELETE statement.
+        batch_pause: Seconds to sleep between two batches.
+        max_batches: Max batches per run.
+        partitions: Partition manager of the sessions table.
+        partition_horizon: How far ahead partitions must exist.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        interval: float,
+        batch_size: int,
+        batch_pause: float,
+        max_batches: int,
+        partitions: Optional[DailyRangePartitions] = None,
+        partition_horizon: timedelta = timedelta(days=1),
+    ) -> None:
+        self.engine = engine
+        self.interval = interval
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self.max_batches = max_batches
+        self.partitions = partitions
+        self.partition_horizon = partition_horizon
+        self.last_result: Optional[ReapResult] = None
+        self.total_reaped = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def reap_once(self) -> ReapResult:
+        """Runs a single reaping pass and returns how much it deleted."""
+        started_at = time.perf_counter()
+        reaped = batches = 0
+
+        async with self.engine.connect() as connection:
+            if not await self._try_lock(connection):
+                logger.debug("Session reaper lock is held by another replica")
+                return ReapResult(0, 0, time.perf_counter() - started_at, skipped=True)
+            try:
+                if await self._is_partitioned(connection):
+                    return self._finish(
+                        await self._maintain_partitions(connection, started_at)
+                    )
+
+                async with AsyncSession(
+                    bind=connection, expire_on_commit=False
+                ) as session:
+                    repository = SessionRepository(session)
+                    while batches < self.max_batches:
+                        if batches:
+                            await asyncio.sleep(self.batch_pause)
+                        # every batch is its own short transaction
+                        async with unit_of_work(session):
+                            deleted = await repository.delete_expired(
+                                before=datetime.now(), limit=self.batch_size
+                            )
+                        batches += 1
+                        reaped += deleted
+                        if deleted < self.batch_size:
+                            break
+            finally:
+                await self._unlock(connection)
+
+        return self._finish(
+            ReapResult(reaped, batches, time.perf_counter() - started_at)
+        )
+
+    async def _maintain_partitions(
+        self, connection: AsyncConnection, started_at: float
+    ) -> ReapResult:
+        now = datetime.now()
+        created = await self.partitions.create_until(
+            connection, start=now, until=now + self.partition_horizon
+        )
+        reaped = batches = 0
+        while batches < self.max_batches:
+            if batches:
+                await asyncio.sleep(self.batch_pause)
+            deleted = await self.partitions.purge_default(
+                connection, before=now, limit=self.batch_size
+            )
+            batches += 1
+            reaped += deleted
+            if deleted < self.batch_size:
+                break
+        dropped = await self.partitions.drop_before(connection, before=now)
+        for partition in dropped:
+            logger.info("Dropped expired sessions partition %s", partition.name)
+        return ReapResult(
+            reaped,
+            batches,
+            time.perf_counter() - started_at,
+            created_partitions=len(created),
+            dropped_partitions=len(dropped),
+        )
+
+    def _finish(self, result: ReapResult) -> ReapResult:
+        self.last_result = result
+        self.total_reaped += result.reaped
+        if result.created_partitions or result.dropped_partitions:
+            logger.info(
+                "Created %d and dropped %d sessions partitions, "
+                "reaped %d expired sessions (%.2fs)",
+                result.created_partitions,
+                result.dropped_partitions,
+                result.reaped,
+                result.duration_seconds,
+            )
+        else:
+            logger.info(
+                "Reaped %d expired sessions in %d batches (%.2fs)",
+                result.reaped,
+                result.batches,
+                result.duration_seconds,
+            )
+        return result
+
+    def start(self) -> None:
+        """Starts the periodic task on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="session-reaper")
+
+    async def stop(self) -> None:
+        """Cancels the periodic task and waits for it to finish."""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.reap_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Session reaper run failed")
+            await asyncio.sleep(self.interval)
+
+    async def _is_partitioned(self, connection: AsyncConnection) -> bool:
+        if self.partitions is None or connection.dialect.name != "postgresql":
+            return False
+        return await self.partitions.is_partitioned(connection)
+
+    @staticmethod
+    async def _try_lock(connection: AsyncConnection) -> bool:
+        if connection.dialect.name != "postgresql":
+            return True
+        result = await connection.execute(
+            select(func.pg_try_advisory_lock(REAPER_LOCK_KEY))
+        )
+        locked = result.scalar_one()
+        # end the implicit transaction, the lock is bound to the connection
+        await connection.commit()
+        return locked
+
+    @staticmethod
+    async def _unlock(connection: AsyncConnection) -> None:
+        if connection.dialect.name != "postgresql":
+            return
+        await connection.execute(select(func.pg_advisory_unlock(REAPER_LOCK_KEY)))
+        await connection.commit()
+
+
+session_partitions = DailyRangePartitions(
+    UserSessionModel.__tablename__, UserSessionModel.expires_at.key
+)
+
+# one reaper per shard, a single database is shard 0
+session_reapers = [
+    SessionReaper(
+        engine=engine,
+        interval=reaper_settings.interval_seconds,
+        batch_size=reaper_settings.batch_size,
+        batch_pause=reaper_settings.batch_pause_seconds,
+        max_batches=reaper_settings.max_batches,
+        partitions=session_partitions,
+        partition_horizon=timedelta(
+            seconds=jwt_settings.refresh_token_lifetime_seconds,
+            days=reaper_settings.partition_ahead_days,
+        ),
+    )
+    for engine in db_helper.shards.engines
+]
+session_reaper = session_reapers[0]
@@ -4,10 +4,12 @@ from jwt import ExpiredSignatureError, PyJWTError, decode, encode, get_unverifie
 from datetime import datetime, timedelta
 
 
-from src.auth.dto import UserDTO, RefreshTokenDTO, AccessTokenDTO, BaseUserDTO
+from src.auth.dto import RefreshTokenDTO, AccessTokenDTO, BaseUserDTO
 from src.config.jwt import settings as jwt_settings
 from src.config.security import settings as security_settings
 from src.auth.exceptions.token import InvalidSignatureError, InvalidTokenError
+from src.libs.server_timing import timed
+from src.metrics import jwt_duration
 
 
 class TokenService:
@@ -23,6 +25,7 @@ class TokenService:
         refresh_token_lifetime (int): The lifespan of a refresh token in seconds.
         secret_key (str): The secret key used for signing tokens.
         algorithm (str): The cryptographic algorithm used for signing (e.g., HS256).
+        embed_user (bool): Whether access tokens carry the public user fields.
     """
 
     def __init__(self) -> None:
@@ -36,6 +39,7 @@ class TokenService:
         self.refresh_token_lifetime = jwt_settings.refresh_token_lifetime_seconds
         self.secret_key = security_settings.secret_key
         self.algorithm = security_settings.algorithm
+        self.embed_user = jwt_settings.access_token_embed_user
 
     def _validate_token(self, token: str) -> str:
         """
@@ -69,7 +73,8 @@ class TokenService:
         Returns:
             str: The encoded and signed JWT string.
         """
-        return encode(payload, self.secret_key, self.algorithm)
+        with jwt_duration.labels("encode").time(), timed("jwt_encode"):
+            return encode(payload, self.secret_key, self.algorithm)
 
     async def decode_token(self, token: str) -> dict:
         """
@@ -94,8 +99,9 @@ class TokenService:
             Exception: If the token is malformed or invalid for any other reason.
         """
         try:
-            self._validate_token(token)
-            return decode(token, self.secret_key, self.algorithm)
+            with jwt_duration.labels("decode").time(), timed("jwt_decode"):
+                self._validate_token(token)
+                return decode(token, self.secret_key, self.algorithm)
         except ExpiredSignatureError:
             raise ExpiredSignatureError("Token lifetime is expired")
         except PyJWTError:
@@ -107,9 +113,10 @@ class TokenService:
 
         The payload includes:
         - `token_type`: Set to "access".
-        - `user`: A dictionary containing `user_id` and `user_name` from the DTO.
+        - `sub`: The user ID.
         - `exp`: Expiration timestamp based on `access_token_lifetime`.
         - `iat`: Issued-at timestamp.
+        - `name`, `login`, `email`: Public user fields, only when `embed_user` is on.
 
         Args:
             dto (UserDTO): The user data to embed in the token.
@@ -127,6 +134,8 @@ class TokenService:
                 now.timestamp()
             ),  # The number of seconds that have elapsed since January 1, 1970 (UTC).
         }
+        if self.embed_user:
+            payload.update(name=dto.name, login=dto.login, email=str(dto.email))
         token = await self.encode_token(payload)
         return AccessTokenDTO(token=token)
 
@@ -134,26 +143,41 @@ class TokenService:
         """
         Constructs the payload and generates an encoded refresh token.
 
+        Args:
+            dto (UserDTO): The user the token is issued to.
+
+        Returns:
+            RefreshTokenDTO: The encoded refresh token with its jti and expiration.
+        """
+        return await self.generate_refresh_token_for_user_id(dto.id)
+
+    async def generate_refresh_token_for_user_id(self, user_id: int) -> RefreshTokenDTO:
+        """
+        Generates a refresh token when only the user ID is known yet.
+
         The payload includes:
-        - `token_type`: Set to "access" (Note: Logic may imply this should be "refresh").
-        - `user`: A dictionary containing `user_id` and `user_name` from the DTO.
+        - `token_type`: Set to "refresh".
+        - `sub`: The user ID.
         - `exp`: Expiration timestamp based on `refresh_token_lifetime`.
         - `iat`: Issued-at timestamp.
+        - `jti`: Unique token identifier, stored in the user session.
 
         Args:
-            dto (UserDTO): The user data to embed in the token.
+            user_id (int): The ID of the user the token is issued to.
 
         Returns:
-            str: The encoded refresh token.
+            RefreshTokenDTO: The encoded refresh token with its jti and expiration.
         """
         now = datetime.now()
         expire = now + timedelta(seconds=self.refresh_token_lifetime)
         jti = str(uuid.uuid4())
         payload = {
             "token_type": "refresh",
-            "sub": str(dto.id),
+            "sub": str(user_id),
             "exp": int(expire.timestamp()),
-            "iat": int(now.timestamp()), #The number of seconds that have elapsed since January 1, 1970 (UTC).
+            "iat": int(
+                now.timestamp()
+            ),  # The number of seconds that have elapsed since January 1, 1970 (UTC).
             "jti": jti,
         }
         token = await self.encode_token(payload)
@@ -203,4 +227,4 @@ class TokenService:
         if payload.get("token_type") != "access":
             raise InvalidTokenError("Invalid token type. Expected 'access'.")
 
-        return payload
\ No newline at end of file
+        return payload
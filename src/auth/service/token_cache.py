@@ -0,0 +1,46 @@
+import hashlib
+from typing import Optional
+
+from src.config.jwt import settings as jwt_settings
+from src.libs.lru import CacheStats, LRUCache
+from src.metrics import cache_metrics
+
+
+class AccessTokenCache:
+    """
+    Cache of successfully verified access token payloads.
+
+    Clients reuse one access token for its whole lifetime, so repeated
+    signature checks of the same token are redundant. Entries are keyed by a
+    SHA-256 digest of the token, so raw tokens are never kept in memory, and
+    expire together with the token `exp` claim.
+
+    Returned payloads are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self._cache: LRUCache[bytes, dict] = LRUCache(maxsize)
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        return self._cache.get(self._key(token))
+
+    def set(self, token: str, payload: dict) -> None:
+        exp = payload.get("exp")
+        if exp is None:
+            # tokens without expiration are never cached
+            return
+        self._cache.set(self._key(token), payload, expires_at=float(exp))
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> CacheStats:
+        return self._cache.stats()
+
+
+access_token_cache = AccessTokenCache(jwt_settings.access_token_cache_size)
+cache_metrics.add("access_token", access_token_cache.stats)
@@ -1,10 +1,11 @@
-from typing import Optional
+from typing import Optional, Sequence
 
 from src.auth.dto import FindUserDTO
 from src.auth.entities import UserEntity
 from src.auth.dependencies.user.repository import IUserRepository
-from src.auth.dto import BaseUserDTO, CreateUserDTO, UserDTO
+from src.auth.dto import BaseUserDTO, CreateUserDTO, UserDTO, UserProfileDTO
 from src.auth.service.password import PasswordService
+from src.libs.trusted import construct_trusted
 
 
 class UserService:
@@ -30,7 +31,7 @@ class UserService:
         Returns:
             UserDTO: The created user without the password field.
         """
-        hashed_password = PasswordService.get_password_hash(dto.password)
+        hashed_password = await PasswordService.ahash(dto.password)
         user_entity = UserEntity(
             name=dto.name,
             login=dto.login,
@@ -38,11 +39,14 @@ class UserService:
             password=hashed_password,
         )
         created_user: BaseUserDTO = await self.repository.create(user_entity)
-        return UserDTO(
-            id=created_user.id,
-            name=created_user.name,
-            login=created_user.login,
-            email=created_user.email,
+        return construct_trusted(
+            UserDTO,
+            {
+                "id": created_user.id,
+                "name": created_user.name,
+                "login": created_user.login,
+                "email": created_user.email,
+            },
         )
 
     async def get(self, pk: int) -> Optional[BaseUserDTO]:
@@ -53,18 +57,67 @@ class UserService:
             pk (int): The database ID of the user.
 
         Returns:
-            Optional[BaseUserDTO]: The user DTO containing all fields (including password hash).
+            Optional[BaseUserDTO]: The user DTO, its password hash is None when
+                the user came from the cache.
         """
         return await self.repository.get(pk)
 
-    async def find(self, dto: FindUserDTO) -> Optional[BaseUserDTO]:
+    async def get_many(
+        self, ids: Sequence[int] = (), logins: Sequence[str] = ()
+    ) -> list[UserProfileDTO]:
+        """
+        Retrieves the profiles of many users at once, without their emails.
+
+        Cache misses cost one `IN (...)` query per chunk of ids and of logins
+        instead of a query per user.
+
+        Args:
+            ids (Sequence[int]): User IDs to look up.
+            logins (Sequence[str]): Usernames to look up.
+
+        Returns:
+            list[UserProfileDTO]: The users found, in request order (ids first),
+                each once. Unknown ids and logins are left out.
+        """
+        by_id = await self.repository.find_many("id", ids) if ids else {}
+        by_login = await self.repository.find_many("login", logins) if logins else {}
+
+        users = {}
+        for user in (
+            *(by_id.get(pk) for pk in ids),
+            *(by_login.get(login) for login in logins),
+        ):
+            if user is not None and user.id not in users:
+                users[user.id] = construct_trusted(
+                    UserProfileDTO,
+                    {"id": user.id, "name": user.name, "login": user.login},
+                )
+        return list(users.values())
+
+    async def find(
+        self, dto: FindUserDTO, with_password: bool = False
+    ) -> Optional[BaseUserDTO]:
         """
         Searches for a user based on specific criteria.
 
         Args:
             dto (FindUserDTO): The search criteria (e.g., login, email).
+            with_password (bool): Load the password hash from the database,
+                cached users have none.
 
         Returns:
             Optional[BaseUserDTO]: The matching user DTO or None.
         """
-        return await self.repository.find(dto)
+        return await self.repository.find(dto, with_password=with_password)
+
+    async def update_password_hash(self, pk: int, hashed_password: str) -> None:
+        """
+        Replaces the stored password hash of a user.
+
+        Used to upgrade hashes to the current scheme and cost parameters.
+
+        Args:
+            pk (int): The database ID of the user.
+            hashed_password (str): The new, already hashed, password.
+        """
+        await self.repository.update_password(pk, hashed_password)
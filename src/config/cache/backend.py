@@ -0,0 +1,17 @@
+from src.config.cache.settings import Settings, settings
+from src.libs.cache.base import Cache, CacheBackend
+from src.libs.cache.memory import MemoryCacheBackend
+from src.libs.cache.redis import RedisCacheBackend
+
+
+def build_backend(settings: Settings) -> CacheBackend:
+    if settings.cache_backend == "redis":
+        return RedisCacheBackend(
+            url=settings.cache_redis_url,
+            pool_size=settings.cache_redis_pool_size,
+            timeout=settings.cache_redis_timeout_seconds,
+        )
+    return MemoryCacheBackend(maxsize=settings.cache_memory_size)
+
+
+cache = Cache(build_backend(settings), namespace=settings.cache_namespace)
@@ -0,0 +1,34 @@
+from typing import Literal
+
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+
+class Settings(BaseSettings):
+    # "memory" is per worker process, use "redis" to share the cache between workers
+    cache_backend: Literal["memory", "redis"] = Field("memory", alias="CACHE_BACKEND")
+    # prefix of every key, lets several apps share one server
+    cache_namespace: str = Field("app", alias="CACHE_NAMESPACE")
+    # memory backend
+    cache_memory_size: int = Field(50_000, alias="CACHE_MEMORY_SIZE", ge=0)
+    # redis backend
+    cache_redis_url: str = Field("redis://localhost:6379/0", alias="CACHE_REDIS_URL")
+    cache_redis_pool_size: int = Field(10, alias="CACHE_REDIS_POOL_SIZE", ge=1)
+    cache_redis_timeout_seconds: float = Field(
+        0.5, alias="CACHE_REDIS_TIMEOUT_SECONDS", gt=0
+    )
+    # read-through user cache
+    user_cache_ttl_seconds: float = Field(60, alias="USER_CACHE_TTL_SECONDS", gt=0)
+    # "no such user" answers are kept shorter, registration clears them anyway
+    user_cache_negative_ttl_seconds: float = Field(
+        5, alias="USER_CACHE_NEGATIVE_TTL_SECONDS", ge=0
+    )
+    # sessions looked up by refresh token jti
+    session_cache_ttl_seconds: float = Field(
+        60, alias="SESSION_CACHE_TTL_SECONDS", ge=0
+    )
+    # ids of user agent strings, per worker process
+    user_agent_cache_size: int = Field(1000, alias="USER_AGENT_CACHE_SIZE", ge=0)
+
+
+settings = Settings()
@@ -1,24 +1,158 @@
+import asyncio
+import logging
 from asyncio import current_task
 from contextlib import asynccontextmanager
+from typing import Optional, Sequence
+from uuid import uuid4
 
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import (
-    AsyncSession,
+    AsyncEngine,
     create_async_engine,
     async_sessionmaker,
     async_scoped_session,
 )
 
 from src.config.database.settings import settings
+from src.config.metrics import settings as metrics_settings
+from src.libs.db_pool import InstrumentedAsyncPool, PoolStats
+from src.libs.query_stats import instrument_queries
+from src.libs.replicas import ReplicaSet, RoutingSession
+from src.libs.shards import ShardRouter
+from src.libs.unit_of_work import unit_of_work
+
+logger = logging.getLogger(__name__)
+
+
+def _pgbouncer_statement_name() -> str:
+    # PgBouncer in transaction mode may run two clients' statements on one
+    # server connection, unique names keep their prepared statements apart
+    return f"__asyncpg_{uuid4()}__"
 
 
 class DatabaseHelper:
-    """Class helper for work with database session"""
+    """
+    Class helper for work with database session
 
-    def __init__(self, url: str, echo: bool = False):
-        self.engine = create_async_engine(url=url, echo=echo)
+    Args:
+        url: Database URL.
+        echo: Log every statement.
+        pool_size: Persistent connections kept by the pool.
+        max_overflow: Extra connections opened under load and closed on checkin.
+        pool_timeout: Seconds a checkout waits for a free connection.
+        pool_recycle: Connections older than this many seconds are replaced.
+        pool_pre_ping: Test connections with a round trip on checkout.
+        statement_cache_size: Prepared statements cached per asyncpg connection.
+        pgbouncer: Disable the prepared statement caches and use unique
+            statement names, required behind PgBouncer in transaction mode.
+        replica_urls: Read replicas, created with the same pool settings.
+            Repository reads go to them until the session writes, see
+            `RoutingSession`.
+        replica_max_lag: Replicas lagging more seconds than this are skipped.
+        replica_check_interval: Seconds between replica health checks.
+        shard_urls: Further databases users are sharded across, `url` is
+            shard 0. See `ShardRouter`.
+        query_stats: Count and time the statements of every engine per
+            request, see `track_queries`.
+        slow_query_threshold: Seconds after which a statement is logged as
+            slow, None disables the log. Needs `query_stats`.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        echo: bool = False,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_timeout: float = 30.0,
+        pool_recycle: int = -1,
+        pool_pre_ping: bool = False,
+        statement_cache_size: int = 100,
+        pgbouncer: bool = False,
+        replica_urls: Sequence[str] = (),
+        replica_max_lag: float = 1.0,
+        replica_check_interval: float = 5.0,
+        shard_urls: Sequence[str] = (),
+        query_stats: bool = False,
+        slow_query_threshold: Optional[float] = None,
+    ):
+        self._engine_options = dict(
+            echo=echo,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=pool_pre_ping,
+            statement_cache_size=statement_cache_size,
+            pgbouncer=pgbouncer,
+        )
+        self.engine = self._create_engine(url, **self._engine_options)
+        self.replicas = ReplicaSet(
+            [
+                self._create_engine(replica_url, **self._engine_options)
+                for replica_url in replica_urls
+            ],
+            max_lag=replica_max_lag,
+            check_interval=replica_check_interval,
+        )
+        self.shards = ShardRouter(
+            [self.engine]
+            + [
+                self._create_engine(shard_url, **self._engine_options)
+                for shard_url in shard_urls
+            ]
+        )
+        if query_stats:
+            for engine in self.engines().values():
+                instrument_queries(engine, slow_query_threshold)
 
         self.session_factory = async_sessionmaker(
-            bind=self.engine, autoflush=False, autocommit=False, expire_on_commit=False
+            bind=self.engine,
+            sync_session_class=RoutingSession,
+            replicas=self.replicas,
+            shards=self.shards,
+            autoflush=False,
+            autocommit=False,
+            expire_on_commit=False,
+        )
+
+    @staticmethod
+    def _create_engine(
+        url: str,
+        echo: bool,
+        pool_size: int,
+        max_overflow: int,
+        pool_timeout: float,
+        pool_recycle: int,
+        pool_pre_ping: bool,
+        statement_cache_size: int,
+        pgbouncer: bool,
+    ):
+        connect_args = {}
+        if make_url(url).get_driver_name() == "asyncpg":
+            if pgbouncer:
+                connect_args = {
+                    "statement_cache_size": 0,
+                    "prepared_statement_cache_size": 0,
+                    "prepared_statement_name_func": _pgbouncer_statement_name,
+                }
+            else:
+                # asyncpg's own cache and SQLAlchemy's cache on top of it
+                connect_args = {
+                    "statement_cache_size": statement_cache_size,
+                    "prepared_statement_cache_size": statement_cache_size,
+                }
+
+        return create_async_engine(
+            url=url,
+            echo=echo,
+            poolclass=InstrumentedAsyncPool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=pool_pre_ping,
+            connect_args=connect_args,
         )
 
     def get_scope_session(self):
@@ -28,28 +162,94 @@ class DatabaseHelper:
 
     @asynccontextmanager
     async def get_db_session(self):
-        from sqlalchemy import exc
-
-        session: AsyncSession = self.session_factory()
-        try:
+        """
+        Opens a session whose work is committed once when the block exits,
+        or rolled back if it raises. For code outside of a request.
+        """
+        async with self.session_factory() as session, unit_of_work(session):
             yield session
-        except exc.SQLAlchemyError:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
 
     async def get_session(self):
-        from sqlalchemy import exc
+        """
+        Request-scoped unit of work.
 
-        session: AsyncSession = self.session_factory()
-        try:
+        Repositories only execute statements in the request's transaction,
+        it is committed once after the endpoint returns and rolled back if
+        it raises, so multi-write flows like login are atomic and cost one
+        commit.
+        """
+        async with self.session_factory() as session, unit_of_work(session):
             yield session
-        except exc.SQLAlchemyError:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
 
+    async def warm_up(self, connections: Optional[int] = None) -> int:
+        """
+        Opens pool connections ahead of the first requests.
 
-db_helper = DatabaseHelper(settings.database_url, settings.db_echo_log)
+        Connections are opened concurrently and returned to the pool, at most
+        `pool_size` of them since overflow connections are closed on checkin.
+        Failures are logged, the pool then fills lazily as before.
+
+        Args:
+            connections: Connections to open, defaults to the pool size.
+
+        Returns:
+            The number of connections opened.
+        """
+        pool_size = self.engine.pool.size()
+        count = pool_size if connections is None else min(connections, pool_size)
+        opened = [self.engine.connect() for _ in range(count)]
+        results = await asyncio.gather(
+            *(connection.start() for connection in opened), return_exceptions=True
+        )
+        warmed = 0
+        for connection, result in zip(opened, results):
+            if isinstance(result, BaseException):
+                logger.warning("Database pool warm-up failed: %r", result)
+                continue
+            warmed += 1
+            await connection.close()
+        return warmed
+
+    def pool_stats(self) -> PoolStats:
+        return self.engine.pool.stats()
+
+    def engines(self) -> dict[str, AsyncEngine]:
+        """Every engine by name: "primary", "replica1", ... and "shard1", ..."""
+        engines = {"primary": self.engine}
+        engines.update(
+            (f"replica{i}", engine)
+            for i, engine in enumerate(self.replicas.engines, start=1)
+        )
+        engines.update(
+            (f"shard{i}", engine)
+            for i, engine in enumerate(self.shards.engines[1:], start=1)
+        )
+        return engines
+
+    async def dispose(self) -> None:
+        """Stops the replica health checks and closes every pooled connection."""
+        await self.replicas.dispose()
+        for engine in self.shards.engines:
+            await engine.dispose()
+
+
+db_helper = DatabaseHelper(
+    settings.database_url,
+    settings.db_echo_log,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    statement_cache_size=settings.db_statement_cache_size,
+    pgbouncer=settings.db_pgbouncer,
+    replica_urls=settings.db_replica_urls,
+    replica_max_lag=settings.db_replica_max_lag_seconds,
+    replica_check_interval=settings.db_replica_check_interval_seconds,
+    shard_urls=settings.db_shard_urls,
+    # Server-Timing reads its `db` phase from the same hooks
+    query_stats=settings.db_query_stats or metrics_settings.server_timing,
+    slow_query_threshold=settings.db_slow_query_ms / 1000
+    if settings.db_slow_query_ms
+    else None,
+)
@@ -4,4 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.config.database.engine import db_helper
 
-ISession: type[AsyncSession] = Annotated[AsyncSession, Depends(db_helper.get_session)]
+# committed when the endpoint returns, before the response is sent
+ISession: type[AsyncSession] = Annotated[
+    AsyncSession, Depends(db_helper.get_session, scope="function")
+]
@@ -1,5 +1,7 @@
-from pydantic import PostgresDsn, Field
-from pydantic_settings import BaseSettings
+from typing import Annotated
+
+from pydantic import PostgresDsn, Field, field_validator
+from pydantic_settings import BaseSettings, NoDecode
 
 
 class Settings(BaseSettings):
@@ -15,6 +17,50 @@ class Settings(BaseSettings):
     db_echo_log: bool = Field(False, alias="DB_ECHO_LOG")
     # run auto-migrate
     db_run_auto_migrate: bool = Field(False, alias="DB_RUN_AUTO_MIGRATE")
+    # connection pool, per worker process
+    db_pool_size: int = Field(5, alias="DB_POOL_SIZE", ge=1)
+    db_max_overflow: int = Field(10, alias="DB_MAX_OVERFLOW", ge=0)
+    db_pool_timeout: float = Field(30.0, alias="DB_POOL_TIMEOUT", gt=0)
+    # seconds after which a connection is replaced, -1 keeps them forever
+    db_pool_recycle: int = Field(1800, alias="DB_POOL_RECYCLE")
+    # test connections on checkout, costs a round trip per checkout
+    db_pool_pre_ping: bool = Field(False, alias="DB_POOL_PRE_PING")
+    # connections opened during startup, defaults to the pool size
+    db_pool_warmup: int | None = Field(None, alias="DB_POOL_WARMUP", ge=0)
+    # prepared statements cached per connection by asyncpg
+    db_statement_cache_size: int = Field(100, alias="DB_STATEMENT_CACHE_SIZE", ge=0)
+    # behind PgBouncer in transaction mode, disables prepared statement caching
+    db_pgbouncer: bool = Field(False, alias="DB_PGBOUNCER")
+    # read replicas, comma separated DSNs
+    db_replica_urls: Annotated[list[str], NoDecode] = Field([], alias="DB_REPLICA_URLS")
+    # replicas lagging more are skipped until they catch up
+    db_replica_max_lag_seconds: float = Field(
+        1.0, alias="DB_REPLICA_MAX_LAG_SECONDS", ge=0
+    )
+    db_replica_check_interval_seconds: float = Field(
+        5.0, alias="DB_REPLICA_CHECK_INTERVAL_SECONDS", gt=0
+    )
+    # further databases users are sharded across, comma separated DSNs,
+    # the database above is shard 0. See `python -m bin.manage_shards`
+    db_shard_urls: Annotated[list[str], NoDecode] = Field([], alias="DB_SHARD_URLS")
+    # coalesce concurrent user/session lookups of a worker into batched queries
+    db_batch_loads: bool = Field(False, alias="DB_BATCH_LOADS")
+    # how long a batch waits for more lookups, 0 batches one event loop iteration
+    db_batch_window_ms: float = Field(1.0, alias="DB_BATCH_WINDOW_MS", ge=0)
+    db_batch_max_size: int = Field(100, alias="DB_BATCH_MAX_SIZE", ge=1)
+    # per-request query counts, slow query log and repeated query warnings
+    db_query_stats: bool = Field(True, alias="DB_QUERY_STATS")
+    # statements slower than this are logged with their parameter types, 0 disables
+    db_slow_query_ms: float = Field(200.0, alias="DB_SLOW_QUERY_MS", ge=0)
+    # executions of one statement per request before it is flagged as N+1
+    db_query_repeat_threshold: int = Field(10, alias="DB_QUERY_REPEAT_THRESHOLD", ge=1)
+
+    @field_validator("db_replica_urls", "db_shard_urls", mode="before")
+    @classmethod
+    def split_urls(cls, value):
+        if isinstance(value, str):
+            return [url.strip() for url in value.split(",") if url.strip()]
+        return value
 
     @property
     def database_url(self) -> PostgresDsn | str:
@@ -10,6 +10,11 @@ class Settings(BaseSettings):
     refresh_token_rotate_min_lifetime: int = Field(
         ..., alias="REFRESH_TOKEN_ROTATE_MIN_LIFETIME"
     )
+    # embed public user fields in access tokens so ICurrentUser skips the database,
+    # profile changes become visible to other requests after the token is renewed
+    access_token_embed_user: bool = Field(False, alias="ACCESS_TOKEN_EMBED_USER")
+    # verified access tokens kept in memory, 0 disables the cache
+    access_token_cache_size: int = Field(10_000, alias="ACCESS_TOKEN_CACHE_SIZE", ge=0)
 
 
 settings = Settings()
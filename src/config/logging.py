@@ -54,6 +54,8 @@ def make_logger_conf(*confs, log_level, json_log):
         },
         "loggers": {
             "": {"handlers": ["default"], "level": log_level, "propagate": False},
+            # named, so the module loggers below it survive disable_existing_loggers
+            "src": {"handlers": ["default"], "level": log_level, "propagate": False},
         },
     }
     for conf in confs:
@@ -0,0 +1,28 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+
+class Settings(BaseSettings):
+    # Prometheus metrics at `path`, with several workers also set
+    # PROMETHEUS_MULTIPROC_DIR in their environment, see src/metrics.py
+    enabled: bool = Field(True, alias="METRICS_ENABLED")
+    path: str = Field("/metrics", alias="METRICS_PATH")
+    # how often the database pool, worker pool, admission control and cache
+    # metrics are refreshed
+    pool_interval_seconds: float = Field(
+        5.0, alias="METRICS_POOL_INTERVAL_SECONDS", gt=0
+    )
+    # event loop lag, sampled every interval into event_loop_lag_seconds
+    loop_monitor: bool = Field(True, alias="LOOP_MONITOR_ENABLED")
+    loop_lag_interval_ms: float = Field(100.0, alias="LOOP_LAG_INTERVAL_MS", gt=0)
+    # with APP_DEBUG, the stack of code holding the loop longer than this is
+    # logged with the request it serves, 0 disables
+    loop_block_threshold_ms: float = Field(100.0, alias="LOOP_BLOCK_THRESHOLD_MS", ge=0)
+    # Server-Timing header on every response with the time spent hashing
+    # passwords, on JWTs, in the database and serializing, see
+    # src/libs/server_timing.py. Tells clients how long the server worked
+    # on their credentials, enable it for profiling only
+    server_timing: bool = Field(False, alias="SERVER_TIMING_ENABLED")
+
+
+settings = Settings()
@@ -0,0 +1,33 @@
+from typing import Literal
+
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+
+class Settings(BaseSettings):
+    # algorithm used for new hashes, hashes of other schemes are rehashed on login
+    hash_scheme: Literal["argon2", "bcrypt"] = Field(
+        "argon2", alias="PASSWORD_HASH_SCHEME"
+    )
+    # bcrypt cost
+    bcrypt_rounds: int = Field(12, alias="PASSWORD_BCRYPT_ROUNDS", ge=4, le=31)
+    # argon2id cost
+    argon2_time_cost: int = Field(3, alias="PASSWORD_ARGON2_TIME_COST", ge=1)
+    argon2_memory_cost: int = Field(65536, alias="PASSWORD_ARGON2_MEMORY_COST", ge=8)
+    argon2_parallelism: int = Field(4, alias="PASSWORD_ARGON2_PARALLELISM", ge=1)
+    # worker pool used to run hashing off the event loop
+    hash_executor: Literal["thread", "process"] = Field(
+        "thread", alias="PASSWORD_HASH_EXECUTOR"
+    )
+    hash_workers: int = Field(4, alias="PASSWORD_HASH_WORKERS", ge=1)
+    # admission control in front of the pool, concurrency defaults to the pool size
+    admission_concurrency: int | None = Field(
+        None, alias="PASSWORD_ADMISSION_CONCURRENCY", ge=1
+    )
+    admission_queue_size: int = Field(64, alias="PASSWORD_ADMISSION_QUEUE_SIZE", ge=0)
+    admission_max_wait_seconds: float = Field(
+        2.0, alias="PASSWORD_ADMISSION_MAX_WAIT_SECONDS", gt=0
+    )
+
+
+settings = Settings()
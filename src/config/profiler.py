@@ -0,0 +1,25 @@
+from typing import Annotated
+
+from pydantic import Field, field_validator
+from pydantic_settings import BaseSettings, NoDecode
+
+
+class Settings(BaseSettings):
+    # requests carrying an X-Profile header or ?profile= flag signed with one
+    # of these comma separated keys are profiled, see bin/sign_profile_request.py.
+    # With APP_DEBUG any flagged request is profiled, unsigned
+    keys: Annotated[list[str], NoDecode] = Field([], alias="PROFILER_KEYS")
+    # where the folded stacks are written, one file per profiled request
+    directory: str = Field("/tmp/profiles", alias="PROFILER_DIR")
+    # time between two stack samples
+    interval_ms: float = Field(5.0, alias="PROFILER_INTERVAL_MS", gt=0)
+
+    @field_validator("keys", mode="before")
+    @classmethod
+    def split_keys(cls, value):
+        if isinstance(value, str):
+            return [key.strip() for key in value.split(",") if key.strip()]
+        return value
+
+
+settings = Settings()
@@ -0,0 +1,25 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+
+class Settings(BaseSettings):
+    # background deletion of expired rows from user_sessions
+    enabled: bool = Field(True, alias="SESSION_REAPER_ENABLED")
+    # pause between two runs
+    interval_seconds: float = Field(
+        300.0, alias="SESSION_REAPER_INTERVAL_SECONDS", gt=0
+    )
+    # rows deleted per statement, keeps locks and WAL bursts short
+    batch_size: int = Field(1000, alias="SESSION_REAPER_BATCH_SIZE", ge=1)
+    # pause between two batches of the same run
+    batch_pause_seconds: float = Field(
+        0.1, alias="SESSION_REAPER_BATCH_PAUSE_SECONDS", ge=0
+    )
+    # upper bound of batches per run, the rest is left for the next run
+    max_batches: int = Field(100, alias="SESSION_REAPER_MAX_BATCHES", ge=1)
+    # when user_sessions is partitioned: days of partitions kept ready beyond
+    # the refresh token lifetime, expired partitions are dropped instead
+    partition_ahead_days: int = Field(2, alias="SESSION_PARTITION_AHEAD_DAYS", ge=1)
+
+
+settings = Settings()
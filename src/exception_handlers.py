@@ -2,7 +2,12 @@ from fastapi import Request, status
 from fastapi.responses import JSONResponse
 
 from src.auth.exceptions.token import AccessTokenMissing, RefreshTokenMissing
-from src.libs.exceptions import NotFound, AlreadyExists, PaginationError
+from src.libs.exceptions import (
+    NotFound,
+    AlreadyExists,
+    PaginationError,
+    ServiceOverloaded,
+)
 from src.auth.exceptions.token import InvalidSignatureError
 from src.auth.exceptions.auth import CredentialsException
 
@@ -77,6 +82,19 @@ async def refresh_token_missing_handler(request: Request, exc: RefreshTokenMissi
     )
 
 
+async def service_overloaded_exception_handler(
+    request: Request, exc: ServiceOverloaded
+):
+    """
+    Handles ServiceOverloaded exceptions, returning a 503 response with Retry-After.
+    """
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc) or "Service is overloaded, retry later."},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 exception_handlers = {
     NotFound: not_found_exception_handler,
     AlreadyExists: already_exists_exception_handler,
@@ -85,4 +103,5 @@ exception_handlers = {
     CredentialsException: credentials_exception_handler,
     AccessTokenMissing: access_token_missing_handler,
     RefreshTokenMissing: refresh_token_missing_handler,
+    ServiceOverloaded: service_overloaded_exception_handler,
 }
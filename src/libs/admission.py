@@ -0,0 +1,117 @@
+import asyncio
+import math
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from src.libs.exceptions import ServiceOverloaded
+
+
+@dataclass
+class AdmissionStats:
+    """
+    Snapshot of an AdmissionController state.
+
+    Attributes:
+        active: Callers currently holding a slot.
+        waiting: Callers currently in the wait queue.
+        admitted: Callers that got a slot, directly or after waiting.
+        queued: Callers that had to wait for a slot.
+        shed: Callers rejected because the queue was full or the wait timed out.
+    """
+
+    active: int
+    waiting: int
+    admitted: int
+    queued: int
+    shed: int
+
+
+class AdmissionController:
+    """
+    Concurrency limiter with a bounded FIFO wait queue.
+
+    At most `max_concurrency` callers run at once, up to `max_queue` more wait
+    for at most `max_wait` seconds. Everyone else fails fast with
+    ServiceOverloaded, so a burst cannot grow latency without bound.
+
+    Usage:
+        async with controller.admit():
+            ...
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, max_wait: float) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._admitted = 0
+        self._queued = 0
+        self._shed = 0
+
+    @property
+    def retry_after(self) -> int:
+        """Seconds a shed client should wait before retrying."""
+        return max(1, math.ceil(self.max_wait))
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        await self._acquire()
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self) -> None:
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            self._admitted += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self._shed += 1
+            raise ServiceOverloaded(self.retry_after)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._queued += 1
+        try:
+            await asyncio.wait({waiter}, timeout=self.max_wait)
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+
+        if not waiter.done():
+            self._abandon(waiter)
+            self._shed += 1
+            raise ServiceOverloaded(self.retry_after)
+
+        # the releasing caller handed its slot over, _active is unchanged
+        self._admitted += 1
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        if waiter.done():
+            # a slot was handed over right before we gave up, pass it on
+            self._release()
+        else:
+            waiter.cancel()
+            self._waiters.remove(waiter)
+
+    def _release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    def stats(self) -> AdmissionStats:
+        return AdmissionStats(
+            active=self._active,
+            waiting=len(self._waiters),
+            admitted=self._admitted,
+            queued=self._queued,
+            shed=self._shed,
+        )
@@ -0,0 +1,123 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import Mapping, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class CacheError(Exception):
+    """Raised when a cache backend fails to execute a command"""
+
+
+class CacheBackend(ABC):
+    """
+    Interface of an async key-value cache storing bytes.
+
+    Keys are used as given, namespacing is done by `Cache`.
+    """
+
+    async def connect(self) -> None:
+        """Opens connections, called from the application lifespan."""
+
+    async def close(self) -> None:
+        """Releases connections, called from the application lifespan."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Returns the stored value or None."""
+
+    @abstractmethod
+    async def mget(self, keys: Sequence[str]) -> list[Optional[bytes]]:
+        """Returns stored values in the order of `keys`, None for missing ones."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Stores a value, `ttl` is in seconds, None means no expiration."""
+
+    @abstractmethod
+    async def set_many(
+        self, items: Mapping[str, bytes], ttl: Optional[float] = None
+    ) -> None:
+        """Stores many values with the same `ttl`, in one round trip if remote."""
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        """Removes keys, missing keys are ignored."""
+
+
+class Cache:
+    """
+    Namespaced client over a CacheBackend.
+
+    A cache is an optimisation, so backend failures are logged and reported
+    as misses instead of failing the request.
+
+    Usage:
+        users = cache.namespace("user")
+        await users.set("1", b"...", ttl=60)  # stored as "<prefix>:user:1"
+    """
+
+    def __init__(self, backend: CacheBackend, namespace: str = "") -> None:
+        self.backend = backend
+        self.prefix = f"{namespace}:" if namespace else ""
+
+    def namespace(self, name: str) -> "Cache":
+        child = Cache(self.backend)
+        child.prefix = f"{self.prefix}{name}:"
+        return child
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    async def connect(self) -> None:
+        try:
+            await self.backend.connect()
+        except (CacheError, OSError) as e:
+            # start without the cache, commands reconnect on their own
+            logger.error("Cache connect failed, starting degraded to misses: %s", e)
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            return await self.backend.get(self._key(key))
+        except (CacheError, OSError) as e:
+            logger.warning("Cache get failed: %s", e)
+            return None
+
+    async def mget(self, keys: Sequence[str]) -> list[Optional[bytes]]:
+        if not keys:
+            return []
+        try:
+            return await self.backend.mget([self._key(key) for key in keys])
+        except (CacheError, OSError) as e:
+            logger.warning("Cache mget failed: %s", e)
+            return [None] * len(keys)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        try:
+            await self.backend.set(self._key(key), value, ttl)
+        except (CacheError, OSError) as e:
+            logger.warning("Cache set failed: %s", e)
+
+    async def set_many(
+        self, items: Mapping[str, bytes], ttl: Optional[float] = None
+    ) -> None:
+        if not items:
+            return
+        try:
+            await self.backend.set_many(
+                {self._key(key): value for key, value in items.items()}, ttl
+            )
+        except (CacheError, OSError) as e:
+            logger.warning("Cache set_many failed: %s", e)
+
+    async def delete(self, *keys: str) -> None:
+        if not keys:
+            return
+        try:
+            await self.backend.delete(*(self._key(key) for key in keys))
+        except (CacheError, OSError) as e:
+            # a failed invalidation leaves stale data until the ttl passes
+            logger.error("Cache delete failed: %s", e)
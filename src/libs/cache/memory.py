@@ -0,0 +1,41 @@
+from typing import Mapping, Optional, Sequence
+
+from src.libs.cache.base import CacheBackend
+from src.libs.lru import CacheStats, LRUCache
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-process LRU backend.
+
+    Fast and dependency free, but every worker process has its own copy, so
+    invalidations done by one worker are not seen by the others.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self._cache: LRUCache[str, bytes] = LRUCache(maxsize)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    async def mget(self, keys: Sequence[str]) -> list[Optional[bytes]]:
+        return [self._cache.get(key) for key in keys]
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        self._cache.set(key, value, ttl=ttl)
+
+    async def set_many(
+        self, items: Mapping[str, bytes], ttl: Optional[float] = None
+    ) -> None:
+        for key, value in items.items():
+            self._cache.set(key, value, ttl=ttl)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._cache.delete(key)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> CacheStats:
+        return self._cache.stats()
@@ -0,0 +1,203 @@
+import asyncio
+from typing import Awaitable, Callable, Mapping, Optional, Sequence, TypeVar, Union
+from urllib.parse import unquote, urlparse
+
+from src.libs.cache.base import CacheBackend, CacheError
+
+RespValue = Union[None, int, bytes, str, list]
+Command = Sequence[Union[str, bytes, int]]
+T = TypeVar("T")
+
+
+def encode_command(*args: Union[str, bytes, int]) -> bytes:
+    """Encodes a command as a RESP array of bulk strings."""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> RespValue:
+    """Reads a single RESP2 reply."""
+    line = await reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("Connection closed by server")
+    kind, body = line[:1], line[1:-2]
+
+    if kind == b"+":
+        return body.decode()
+    if kind == b"-":
+        raise CacheError(body.decode())
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        length = int(body)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        length = int(body)
+        if length < 0:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+    raise CacheError(f"Unexpected reply: {line!r}")
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    async def execute(self, *args: Union[str, bytes, int]) -> RespValue:
+        self.writer.write(encode_command(*args))
+        await self.writer.drain()
+        return await read_reply(self.reader)
+
+    async def pipeline(self, commands: Sequence[Command]) -> list[RespValue]:
+        self.writer.write(b"".join(encode_command(*args) for args in commands))
+        await self.writer.drain()
+        replies, error = [], None
+        for _ in commands:
+            # read every reply even after an error one, to keep the stream in sync
+            try:
+                replies.append(await read_reply(self.reader))
+            except CacheError as e:
+                replies.append(None)
+                error = error or e
+        if error is not None:
+            raise error
+        return replies
+
+    async def close(self) -> None:
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except OSError:
+            pass
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Backend speaking the Redis protocol (RESP2) over asyncio streams.
+
+    Works with Redis and compatible servers (Valkey, KeyDB, Dragonfly).
+    Keeps a small pool of connections, each one runs a single command at a
+    time, so `pool_size` bounds the number of concurrent commands.
+
+    Args:
+        url: `redis://[:password@]host[:port][/db]`.
+        pool_size: Max number of open connections.
+        timeout: Seconds to wait for a connection or a reply.
+    """
+
+    def __init__(self, url: str, pool_size: int = 10, timeout: float = 1.0) -> None:
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.username = unquote(parsed.username) if parsed.username else None
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._idle: list[_Connection] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def _open(self) -> _Connection:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        connection = _Connection(reader, writer)
+        try:
+            if self.password:
+                credentials = (
+                    (self.username, self.password)
+                    if self.username
+                    else (self.password,)
+                )
+                await connection.execute("AUTH", *credentials)
+            if self.db:
+                await connection.execute("SELECT", self.db)
+        except BaseException:
+            # a rejected AUTH/SELECT or a timeout, the socket is of no use
+            await connection.close()
+            raise
+        return connection
+
+    async def connect(self) -> None:
+        self._slots = asyncio.Semaphore(self.pool_size)
+        connection = await asyncio.wait_for(self._open(), self.timeout)
+        try:
+            await asyncio.wait_for(connection.execute("PING"), self.timeout)
+        except BaseException:
+            await connection.close()
+            raise
+        self._idle.append(connection)
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            await connection.close()
+
+    async def execute(self, *args: Union[str, bytes, int]) -> RespValue:
+        return await self._run(args[0], lambda connection: connection.execute(*args))
+
+    async def pipeline(self, commands: Sequence[Command]) -> list[RespValue]:
+        """Sends `commands` in one write and reads their replies, one round trip."""
+        return await self._run(
+            commands[0][0], lambda connection: connection.pipeline(commands)
+        )
+
+    async def _run(
+        self, name: Union[str, bytes, int], call: Callable[[_Connection], Awaitable[T]]
+    ) -> T:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.pool_size)
+
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else None
+            try:
+                if connection is None:
+                    connection = await asyncio.wait_for(self._open(), self.timeout)
+                result = await asyncio.wait_for(call(connection), self.timeout)
+            except CacheError:
+                # error replies leave the connection usable, unless it was
+                # never opened because AUTH or SELECT was rejected
+                if connection is not None:
+                    self._idle.append(connection)
+                raise
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                if connection is not None:
+                    await connection.close()
+                raise CacheError(f"{name} failed: {e!r}") from e
+            except BaseException:
+                # cancelled mid-command, the reply stream is out of sync
+                if connection is not None:
+                    await connection.close()
+                raise
+            self._idle.append(connection)
+            return result
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.execute("GET", key)
+
+    async def mget(self, keys: Sequence[str]) -> list[Optional[bytes]]:
+        return await self.execute("MGET", *keys)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        if ttl is None:
+            await self.execute("SET", key, value)
+        else:
+            await self.execute("SET", key, value, "PX", max(1, int(ttl * 1000)))
+
+    async def set_many(
+        self, items: Mapping[str, bytes], ttl: Optional[float] = None
+    ) -> None:
+        # MSET takes no expiration, pipeline one SET per key instead
+        expiry = () if ttl is None else ("PX", max(1, int(ttl * 1000)))
+        await self.pipeline(
+            [("SET", key, value, *expiry) for key, value in items.items()]
+        )
+
+    async def delete(self, *keys: str) -> None:
+        await self.execute("DEL", *keys)
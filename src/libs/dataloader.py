@@ -0,0 +1,145 @@
+import asyncio
+from dataclasses import dataclass
+from typing import (
+    Awaitable,
+    Callable,
+    Generic,
+    Hashable,
+    Iterable,
+    Mapping,
+    Optional,
+    TypeVar,
+)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass
+class LoaderStats:
+    """
+    Snapshot of a DataLoader's counters.
+
+    Attributes:
+        loads: `load()` calls since the loader was created.
+        coalesced: Loads answered by a lookup of the same key that was
+            already queued or running.
+        batches: Calls of the batch function.
+        keys: Keys passed to the batch function, summed over all batches.
+    """
+
+    loads: int
+    coalesced: int
+    batches: int
+    keys: int
+
+    @property
+    def avg_batch_size(self) -> float:
+        return self.keys / self.batches if self.batches else 0.0
+
+
+class DataLoader(Generic[K, V]):
+    """
+    Coalesces concurrent lookups by key into batched calls.
+
+    Keys loaded within `window` seconds of the first one are collected and
+    resolved by a single `batch_fn(keys)` call, which returns the values it
+    found by key. Missing keys resolve to None. A batch is sent early once it
+    holds `max_batch_size` keys. A key that is already queued or being
+    loaded is not loaded again, its callers share the running lookup.
+
+    The loader is shared by all requests of a worker process, `batch_fn`
+    must therefore read outside of any request's transaction.
+
+    Args:
+        batch_fn: Loads many keys at once.
+        window: Seconds to wait for more keys, 0 batches the keys loaded
+            within the same event loop iteration.
+        max_batch_size: Max keys per `batch_fn` call.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list[K]], Awaitable[Mapping[K, V]]],
+        window: float = 0.0,
+        max_batch_size: int = 100,
+    ) -> None:
+        self.batch_fn = batch_fn
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._queued: dict[K, asyncio.Future] = {}
+        self._running: dict[K, asyncio.Future] = {}
+        self._timer: Optional[asyncio.Handle] = None
+        self._tasks: set[asyncio.Task] = set()
+        self._loads = 0
+        self._coalesced = 0
+        self._batches = 0
+        self._keys = 0
+
+    async def load(self, key: K) -> Optional[V]:
+        """Returns the value of `key`, None if `batch_fn` did not find it."""
+        self._loads += 1
+        future = self._queued.get(key) or self._running.get(key)
+        if future is not None:
+            self._coalesced += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._queued[key] = future
+            if len(self._queued) >= self.max_batch_size:
+                self._dispatch()
+            elif self._timer is None:
+                self._timer = (
+                    loop.call_later(self.window, self._dispatch)
+                    if self.window
+                    else loop.call_soon(self._dispatch)
+                )
+        # a caller giving up must not cancel the lookup for the others
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[K]) -> list[Optional[V]]:
+        """Returns the values of `keys` in order, None for those not found."""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def stats(self) -> LoaderStats:
+        return LoaderStats(
+            loads=self._loads,
+            coalesced=self._coalesced,
+            batches=self._batches,
+            keys=self._keys,
+        )
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._queued = self._queued, {}
+        if not batch:
+            return
+        self._running.update(batch)
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        # the loop only keeps weak references to tasks
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: dict[K, asyncio.Future]) -> None:
+        self._batches += 1
+        self._keys += len(batch)
+        try:
+            values = await self.batch_fn(list(batch))
+        except asyncio.CancelledError:
+            for future in batch.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for key, future in batch.items():
+                if not future.done():
+                    future.set_result(values.get(key))
+        finally:
+            for key, future in batch.items():
+                if self._running.get(key) is future:
+                    del self._running[key]
@@ -0,0 +1,82 @@
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+@dataclass
+class PoolStats:
+    """
+    Snapshot of a database connection pool.
+
+    Attributes:
+        size: Configured number of persistent connections.
+        max_overflow: Connections allowed on top of `size` under load.
+        checked_in: Idle connections in the pool.
+        checked_out: Connections currently in use.
+        overflow: Connections open beyond `size`, negative while the pool
+            has not opened all of its persistent connections yet.
+        checkouts: Checkouts since the pool was created.
+        timeouts: Checkouts that gave up after `pool_timeout`.
+        total_wait_seconds: Sum of time checkouts spent waiting for a
+            connection, opening a new one included.
+        max_wait_seconds: Longest single checkout.
+    """
+
+    size: int
+    max_overflow: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    total_wait_seconds: float
+    max_wait_seconds: float
+
+    @property
+    def avg_wait_seconds(self) -> float:
+        return self.total_wait_seconds / self.checkouts if self.checkouts else 0.0
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """
+    `AsyncAdaptedQueuePool` that measures how long checkouts wait.
+
+    Pass it as `poolclass` to `create_async_engine`, the counters live on the
+    pool and are reset when the engine is disposed.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._checkouts = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self._timeouts += 1
+            raise
+        finally:
+            wait = time.perf_counter() - started_at
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+        self._checkouts += 1
+        return connection
+
+    def stats(self) -> PoolStats:
+        return PoolStats(
+            size=self.size(),
+            max_overflow=self._max_overflow,
+            checked_in=self.checkedin(),
+            checked_out=self.checkedout(),
+            overflow=self.overflow(),
+            checkouts=self._checkouts,
+            timeouts=self._timeouts,
+            total_wait_seconds=self._total_wait,
+            max_wait_seconds=self._max_wait,
+        )
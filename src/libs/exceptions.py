@@ -8,3 +8,11 @@ class NotFound(Exception):
 
 class PaginationError(Exception):
     """Raised when pagination limit or offset incorrect"""
+
+
+class ServiceOverloaded(Exception):
+    """Raised when a resource is saturated and the request is rejected"""
+
+    def __init__(self, retry_after: int = 1, *args) -> None:
+        super().__init__(*args)
+        self.retry_after = retry_after
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+import weakref
+from types import FrameType
+from typing import Optional
+
+from prometheus_client import Histogram
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# frames below the callback the loop runs belong to the event loop
+_HANDLE_RUN = asyncio.events.Handle._run.__code__
+
+
+def _format_callback_stack(frame: FrameType) -> str:
+    frames = []
+    while frame is not None and frame.f_code is not _HANDLE_RUN:
+        frames.append((frame, frame.f_lineno))
+        frame = frame.f_back
+    return "".join(
+        traceback.format_list(traceback.StackSummary.extract(reversed(frames)))
+    )
+
+
+class LoopMonitor:
+    """
+    Measures how late the event loop runs its callbacks.
+
+    A task sleeps `interval` seconds at a time and observes in `lag` how
+    much later than due it woke up, anything above zero is time the loop
+    spent running other code: hashing on the loop, synchronous I/O, big
+    JSON documents.
+
+    With `block_threshold` set, a watchdog thread also notices when the
+    task is overdue by that much while the loop is still busy, and logs
+    the stack of the loop thread, the blocking code, with the request the
+    running task handles (see `RequestTaskMiddleware`). Blocks longer than
+    `block_threshold + interval` are always caught. Meant for debugging:
+    the stack walk happens while the loop is blocked anyway, but the
+    warnings are verbose.
+
+    Args:
+        lag: Histogram of the lag in seconds.
+        interval: Seconds between two measurements.
+        block_threshold: Seconds the loop may be held before its stack is
+            logged, None disables the watchdog.
+    """
+
+    def __init__(
+        self,
+        lag: Histogram,
+        interval: float = 0.1,
+        block_threshold: Optional[float] = None,
+    ) -> None:
+        self.lag = lag
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.requests: weakref.WeakKeyDictionary[asyncio.Task, Scope] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        # loop time the monitor task is due, read by the watchdog thread
+        self._due: Optional[float] = None
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._run(), name="loop-monitor")
+        if self.block_threshold is not None:
+            self._watchdog = threading.Thread(
+                target=self._watch, name="loop-watchdog", daemon=True
+            )
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        self._stopped.set()
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+        self._due = None
+
+    async def _run(self) -> None:
+        while True:
+            self._due = self._loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lag.observe(max(self._loop.time() - self._due, 0.0))
+
+    def _watch(self) -> None:
+        reported = None
+        while not self._stopped.wait(self.block_threshold / 4):
+            due = self._due
+            # the default loop clock is time.monotonic()
+            if (
+                due is None
+                or due == reported
+                or time.monotonic() - due < self.block_threshold
+            ):
+                continue
+            reported = due
+            self._report(time.monotonic() - due)
+
+    def _report(self, blocked: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread)
+        task = asyncio.current_task(self._loop)
+        scope = self.requests.get(task) if task is not None else None
+        if scope is not None:
+            route = getattr(scope.get("route"), "path", scope["path"])
+            request = f"{scope['method']} {route}"
+        else:
+            request = "no request"
+        logger.warning(
+            "Event loop blocked for %.0f ms so far (%s, task %s), by:\n%s",
+            blocked * 1000,
+            request,
+            task.get_name() if task is not None else "none",
+            _format_callback_stack(frame) if frame is not None else "unavailable",
+        )
+
+
+class RequestTaskMiddleware:
+    """
+    ASGI middleware telling a `LoopMonitor` which request each task handles.
+
+    Args:
+        app: The wrapped application.
+        monitor: The monitor whose watchdog reports the requests.
+    """
+
+    def __init__(self, app: ASGIApp, monitor: LoopMonitor) -> None:
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        task = asyncio.current_task()
+        self.monitor.requests[task] = scope
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.monitor.requests.pop(task, None)
@@ -0,0 +1,117 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass
+class CacheStats:
+    """
+    Snapshot of cache counters.
+
+    Attributes:
+        size: Entries currently stored.
+        maxsize: Configured capacity.
+        hits: Lookups answered from the cache.
+        misses: Lookups that found nothing or an expired entry.
+        evictions: Entries dropped to make room for new ones.
+        expirations: Entries dropped because their deadline passed.
+    """
+
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUCache(Generic[K, V]):
+    """
+    In-process LRU cache with optional per-entry deadlines.
+
+    Entries are dropped lazily when they are looked up after their deadline,
+    or evicted in least-recently-used order once `maxsize` is reached.
+    A `maxsize` of 0 disables the cache. Not thread-safe, meant to be used
+    from the event loop thread.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[K, tuple[V, Optional[float]]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: K) -> Optional[V]:
+        item = self._data.get(key)
+        if item is None:
+            self._misses += 1
+            return None
+
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.time():
+            del self._data[key]
+            self._expirations += 1
+            self._misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self._hits += 1
+        return value
+
+    def set(
+        self,
+        key: K,
+        value: V,
+        ttl: Optional[float] = None,
+        expires_at: Optional[float] = None,
+    ) -> None:
+        """
+        Stores a value.
+
+        Args:
+            key: Cache key.
+            value: Value to store.
+            ttl: Lifetime in seconds, relative to now.
+            expires_at: Absolute unix timestamp, wins over the ttl if earlier.
+        """
+        if self.maxsize <= 0:
+            return
+        if ttl is not None:
+            deadline = time.time() + ttl
+            expires_at = deadline if expires_at is None else min(expires_at, deadline)
+
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self._evictions += 1
+
+    def delete(self, key: K) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            size=len(self._data),
+            maxsize=self.maxsize,
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            expirations=self._expirations,
+        )
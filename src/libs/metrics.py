@@ -0,0 +1,405 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, Mapping, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.libs.admission import AdmissionController
+from src.libs.lru import CacheStats
+from src.libs.worker_pool import WorkerPool
+
+logger = logging.getLogger(__name__)
+
+# label of requests that matched no route, keeps scanners from adding series
+UNMATCHED_ROUTE = "unmatched"
+STATEMENT_KINDS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE"})
+
+
+def multiprocess_mode() -> bool:
+    """
+    Whether metrics are shared between worker processes.
+
+    prometheus_client switches to files in `PROMETHEUS_MULTIPROC_DIR` when
+    that variable is set in the environment of every worker, the directory
+    must exist and be emptied before the workers start.
+    """
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def render() -> tuple[bytes, str]:
+    """
+    Returns the metrics of all workers in the text exposition format and
+    its content type.
+    """
+    if multiprocess_mode():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Drops the live gauges of this worker, call it when the worker exits."""
+    if multiprocess_mode():
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class HTTPMetricsMiddleware:
+    """
+    ASGI middleware recording the count, status and latency of requests.
+
+    Requests are labelled with the route template (`/v1/users/{id}`), not
+    the path, so the number of series stays bounded.
+
+    Args:
+        app: The wrapped application.
+        requests: Counter labelled with method, route and status.
+        latency: Histogram labelled with method and route.
+        in_progress: Gauge of requests being handled.
+        exclude: Paths not recorded, e.g. the metrics endpoint itself.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        requests: Counter,
+        latency: Histogram,
+        in_progress: Gauge,
+        exclude: tuple[str, ...] = (),
+    ) -> None:
+        self.app = app
+        self.requests = requests
+        self.latency = latency
+        self.in_progress = in_progress
+        self.exclude = frozenset(exclude)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started_at = time.perf_counter()
+        self.in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.in_progress.dec()
+            # set by the router on the scope once a route matched
+            route = scope.get("route")
+            path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            self.latency.labels(scope["method"], path).observe(
+                time.perf_counter() - started_at
+            )
+            self.requests.labels(scope["method"], path, str(status)).inc()
+
+
+def statement_kind(statement: str) -> str:
+    """First keyword of a statement, "OTHER" for anything but plain DML."""
+    keyword = statement.lstrip()[:6].upper()
+    return keyword if keyword in STATEMENT_KINDS else "OTHER"
+
+
+def instrument_engine(engine: AsyncEngine, latency: Histogram, database: str) -> None:
+    """
+    Records the execution time of every statement run by `engine`.
+
+    Args:
+        engine: The engine to instrument.
+        latency: Histogram labelled with database and statement kind.
+        database: Name of the engine in the `database` label.
+    """
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started_at = conn.info["query_started_at"].pop()
+        latency.labels(database, statement_kind(statement)).observe(
+            time.perf_counter() - started_at
+        )
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def handle_error(context):
+        started = (
+            context.connection.info.get("query_started_at")
+            if context.connection
+            else None
+        )
+        if started:
+            started.pop()
+
+
+class PeriodicSync:
+    """
+    Base of objects copying state into Prometheus metrics.
+
+    `sync()` runs every `interval` seconds once `start()` was called, once
+    more on `stop()`, and whenever it is called, e.g. before a scrape.
+
+    Args:
+        interval: Seconds between two syncs.
+    """
+
+    def __init__(self, interval: float = 5.0) -> None:
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def sync(self) -> None:
+        raise NotImplementedError
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=type(self).__name__)
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        self.sync()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                self.sync()
+            except Exception:
+                logger.exception("%s sync failed", type(self).__name__)
+            await asyncio.sleep(self.interval)
+
+
+class PoolMetrics(PeriodicSync):
+    """
+    Copies the `PoolStats` of database engines into Prometheus metrics.
+
+    Gauges hold the current connection counts, counters grow by the
+    checkouts, timeouts and wait time since the previous sync, so they
+    add up across worker processes.
+
+    Args:
+        engines: Function returning the engines to report, by name.
+        connections: Gauge labelled with database and state.
+        checkouts: Counter labelled with database.
+        timeouts: Counter labelled with database.
+        wait: Counter of seconds spent waiting for a connection, by database.
+        interval: Seconds between two syncs.
+    """
+
+    def __init__(
+        self,
+        engines: Callable[[], Mapping[str, AsyncEngine]],
+        connections: Gauge,
+        checkouts: Counter,
+        timeouts: Counter,
+        wait: Counter,
+        interval: float = 5.0,
+    ) -> None:
+        super().__init__(interval)
+        self.engines = engines
+        self.connections = connections
+        self.checkouts = checkouts
+        self.timeouts = timeouts
+        self.wait = wait
+        self._last: dict[str, tuple[int, int, float]] = {}
+
+    def sync(self) -> None:
+        for database, engine in self.engines().items():
+            stats = engine.pool.stats()
+            for state, value in (
+                ("checked_in", stats.checked_in),
+                ("checked_out", stats.checked_out),
+                ("overflow", max(stats.overflow, 0)),
+            ):
+                self.connections.labels(database, state).set(value)
+
+            current = (stats.checkouts, stats.timeouts, stats.total_wait_seconds)
+            last = self._last.get(database, (0, 0, 0.0))
+            if any(now < before for now, before in zip(current, last)):
+                # the engine was disposed, its pool counts from zero again
+                last = (0, 0, 0.0)
+            self.checkouts.labels(database).inc(current[0] - last[0])
+            self.timeouts.labels(database).inc(current[1] - last[1])
+            self.wait.labels(database).inc(current[2] - last[2])
+            self._last[database] = current
+
+
+class AdmissionMetrics(PeriodicSync):
+    """
+    Copies the `AdmissionStats` of admission controllers into Prometheus metrics.
+
+    Gauges hold the callers holding a slot and waiting for one, counters
+    grow by the callers admitted, queued and shed since the previous sync.
+    Controllers are reported once passed to `add()`.
+
+    Args:
+        active: Gauge labelled with controller.
+        waiting: Gauge labelled with controller.
+        admitted: Counter labelled with controller.
+        queued: Counter labelled with controller.
+        shed: Counter labelled with controller.
+        interval: Seconds between two syncs.
+    """
+
+    def __init__(
+        self,
+        active: Gauge,
+        waiting: Gauge,
+        admitted: Counter,
+        queued: Counter,
+        shed: Counter,
+        interval: float = 5.0,
+    ) -> None:
+        super().__init__(interval)
+        self.active = active
+        self.waiting = waiting
+        self.admitted = admitted
+        self.queued = queued
+        self.shed = shed
+        self.controllers: dict[str, AdmissionController] = {}
+        self._last: dict[str, tuple[int, int, int]] = {}
+
+    def add(self, name: str, controller: AdmissionController) -> None:
+        self.controllers[name] = controller
+
+    def sync(self) -> None:
+        for name, controller in self.controllers.items():
+            stats = controller.stats()
+            self.active.labels(name).set(stats.active)
+            self.waiting.labels(name).set(stats.waiting)
+
+            current = (stats.admitted, stats.queued, stats.shed)
+            last = self._last.get(name, (0, 0, 0))
+            for counter, now, before in zip(
+                (self.admitted, self.queued, self.shed), current, last
+            ):
+                counter.labels(name).inc(now - before)
+            self._last[name] = current
+
+
+class WorkerPoolMetrics(PeriodicSync):
+    """
+    Copies the `WorkerPoolStats` of worker pools into Prometheus metrics.
+
+    Gauges hold the calls in flight and queued for a worker, counters grow
+    by the calls completed and the time they waited since the previous
+    sync. Pools are reported once passed to `add()`.
+
+    Args:
+        in_flight: Gauge labelled with pool.
+        queued: Gauge labelled with pool.
+        completed: Counter labelled with pool.
+        wait: Counter of seconds calls waited for a worker, by pool.
+        interval: Seconds between two syncs.
+    """
+
+    def __init__(
+        self,
+        in_flight: Gauge,
+        queued: Gauge,
+        completed: Counter,
+        wait: Counter,
+        interval: float = 5.0,
+    ) -> None:
+        super().__init__(interval)
+        self.in_flight = in_flight
+        self.queued = queued
+        self.completed = completed
+        self.wait = wait
+        self.pools: dict[str, WorkerPool] = {}
+        self._last: dict[str, tuple[int, float]] = {}
+
+    def add(self, name: str, pool: WorkerPool) -> None:
+        self.pools[name] = pool
+
+    def sync(self) -> None:
+        for name, pool in self.pools.items():
+            stats = pool.stats()
+            self.in_flight.labels(name).set(stats.in_flight)
+            self.queued.labels(name).set(stats.queued)
+
+            last = self._last.get(name, (0, 0.0))
+            self.completed.labels(name).inc(stats.completed - last[0])
+            self.wait.labels(name).inc(stats.total_wait_seconds - last[1])
+            self._last[name] = (stats.completed, stats.total_wait_seconds)
+
+
+class CacheMetrics(PeriodicSync):
+    """
+    Copies the `CacheStats` of caches into Prometheus metrics.
+
+    A gauge holds the entries stored, counters grow by the hits, misses,
+    evictions and expirations since the previous sync, the hit ratio is
+    `rate(hits) / (rate(hits) + rate(misses))`. Caches are reported once
+    their `stats` function was passed to `add()`.
+
+    Args:
+        entries: Gauge labelled with cache.
+        hits: Counter labelled with cache.
+        misses: Counter labelled with cache.
+        evictions: Counter labelled with cache.
+        expirations: Counter labelled with cache.
+        interval: Seconds between two syncs.
+    """
+
+    def __init__(
+        self,
+        entries: Gauge,
+        hits: Counter,
+        misses: Counter,
+        evictions: Counter,
+        expirations: Counter,
+        interval: float = 5.0,
+    ) -> None:
+        super().__init__(interval)
+        self.entries = entries
+        self.hits = hits
+        self.misses = misses
+        self.evictions = evictions
+        self.expirations = expirations
+        self.caches: dict[str, Callable[[], CacheStats]] = {}
+        self._last: dict[str, tuple[int, int, int, int]] = {}
+
+    def add(self, name: str, stats: Callable[[], CacheStats]) -> None:
+        self.caches[name] = stats
+
+    def sync(self) -> None:
+        counters = (self.hits, self.misses, self.evictions, self.expirations)
+        for name, stats in self.caches.items():
+            current = stats()
+            self.entries.labels(name).set(current.size)
+
+            now = (current.hits, current.misses, current.evictions, current.expirations)
+            last = self._last.get(name, (0, 0, 0, 0))
+            for counter, value, before in zip(counters, now, last):
+                counter.labels(name).inc(value - before)
+            self._last[name] = now
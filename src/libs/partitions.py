@@ -0,0 +1,246 @@
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+@dataclass(frozen=True)
+class Partition:
+    """A daily partition covering `[lower, upper)`."""
+
+    name: str
+    lower: datetime
+    upper: datetime
+
+
+def partition_days(
+    today: date, horizon: timedelta, latest: Optional[datetime] = None
+) -> list[date]:
+    """
+    Days that need a partition: from `today` until `today + horizon`, or
+    until the day of `latest` (e.g. the latest stored value) if that is later.
+    """
+    last_day = (datetime.combine(today, time.min) + horizon).date()
+    if latest is not None:
+        last_day = max(last_day, latest.date())
+    return [today + timedelta(days=i) for i in range((last_day - today).days + 1)]
+
+
+class DailyRangePartitions:
+    """
+    Manages daily partitions of a PostgreSQL table partitioned by
+    `RANGE (<timestamp column>)`.
+
+    Partitions are named `<table>_pYYYYMMDD` and cover one day each. Creating
+    them ahead of time keeps inserts from failing, dropping a partition whose
+    upper bound passed removes all of its rows without a DELETE. Rows beyond
+    the created days land in the table's DEFAULT partition, if it has one,
+    and are moved into their daily partition when it is created. Rows of
+    days that never got a partition stay there, `purge_default` deletes
+    them once expired.
+
+    Every DDL statement runs in its own short transaction with
+    `lock_timeout`, so a busy parent table makes the call fail fast instead
+    of queueing the application's queries behind the DDL lock.
+
+    Args:
+        table: Name of the partitioned parent table.
+        column: The timestamp column the table is partitioned by.
+        lock_timeout_ms: Max wait for the locks a CREATE or DROP needs.
+    """
+
+    def __init__(self, table: str, column: str, lock_timeout_ms: int = 5000) -> None:
+        self.table = table
+        self.column = column
+        self.lock_timeout_ms = lock_timeout_ms
+        self._name_pattern = re.compile(rf"^{re.escape(table)}_p(\d{{8}})$")
+
+    def partition_for(self, day: date) -> Partition:
+        lower = datetime.combine(day, time.min)
+        return Partition(
+            name=f"{self.table}_p{day:%Y%m%d}",
+            lower=lower,
+            upper=lower + timedelta(days=1),
+        )
+
+    async def is_partitioned(self, connection: AsyncConnection) -> bool:
+        result = await connection.execute(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+                "JOIN pg_class c ON c.oid = pt.partrelid "
+                "WHERE c.relname = :table AND pg_table_is_visible(c.oid))"
+            ),
+            {"table": self.table},
+        )
+        partitioned = result.scalar_one()
+        await connection.commit()
+        return partitioned
+
+    async def existing(self, connection: AsyncConnection) -> list[Partition]:
+        """Returns the existing partitions following the naming scheme, oldest first."""
+        result = await connection.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits i "
+                "JOIN pg_class child ON child.oid = i.inhrelid "
+                "JOIN pg_class parent ON parent.oid = i.inhparent "
+                "WHERE parent.relname = :table AND pg_table_is_visible(parent.oid)"
+            ),
+            {"table": self.table},
+        )
+        names = result.scalars().all()
+        await connection.commit()
+
+        partitions = []
+        for name in names:
+            match = self._name_pattern.match(name)
+            if match:
+                day = datetime.strptime(match.group(1), "%Y%m%d").date()
+                partitions.append(self.partition_for(day))
+        return sorted(partitions, key=lambda partition: partition.lower)
+
+    async def create_until(
+        self, connection: AsyncConnection, start: datetime, until: datetime
+    ) -> list[Partition]:
+        """
+        Creates the missing partitions for every day from `start` to `until`.
+
+        Returns:
+            The partitions that were created.
+        """
+        existing = {partition.name for partition in await self.existing(connection)}
+        default = await self.default_partition(connection)
+        created = []
+        day = start.date()
+        while day <= until.date():
+            partition = self.partition_for(day)
+            if partition.name not in existing:
+                if default is None:
+                    await self._ddl(
+                        connection, self._create_statement(connection, partition)
+                    )
+                else:
+                    await self._ddl(
+                        connection,
+                        *self._move_out_of_default(connection, partition, default),
+                    )
+                created.append(partition)
+            day += timedelta(days=1)
+        return created
+
+    async def default_partition(self, connection: AsyncConnection) -> Optional[str]:
+        """Returns the quoted name of the table's DEFAULT partition, if it has one."""
+        result = await connection.execute(
+            text(
+                "SELECT pt.partdefid::regclass::text FROM pg_partitioned_table pt "
+                "JOIN pg_class c ON c.oid = pt.partrelid "
+                "WHERE c.relname = :table AND pg_table_is_visible(c.oid) "
+                "AND pt.partdefid <> 0"
+            ),
+            {"table": self.table},
+        )
+        default = result.scalar_one_or_none()
+        await connection.commit()
+        return default
+
+    def _create_statement(
+        self, connection: AsyncConnection, partition: Partition
+    ) -> str:
+        return (
+            f"CREATE TABLE IF NOT EXISTS {self._quote(connection, partition.name)} "
+            f"PARTITION OF {self._quote(connection, self.table)} "
+            f"FOR VALUES FROM ('{partition.lower.isoformat(' ')}') "
+            f"TO ('{partition.upper.isoformat(' ')}')"
+        )
+
+    def _move_out_of_default(
+        self, connection: AsyncConnection, partition: Partition, default: str
+    ) -> list[str]:
+        # PostgreSQL refuses a new partition while the default one holds rows
+        # of its range: create it detached, move the rows, then attach it
+        name = self._quote(connection, partition.name)
+        table = self._quote(connection, self.table)
+        column = self._quote(connection, self.column)
+        bounds = (
+            f"FROM ('{partition.lower.isoformat(' ')}') "
+            f"TO ('{partition.upper.isoformat(' ')}')"
+        )
+        return [
+            f"CREATE TABLE {name} "
+            f"(LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)",
+            f"WITH moved AS (DELETE FROM {default} "
+            f"WHERE {column} >= '{partition.lower.isoformat(' ')}' "
+            f"AND {column} < '{partition.upper.isoformat(' ')}' RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved",
+            f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES {bounds}",
+        ]
+
+    async def drop_before(
+        self, connection: AsyncConnection, before: datetime
+    ) -> list[Partition]:
+        """
+        Drops the partitions whose whole range lies before `before`.
+
+        Returns:
+            The partitions that were dropped.
+        """
+        dropped = []
+        for partition in await self.existing(connection):
+            if partition.upper > before:
+                break
+            await self._ddl(
+                connection,
+                f"DROP TABLE IF EXISTS {self._quote(connection, partition.name)}",
+            )
+            dropped.append(partition)
+        return dropped
+
+    async def purge_default(
+        self, connection: AsyncConnection, before: datetime, limit: int
+    ) -> int:
+        """
+        Deletes up to `limit` rows older than `before` from the DEFAULT
+        partition, in one transaction.
+
+        Returns:
+            The number of deleted rows, 0 without a DEFAULT partition.
+        """
+        default = await self.default_partition(connection)
+        if default is None:
+            return 0
+        column = self._quote(connection, self.column)
+        try:
+            await connection.execute(
+                text(f"SET LOCAL lock_timeout = {int(self.lock_timeout_ms)}")
+            )
+            result = await connection.execute(
+                text(
+                    f"DELETE FROM {default} WHERE ctid IN ("
+                    f"SELECT ctid FROM {default} WHERE {column} < :before "
+                    "LIMIT :limit)"
+                ),
+                {"before": before, "limit": limit},
+            )
+            await connection.commit()
+        except BaseException:
+            await connection.rollback()
+            raise
+        return result.rowcount
+
+    async def _ddl(self, connection: AsyncConnection, *statements: str) -> None:
+        try:
+            await connection.execute(
+                text(f"SET LOCAL lock_timeout = {int(self.lock_timeout_ms)}")
+            )
+            for statement in statements:
+                await connection.execute(text(statement))
+            await connection.commit()
+        except BaseException:
+            await connection.rollback()
+            raise
+
+    @staticmethod
+    def _quote(connection: AsyncConnection, name: str) -> str:
+        return connection.dialect.identifier_preparer.quote(name)
@@ -0,0 +1,225 @@
+import asyncio
+import collections
+import hashlib
+import hmac
+import logging
+import re
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from types import FrameType
+from typing import Any, Optional, Sequence
+from urllib.parse import parse_qs
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY = "profile"
+# frames below the coroutine a task runs belong to the event loop
+_HANDLE_RUN = asyncio.events.Handle._run.__code__
+
+
+def sign(key: str, method: str, path: str, expires: int) -> str:
+    """
+    Signs a profiling request for `method` and `path`, valid until the
+    `expires` unix time. The result is the X-Profile header value.
+    """
+    message = f"{expires}:{method.upper()}:{path}".encode()
+    digest = hmac.new(key.encode(), message, hashlib.sha256).hexdigest()
+    return f"{expires}.{digest}"
+
+
+def verify(token: str, keys: Sequence[str], method: str, path: str) -> bool:
+    """Whether `token` was signed by one of `keys` for this request and is valid."""
+    expires, _, _ = token.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return any(
+        hmac.compare_digest(token, sign(key, method, path, int(expires)))
+        for key in keys
+    )
+
+
+def _frame_name(frame: FrameType) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_qualname}"
+
+
+def _running_stack(frame: Optional[FrameType]) -> list[str]:
+    frames = []
+    while frame is not None:
+        if frame.f_code is _HANDLE_RUN:
+            break
+        frames.append(frame)
+        frame = frame.f_back
+    return [_frame_name(frame) for frame in reversed(frames)]
+
+
+def _awaited_stack(awaitable: Any) -> list[str]:
+    names = []
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(
+            awaitable, "gi_frame", None
+        )
+        if frame is None:
+            names.append(f"<{type(awaitable).__name__}>")
+            break
+        names.append(_frame_name(frame))
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(
+            awaitable, "gi_yieldfrom", None
+        )
+    return names
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler of one asyncio task.
+
+    A background thread wakes up every `interval` seconds and records the
+    task's stack: the Python stack of the event loop thread while the task
+    runs, its chain of awaits ending in `<waiting>` while it is suspended
+    (database, worker pools, other tasks holding the loop). Samples are
+    counted per stack, `folded()` renders them for flamegraph.pl and
+    speedscope. The task is only profiled between `start()` and `stop()`.
+
+    Args:
+        interval: Seconds between two samples.
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.samples: collections.Counter = collections.Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Starts sampling the current task, call it from the task itself."""
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.current_task()
+        self._loop_thread = threading.get_ident()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def folded(self) -> str:
+        """One `frame;frame;... count` line per distinct stack, outermost first."""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.samples.most_common()
+        )
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                stack = self._sample()
+            except Exception:
+                # the loop thread moves on while it is sampled, skip torn samples
+                continue
+            if stack:
+                self.samples[";".join(stack)] += 1
+
+    def _sample(self) -> list[str]:
+        if asyncio.current_task(self._loop) is self._task:
+            return _running_stack(sys._current_frames().get(self._loop_thread))
+        return _awaited_stack(self._task.get_coro()) + ["<waiting>"]
+
+
+class ProfilerMiddleware:
+    """
+    ASGI middleware profiling the requests that ask for it.
+
+    A request is profiled when its X-Profile header or `profile` query
+    parameter holds a token signed with one of `keys` (see `sign()`), or
+    any value when `allow_unsigned` is set. Its folded stacks are written
+    to `directory`, the file name is returned in the X-Profile response
+    header. Other requests only pay for the header lookup.
+
+    Args:
+        app: The wrapped application.
+        directory: Where profiles are written, created when missing.
+        keys: Keys accepted for signed tokens.
+        allow_unsigned: Profile any flagged request, for debug mode.
+        interval: Seconds between two samples.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        directory: str,
+        keys: Sequence[str] = (),
+        allow_unsigned: bool = False,
+        interval: float = 0.005,
+    ) -> None:
+        self.app = app
+        self.directory = Path(directory)
+        self.keys = tuple(keys)
+        self.allow_unsigned = allow_unsigned
+        self.interval = interval
+
+    def _token(self, scope: Scope) -> Optional[str]:
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return value.decode("latin-1")
+        query = scope.get("query_string", b"")
+        if PROFILE_QUERY.encode() + b"=" in query:
+            values = parse_qs(query.decode("latin-1")).get(PROFILE_QUERY)
+            return values[0] if values else None
+        return None
+
+    def _allowed(self, token: str, scope: Scope) -> bool:
+        return self.allow_unsigned or verify(
+            token, self.keys, scope["method"], scope["path"]
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = self._token(scope)
+        if token is None or not self._allowed(token, scope):
+            await self.app(scope, receive, send)
+            return
+
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_")[:80]
+        name = (
+            f"{time.strftime('%Y%m%dT%H%M%S')}-{scope['method']}-{slug}"
+            f"-{uuid.uuid4().hex[:8]}.folded"
+        )
+
+        async def send_with_profile(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile", name)
+            await send(message)
+
+        profiler = SamplingProfiler(self.interval)
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            profiler.stop()
+            path = self.directory / name
+            try:
+                await asyncio.to_thread(self._write, path, profiler.folded())
+            except OSError:
+                logger.exception("Could not write the profile %s", path)
+            else:
+                logger.info(
+                    "Profile of %s %s written to %s (%d samples)",
+                    scope["method"],
+                    scope["path"],
+                    path,
+                    sum(profiler.samples.values()),
+                )
+
+    def _write(self, path: Path, folded: str) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path.write_text(folded)
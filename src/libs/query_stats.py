@@ -0,0 +1,189 @@
+import collections
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from itertools import groupby
+from typing import Any, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.libs import server_timing
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger(f"{__name__}.slow")
+
+_current: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+
+@dataclass
+class QueryStats:
+    """
+    Statements executed within one `track_queries()` block, usually a request.
+
+    Attributes:
+        count: Statements executed.
+        total_seconds: Time spent executing them.
+        statements: Executions per statement text. Values are bound
+            parameters, so repeated texts are the same query run again.
+    """
+
+    count: int = 0
+    total_seconds: float = 0.0
+    statements: collections.Counter = field(default_factory=collections.Counter)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements executed more than `threshold` times, most frequent first."""
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count > threshold
+        ]
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collects the statements of instrumented engines run in this context."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Stats of the enclosing `track_queries()` block, None outside of one."""
+    return _current.get()
+
+
+def parameter_shape(parameters: Any) -> str:
+    """
+    Describes bound parameters by type only, values never reach the log.
+
+    Runs of the same type are collapsed, `IN` lists stay short:
+    `(int*500)`, `{value: str}`, `3 x (str, int)` for executemany.
+    """
+    if (
+        isinstance(parameters, (list, tuple))
+        and parameters
+        and all(isinstance(row, (list, tuple, dict)) for row in parameters)
+    ):
+        return f"{len(parameters)} x {parameter_shape(parameters[0])}"
+    if isinstance(parameters, dict):
+        return (
+            "{"
+            + ", ".join(
+                f"{name}: {type(value).__name__}" for name, value in parameters.items()
+            )
+            + "}"
+        )
+    if isinstance(parameters, (list, tuple)):
+        runs = [
+            (name, len(list(group)))
+            for name, group in groupby(type(value).__name__ for value in parameters)
+        ]
+        return (
+            "("
+            + ", ".join(
+                name if count == 1 else f"{name}*{count}" for name, count in runs
+            )
+            + ")"
+        )
+    return type(parameters).__name__
+
+
+def instrument_queries(engine: AsyncEngine, slow_threshold: Optional[float]) -> None:
+    """
+    Counts and times every statement of `engine` into the current `QueryStats`,
+    and into the `db` phase of the current `ServerTiming`.
+
+    Statements slower than `slow_threshold` seconds are logged to the
+    `<module>.slow` logger with the shape of their parameters.
+
+    Args:
+        engine: The engine to instrument.
+        slow_threshold: Seconds, None disables the slow query log.
+    """
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        conn.info.setdefault("query_stats_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_stats_started_at"].pop()
+        stats = _current.get()
+        if stats is not None:
+            stats.count += 1
+            stats.total_seconds += elapsed
+            stats.statements[statement] += 1
+        server_timing.record("db", elapsed)
+        if slow_threshold is not None and elapsed >= slow_threshold:
+            slow_query_logger.warning(
+                "Slow query (%.1f ms) on %s: %s -- parameters %s",
+                elapsed * 1000,
+                engine.url.database,
+                statement,
+                parameter_shape(parameters),
+            )
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def handle_error(context):
+        started = (
+            context.connection.info.get("query_stats_started_at")
+            if context.connection
+            else None
+        )
+        if started:
+            started.pop()
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware tracking the statements of every request.
+
+    Logs the query count and database time of each request at debug level,
+    and a warning for statements executed more than `repeat_threshold`
+    times by the same request, typically a lookup in a loop (N+1).
+
+    Args:
+        app: The wrapped application.
+        repeat_threshold: Executions of one statement a request may do
+            before it is flagged.
+    """
+
+    def __init__(self, app: ASGIApp, repeat_threshold: int = 10) -> None:
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            await self.app(scope, receive, send)
+
+        route = getattr(scope.get("route"), "path", scope["path"])
+        if stats.count:
+            logger.debug(
+                "%s %s ran %d queries in %.1f ms",
+                scope["method"],
+                route,
+                stats.count,
+                stats.total_seconds * 1000,
+            )
+        for statement, count in stats.repeated(self.repeat_threshold):
+            logger.warning(
+                "%s %s ran the same query %d times, N+1? %s",
+                scope["method"],
+                route,
+                count,
+                statement,
+            )
@@ -0,0 +1,312 @@
+import asyncio
+import itertools
+import logging
+import time
+from typing import Any, Mapping, Optional, Sequence
+
+from sqlalchemy import Select, text
+from sqlalchemy.engine import Engine, Result, Row
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+from src.libs.shards import ShardRouter, shard_bind
+
+logger = logging.getLogger(__name__)
+
+# seconds the replica is behind the primary, 0 when it replayed all WAL it received
+LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+
+_WROTE_KEY = "replicas_wrote"
+_REPLICA_KEY = "replicas_engine"
+
+
+class ReplicaSet:
+    """
+    Read replicas picked round-robin among the healthy ones.
+
+    A replica is healthy when its last check succeeded and its replication
+    lag was at most `max_lag`. Checks run every `check_interval` seconds
+    once `start()` was called, a replica that fails a query between checks
+    can be taken out with `mark_down()`.
+
+    Args:
+        engines: One engine per replica.
+        max_lag: Max replication lag in seconds of a replica serving reads.
+        check_interval: Seconds between two health checks.
+        check_timeout: Max seconds a single replica check may take.
+    """
+
+    def __init__(
+        self,
+        engines: Sequence[AsyncEngine],
+        max_lag: float = 1.0,
+        check_interval: float = 5.0,
+        check_timeout: float = 1.0,
+    ) -> None:
+        self.engines = list(engines)
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        # replicas are assumed healthy until the first check says otherwise
+        self._healthy = set(range(len(self.engines)))
+        self._counter = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def healthy(self) -> list[AsyncEngine]:
+        return [engine for i, engine in enumerate(self.engines) if i in self._healthy]
+
+    def choose(self) -> Optional[AsyncEngine]:
+        """Returns the next healthy replica, or None when there is none."""
+        healthy = sorted(self._healthy)
+        if not healthy:
+            return None
+        return self.engines[healthy[next(self._counter) % len(healthy)]]
+
+    def mark_down(self, engine: AsyncEngine | Engine) -> None:
+        """Takes a replica out of rotation until its next successful check."""
+        for i, replica in enumerate(self.engines):
+            if replica is engine or replica.sync_engine is engine:
+                if i in self._healthy:
+                    logger.warning("Replica %s marked down", replica.url.host)
+                self._healthy.discard(i)
+
+    async def check(self) -> list[bool]:
+        """Checks every replica once and updates the rotation."""
+        results = await asyncio.gather(
+            *(self._check(engine) for engine in self.engines)
+        )
+        for i, (engine, healthy) in enumerate(zip(self.engines, results)):
+            if healthy and i not in self._healthy:
+                logger.info("Replica %s back in rotation", engine.url.host)
+                self._healthy.add(i)
+            elif not healthy:
+                self.mark_down(engine)
+        return results
+
+    def start(self) -> None:
+        if self._task is None and self.engines:
+            self._task = asyncio.create_task(self._run(), name="replica-health-check")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def dispose(self) -> None:
+        await self.stop()
+        for engine in self.engines:
+            await engine.dispose()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.check()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Replica health check failed")
+            await asyncio.sleep(self.check_interval)
+
+    async def _check(self, engine: AsyncEngine) -> bool:
+        started_at = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.check_timeout):
+                async with engine.connect() as connection:
+                    if connection.dialect.name != "postgresql":
+                        return True
+                    lag = float((await connection.execute(LAG_QUERY)).scalar_one())
+        except Exception as e:
+            logger.warning("Replica %s check failed: %r", engine.url.host, e)
+            return False
+        if lag > self.max_lag:
+            logger.warning(
+                "Replica %s lags %.1fs behind (check took %.3fs)",
+                engine.url.host,
+                lag,
+                time.perf_counter() - started_at,
+            )
+            return False
+        return True
+
+
+class RoutingSession(Session):
+    """
+    Session that sends plain SELECTs to a read replica until it writes.
+
+    The replica is picked once per session, so the reads of one request see
+    a single replica. The first statement that is not a plain SELECT (and
+    every flush) pins the session to the primary for the rest of its life,
+    later reads then see the session's own writes.
+
+    Reads opt in by passing the statement as `clause` in `bind_arguments`,
+    see `fetch_one`. Everything else goes to the primary. Writes are tracked
+    with or without replicas, see `has_written`.
+
+    When users are sharded, statements with a `shard` bind argument go to
+    that shard's database, replicas only serve the unsharded statements.
+
+    Args:
+        replicas: Replicas to read from, None routes everything to the primary.
+        shards: The shard databases, shard 0 being the primary.
+    """
+
+    def __init__(
+        self,
+        *args,
+        replicas: Optional[ReplicaSet] = None,
+        shards: Optional[ShardRouter] = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self.shards = shards
+
+    def get_bind(
+        self,
+        mapper=None,
+        *,
+        clause=None,
+        primary: bool = False,
+        shard: Optional[int] = None,
+        **kw,
+    ):
+        if self._flushing or (clause is not None and not _is_plain_select(clause)):
+            self.info[_WROTE_KEY] = True
+        if shard is not None and self.shards is not None:
+            return self.shards.engines[shard].sync_engine
+        if not self.replicas or primary or self.info.get(_WROTE_KEY):
+            return super().get_bind(mapper, clause=clause, **kw)
+        if not _is_plain_select(clause):
+            return super().get_bind(mapper, clause=clause, **kw)
+
+        replica = self.info.get(_REPLICA_KEY)
+        if replica is None:
+            replica = self.replicas.choose()
+            if replica is None:
+                return super().get_bind(mapper, clause=clause, **kw)
+            self.info[_REPLICA_KEY] = replica
+        return replica.sync_engine
+
+
+def _is_plain_select(clause) -> bool:
+    return isinstance(clause, Select) and clause._for_update_arg is None
+
+
+def has_written(session: AsyncSession) -> bool:
+    """
+    Whether the session executed a statement other than a plain SELECT.
+
+    Sessions that are not a `RoutingSession` do not track their writes and
+    always count as written.
+    """
+    if not isinstance(session.sync_session, RoutingSession):
+        return True
+    return bool(session.info.get(_WROTE_KEY))
+
+
+def reads_from_replica(session: AsyncSession) -> bool:
+    """Whether the session's reads are currently served by a replica."""
+    return session.info.get(_REPLICA_KEY) is not None and not session.info.get(
+        _WROTE_KEY
+    )
+
+
+async def _execute_read(
+    session: AsyncSession,
+    stmt: Select,
+    params: Optional[Mapping[str, Any]],
+    bind_arguments: dict[str, Any],
+) -> tuple[AsyncConnection, Result]:
+    """
+    Executes a select, retrying on the primary when the replica is gone.
+
+    A replica that fails to connect, or whose connection is lost during the
+    select, is marked down and the select is retried on the primary. Later
+    reads of the session pick another replica. Other errors are raised as is.
+    """
+    connected = False
+    try:
+        connection = await session.connection(bind_arguments=bind_arguments)
+        connected = True
+        return connection, await connection.execute(stmt, params)
+    except (DBAPIError, OSError) as e:
+        replica = session.info.get(_REPLICA_KEY)
+        if (
+            replica is None
+            or session.sync_session.get_bind(**bind_arguments)
+            is not replica.sync_engine
+            or (connected and not getattr(e, "connection_invalidated", False))
+        ):
+            raise
+        session.sync_session.replicas.mark_down(replica)
+
+    # reads only go to a replica before the first write, so the transaction
+    # being dropped with the broken connection holds nothing but reads
+    await session.rollback()
+    del session.info[_REPLICA_KEY]
+    connection = await session.connection(
+        bind_arguments={**bind_arguments, "primary": True}
+    )
+    return connection, await connection.execute(stmt, params)
+
+
+async def fetch_one(
+    session: AsyncSession,
+    stmt: Select,
+    params: Optional[Mapping[str, Any]] = None,
+    shard: Optional[int] = None,
+) -> Optional[Row]:
+    """
+    Runs a single-row Core select, on a replica when the session routes reads.
+
+    A row missing on the replica may have been written moments ago and not
+    replicated yet, so misses are re-read on the primary. A miss on the
+    primary costs nothing extra. With `shard` the select runs on that shard.
+    A replica that can't be reached is marked down, see `_execute_read`.
+    """
+    connection, result = await _execute_read(
+        session, stmt, params, {"clause": stmt, **shard_bind(shard)}
+    )
+    row = result.one_or_none()
+    if row is None and session.info.get(_REPLICA_KEY) is not None:
+        replica = session.info[_REPLICA_KEY]
+        if connection.sync_engine is replica.sync_engine:
+            connection = await session.connection(
+                bind_arguments={"clause": stmt, "primary": True}
+            )
+            row = (await connection.execute(stmt, params)).one_or_none()
+    return row
+
+
+async def fetch_all(
+    session: AsyncSession,
+    stmt: Select,
+    params: Optional[Mapping[str, Any]] = None,
+    shard: Optional[int] = None,
+    primary: bool = False,
+) -> Sequence[Row]:
+    """
+    Runs a Core select, on a replica when the session routes reads.
+
+    With `primary` the select runs on the primary even then. A replica that
+    can't be reached is marked down, see `_execute_read`.
+    """
+    _, result = await _execute_read(
+        session, stmt, params, {"clause": stmt, "primary": primary, **shard_bind(shard)}
+    )
+    return result.all()
@@ -0,0 +1,165 @@
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional
+
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+_current: ContextVar[Optional["ServerTiming"]] = ContextVar(
+    "server_timing", default=None
+)
+
+
+@dataclass
+class ServerTiming:
+    """
+    Time spent per phase of one request, reported in its `Server-Timing` header.
+
+    Attributes:
+        seconds: Total seconds per phase, in the order phases first ran.
+        counts: How often each phase ran.
+        returned_at: When the endpoint returned, the start of `serialize`.
+    """
+
+    seconds: dict[str, float] = field(default_factory=dict)
+    counts: dict[str, int] = field(default_factory=dict)
+    returned_at: Optional[float] = None
+
+    def add(self, name: str, seconds: float) -> None:
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def header(self, total: Optional[float] = None) -> str:
+        """Formats the phases as `name;dur=<ms>`, with the call count when above one."""
+        metrics = []
+        for name, seconds in self.seconds.items():
+            metric = f"{name};dur={seconds * 1000:.2f}"
+            if self.counts[name] > 1:
+                metric += f';desc="{self.counts[name]} calls"'
+            metrics.append(metric)
+        if total is not None:
+            metrics.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(metrics)
+
+
+def current_timing() -> Optional[ServerTiming]:
+    """Timing of the current request, None when Server-Timing is disabled."""
+    return _current.get()
+
+
+def record(name: str, seconds: float) -> None:
+    """Adds `seconds` to the `name` phase of the current request, if it is timed."""
+    timing = _current.get()
+    if timing is not None:
+        timing.add(name, seconds)
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """
+    Times the block as the `name` phase of the current request.
+
+    Outside of a timed request this costs one context variable lookup.
+    """
+    timing = _current.get()
+    if timing is None:
+        yield
+        return
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(name, time.perf_counter() - started_at)
+
+
+def _mark_return(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    # keeps the signature FastAPI inspects for parameters and the response model
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            timing = _current.get()
+            if timing is not None:
+                timing.returned_at = time.perf_counter()
+            return result
+    else:
+
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            result = endpoint(*args, **kwargs)
+            timing = _current.get()
+            if timing is not None:
+                timing.returned_at = time.perf_counter()
+            return result
+
+    return wrapper
+
+
+class ServerTimingRoute(APIRoute):
+    """
+    Route recording the `serialize` phase: validating and rendering the
+    endpoint's return value, from its return until the response is built.
+
+    Used as `APIRouter(route_class=...)`.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(path, _mark_return(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            response = await handler(request)
+            timing = _current.get()
+            if timing is not None and timing.returned_at is not None:
+                timing.add("serialize", time.perf_counter() - timing.returned_at)
+                timing.returned_at = None
+            return response
+
+        return timed_handler
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware adding a `Server-Timing` header to every response.
+
+    Opens the request's `ServerTiming`, which services fill through
+    `timed()` and `record()`, and reports the collected phases and the
+    `total` time until the response started. Browsers show the header in
+    their developer tools, load tests can parse it.
+
+    Args:
+        app: The wrapped application.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = ServerTiming()
+        started_at = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing", timing.header(time.perf_counter() - started_at)
+                )
+            await send(message)
+
+        token = _current.set(timing)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
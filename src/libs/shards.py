@@ -0,0 +1,99 @@
+import hashlib
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import Table, func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+
+class ShardRouter:
+    """
+    Maps users to one of N databases.
+
+    Every shard draws user ids from its own sequence with a stride of N:
+    shard `k` (0-based) hands out `k + 1, k + 1 + N, k + 1 + 2N, ...`. Ids
+    are unique across shards without a central sequence, and the shard of
+    a user is `(id - 1) % N`. Changing N therefore means moving users and
+    reconfiguring the sequences.
+
+    New users are placed by a stable hash of their login. Lookups by login
+    or email go through the user directory, whose entries live on the
+    shard their key hashes to (see `shard_for_key`).
+
+    Args:
+        engines: One engine per shard, shard 0 is the primary database.
+    """
+
+    def __init__(self, engines: Sequence[AsyncEngine]) -> None:
+        self.engines = list(engines)
+
+    def __len__(self) -> int:
+        return len(self.engines)
+
+    @property
+    def enabled(self) -> bool:
+        return len(self.engines) > 1
+
+    def shard_for_user(self, user_id: int) -> int:
+        return (user_id - 1) % len(self.engines)
+
+    def shard_for_key(self, key: str) -> int:
+        # not hash(), that one is salted per process
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big") % len(self.engines)
+
+    def shards(self) -> range:
+        return range(len(self.engines))
+
+
+def shard_router(session: AsyncSession) -> Optional[ShardRouter]:
+    """Returns the router of a sharded session, None when it is not sharded."""
+    router = getattr(session.sync_session, "shards", None)
+    return router if router is not None and router.enabled else None
+
+
+def shard_bind(shard: Optional[int]) -> dict[str, Any]:
+    """`bind_arguments` sending a statement to `shard`, empty when unsharded."""
+    return {} if shard is None else {"shard": shard}
+
+
+async def next_user_id(
+    connection: AsyncConnection, table: Table, shard: int, count: int
+) -> Optional[int]:
+    """
+    Returns an explicit id for a new row on `shard`, None to use the default.
+
+    PostgreSQL shards use the id sequence configured with the stride by
+    `configure_sequence`. Other dialects have no sequences, the next id of
+    the shard's residue above the current max is used instead. That is only
+    safe with one writer per database and meant for local setups and tests.
+    """
+    if connection.dialect.name == "postgresql":
+        return None
+    current = (await connection.execute(select(func.max(table.c.id)))).scalar() or 0
+    return current + 1 + (shard - current) % count
+
+
+async def configure_sequence(
+    connection: AsyncConnection, table: str, shard: int, count: int
+) -> int:
+    """
+    Makes the id sequence of `table` on `shard` hand out the shard's ids.
+
+    The sequence continues above the table's current max id, existing rows
+    are not renumbered.
+
+    Returns:
+        The next id the sequence will hand out.
+    """
+    sequence = f"{table}_id_seq"
+    current = (
+        await connection.execute(text(f"SELECT coalesce(max(id), 0) FROM {table}"))
+    ).scalar_one()
+    start = current + 1 + (shard - current) % count
+    await connection.execute(
+        text(
+            f"ALTER SEQUENCE {sequence} "
+            f"INCREMENT BY {int(count)} RESTART WITH {int(start)}"
+        )
+    )
+    return start
@@ -0,0 +1,31 @@
+from typing import Any, TypeVar
+
+from pydantic import BaseModel
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def construct_trusted(model: type[ModelT], values: dict[str, Any]) -> ModelT:
+    """
+    Builds a pydantic model from data that is already known to be valid.
+
+    Meant for rows read back from our own tables: they were validated on
+    their way in, so running validators (e.g. `EmailStr`) again only costs
+    CPU. Cheaper than `model_construct`, which still walks every field to
+    fill defaults, so `values` must contain every field of the model and
+    nothing else. Never use it on client input.
+
+    Args:
+        model: The pydantic model class.
+        values: A complete mapping of field names to values. Owned by the
+            returned instance afterwards, do not reuse it.
+
+    Returns:
+        The model instance, equal to one built with validation.
+    """
+    instance = model.__new__(model)
+    object.__setattr__(instance, "__dict__", values)
+    object.__setattr__(instance, "__pydantic_fields_set__", set(values))
+    object.__setattr__(instance, "__pydantic_extra__", None)
+    object.__setattr__(instance, "__pydantic_private__", None)
+    return instance
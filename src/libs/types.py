@@ -0,0 +1,40 @@
+import ipaddress
+from typing import Any, Optional
+
+from sqlalchemy import String
+from sqlalchemy.dialects.postgresql import INET
+from sqlalchemy.engine import Dialect
+from sqlalchemy.types import TypeDecorator, TypeEngine
+
+
+class IPAddress(TypeDecorator):
+    """
+    IP address stored as native `INET` on PostgreSQL and as a string elsewhere.
+
+    `INET` takes 7 bytes for IPv4 and 19 for IPv6 instead of up to 46 for
+    the text form. Values are exchanged as strings on both sides, strings
+    that are not a valid address are stored as NULL instead of failing the
+    write.
+    """
+
+    impl = String(45)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect: Dialect) -> TypeEngine:
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(INET())
+        return dialect.type_descriptor(String(45))
+
+    def process_bind_param(
+        self, value: Optional[str], dialect: Dialect
+    ) -> Optional[str]:
+        if value is None:
+            return None
+        try:
+            return str(ipaddress.ip_address(value))
+        except ValueError:
+            return None
+
+    def process_result_value(self, value: Any, dialect: Dialect) -> Optional[str]:
+        # asyncpg returns ipaddress objects for INET
+        return None if value is None else str(value)
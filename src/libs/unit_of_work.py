@@ -0,0 +1,62 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.libs.server_timing import timed
+
+AfterCommit = Callable[[], Awaitable[None] | None]
+
+_AFTER_COMMIT_KEY = "after_commit"
+
+
+def after_commit(session: AsyncSession, callback: AfterCommit) -> None:
+    """
+    Schedules `callback` to run once the session's transaction is committed.
+
+    Repositories only write inside the request's transaction, side effects
+    that must not happen for rolled back writes (cache invalidation, caching
+    freshly inserted ids) are registered here. Callbacks are dropped on
+    rollback.
+
+    Args:
+        session: The session whose commit triggers the callback.
+        callback: A sync or async callable without arguments.
+    """
+    session.info.setdefault(_AFTER_COMMIT_KEY, []).append(callback)
+
+
+async def commit(session: AsyncSession) -> None:
+    """Commits the session and runs the callbacks registered with `after_commit`."""
+    with timed("commit"):
+        await session.commit()
+    callbacks = session.info.pop(_AFTER_COMMIT_KEY, [])
+    for callback in callbacks:
+        result = callback()
+        if result is not None:
+            await result
+
+
+async def rollback(session: AsyncSession) -> None:
+    """Rolls the session back and drops the pending `after_commit` callbacks."""
+    session.info.pop(_AFTER_COMMIT_KEY, None)
+    await session.rollback()
+
+
+@asynccontextmanager
+async def unit_of_work(session: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """
+    Wraps a block in one transaction: commits once when it exits normally,
+    rolls back when it raises.
+
+    Usage:
+        async with unit_of_work(session):
+            await users.create(...)
+            await sessions.create(...)
+    """
+    try:
+        yield session
+    except BaseException:
+        await rollback(session)
+        raise
+    await commit(session)
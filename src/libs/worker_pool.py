@@ -0,0 +1,113 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Literal, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def _timed_call(func: Callable[..., T], *args: Any) -> tuple[float, T]:
+    """Runs inside the worker, reports when the call actually started."""
+    started_at = time.time()
+    return started_at, func(*args)
+
+
+@dataclass
+class WorkerPoolStats:
+    """
+    Snapshot of a WorkerPool state.
+
+    Attributes:
+        kind: Executor type, "thread" or "process".
+        max_workers: Configured number of workers.
+        in_flight: Calls submitted and not finished yet (running + queued).
+        queued: Calls waiting for a free worker.
+        completed: Calls finished since the pool was created.
+        total_wait_seconds: Sum of time calls spent waiting for a worker.
+        max_wait_seconds: Longest time a single call waited for a worker.
+    """
+
+    kind: str
+    max_workers: int
+    in_flight: int
+    queued: int
+    completed: int
+    total_wait_seconds: float
+    max_wait_seconds: float
+
+    @property
+    def avg_wait_seconds(self) -> float:
+        return self.total_wait_seconds / self.completed if self.completed else 0.0
+
+
+class WorkerPool:
+    """
+    Bounded executor for CPU-bound work that must not block the event loop.
+
+    The pool is started and stopped from the application lifespan, but it is
+    also started lazily on first use, so callers outside the ASGI lifecycle
+    (tests, scripts) keep working.
+    """
+
+    def __init__(self, kind: Literal["thread", "process"], max_workers: int) -> None:
+        self.kind = kind
+        self.max_workers = max_workers
+        self._executor: Optional[Executor] = None
+        self._in_flight = 0
+        self._completed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def start(self) -> None:
+        if self._executor is not None:
+            return
+        if self.kind == "process":
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="worker-pool"
+            )
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        self._executor = None
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Runs `func(*args)` in the pool and awaits its result.
+
+        For a process pool `func` and `args` must be picklable, so pass
+        module level functions rather than lambdas or bound methods.
+        """
+        if self._executor is None:
+            self.start()
+
+        loop = asyncio.get_running_loop()
+        submitted_at = time.time()
+        self._in_flight += 1
+        try:
+            started_at, result = await loop.run_in_executor(
+                self._executor, _timed_call, func, *args
+            )
+        finally:
+            self._in_flight -= 1
+
+        wait = max(0.0, started_at - submitted_at)
+        self._completed += 1
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
+        return result
+
+    def stats(self) -> WorkerPoolStats:
+        return WorkerPoolStats(
+            kind=self.kind,
+            max_workers=self.max_workers,
+            in_flight=self._in_flight,
+            queued=max(0, self._in_flight - self.max_workers),
+            completed=self._completed,
+            total_wait_seconds=self._total_wait,
+            max_wait_seconds=self._max_wait,
+        )
@@ -1,9 +1,50 @@
 from fastapi import FastAPI
 
+from src.auth.service.password import password_pool
+from src.auth.service.session_reaper import session_reapers
+from src.config.cache.backend import cache
+from src.config.database.engine import db_helper
+from src.config.database.settings import settings as db_settings
+from src.config.metrics import settings as metrics_settings
+from src.config.session_reaper import settings as reaper_settings
+from src.libs.metrics import mark_process_dead
+from src.metrics import (
+    admission_metrics,
+    cache_metrics,
+    loop_monitor,
+    pool_metrics,
+    worker_pool_metrics,
+)
+
 
 async def lifespan(app: FastAPI):
     # Before app startup
+    if metrics_settings.loop_monitor:
+        loop_monitor.start()
+    password_pool.start()
+    await cache.connect()
+    await db_helper.warm_up(db_settings.db_pool_warmup)
+    db_helper.replicas.start()
+    if metrics_settings.enabled:
+        pool_metrics.start()
+        worker_pool_metrics.start()
+        admission_metrics.start()
+        cache_metrics.start()
+    if reaper_settings.enabled:
+        for reaper in session_reapers:
+            reaper.start()
 
     yield
 
     # After app startup
+    for reaper in session_reapers:
+        await reaper.stop()
+    await pool_metrics.stop()
+    await worker_pool_metrics.stop()
+    await admission_metrics.stop()
+    await cache_metrics.stop()
+    await cache.close()
+    await db_helper.dispose()
+    password_pool.shutdown()
+    await loop_monitor.stop()
+    mark_process_dead()
@@ -0,0 +1,217 @@
+"""
+Prometheus metrics of the application and the endpoint serving them.
+
+With several uvicorn workers every worker records into files below
+PROMETHEUS_MULTIPROC_DIR and the endpoint adds them up, whichever worker
+serves the scrape. The variable must be set in the environment of the
+workers (a .env file is read too late) and point to an empty directory
+on every start.
+"""
+
+from fastapi import APIRouter, Response
+from prometheus_client import Counter, Gauge, Histogram
+
+from src.config.database.engine import db_helper
+from src.config.metrics import settings as metrics_settings
+from src.config.project import settings as main_settings
+from src.libs.loop_monitor import LoopMonitor
+from src.libs.metrics import (
+    AdmissionMetrics,
+    CacheMetrics,
+    PoolMetrics,
+    WorkerPoolMetrics,
+    instrument_engine,
+    render,
+)
+
+# requests, labelled with the route template
+http_requests = Counter(
+    "http_requests_total", "HTTP requests handled", ["method", "route", "status"]
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time to handle an HTTP request",
+    ["method", "route"],
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being handled",
+    multiprocess_mode="livesum",
+)
+
+# CPU-bound work
+password_hash_duration = Histogram(
+    "password_hash_duration_seconds",
+    "Time to hash or verify a password in the worker pool, including the queueing",
+    ["operation"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+jwt_duration = Histogram(
+    "jwt_duration_seconds",
+    "Time to encode or decode a JWT",
+    ["operation"],
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01),
+)
+
+# worker pools running CPU-bound work off the event loop, by pool
+worker_pool_in_flight = Gauge(
+    "worker_pool_in_flight",
+    "Calls submitted to a worker pool and not finished, running or queued",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+worker_pool_queued = Gauge(
+    "worker_pool_queued",
+    "Calls waiting for a free worker",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+worker_pool_completed = Counter(
+    "worker_pool_calls_total", "Calls a worker pool finished", ["pool"]
+)
+worker_pool_wait = Counter(
+    "worker_pool_wait_seconds_total",
+    "Time calls spent waiting for a free worker",
+    ["pool"],
+)
+
+# admission control in front of CPU-bound work, by controller
+admission_active = Gauge(
+    "admission_active",
+    "Callers holding an admission slot",
+    ["controller"],
+    multiprocess_mode="livesum",
+)
+admission_waiting = Gauge(
+    "admission_waiting",
+    "Callers waiting for an admission slot",
+    ["controller"],
+    multiprocess_mode="livesum",
+)
+admission_admitted = Counter(
+    "admission_admitted_total",
+    "Callers that got a slot, directly or after waiting",
+    ["controller"],
+)
+admission_queued = Counter(
+    "admission_queued_total", "Callers that had to wait for a slot", ["controller"]
+)
+admission_shed = Counter(
+    "admission_shed_total",
+    "Callers rejected with 503, queue full or wait timed out",
+    ["controller"],
+)
+
+# in-process and shared caches, by cache
+cache_entries = Gauge(
+    "cache_entries",
+    "Entries stored, zero for remote backends",
+    ["cache"],
+    multiprocess_mode="livesum",
+)
+cache_hits = Counter("cache_hits_total", "Lookups answered by the cache", ["cache"])
+cache_misses = Counter(
+    "cache_misses_total", "Lookups the cache had no answer for", ["cache"]
+)
+cache_evictions = Counter(
+    "cache_evictions_total", "Entries dropped to make room for new ones", ["cache"]
+)
+cache_expirations = Counter(
+    "cache_expirations_total", "Entries dropped because they expired", ["cache"]
+)
+
+# event loop
+event_loop_lag = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop ran a timer, time it was held by other code",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+# database
+db_query_duration = Histogram(
+    "db_query_duration_seconds",
+    "Time to execute a statement",
+    ["database", "statement"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+db_pool_connections = Gauge(
+    "db_pool_connections",
+    "Pooled database connections by state",
+    ["database", "state"],
+    multiprocess_mode="livesum",
+)
+db_pool_checkouts = Counter(
+    "db_pool_checkouts_total", "Connections checked out of the pool", ["database"]
+)
+db_pool_timeouts = Counter(
+    "db_pool_timeouts_total",
+    "Checkouts that gave up waiting for a connection",
+    ["database"],
+)
+db_pool_wait = Counter(
+    "db_pool_wait_seconds_total",
+    "Time checkouts spent waiting for a connection",
+    ["database"],
+)
+
+for name, engine in db_helper.engines().items():
+    instrument_engine(engine, db_query_duration, name)
+
+pool_metrics = PoolMetrics(
+    db_helper.engines,
+    connections=db_pool_connections,
+    checkouts=db_pool_checkouts,
+    timeouts=db_pool_timeouts,
+    wait=db_pool_wait,
+    interval=metrics_settings.pool_interval_seconds,
+)
+
+# pools, controllers and caches are added where they are created
+worker_pool_metrics = WorkerPoolMetrics(
+    in_flight=worker_pool_in_flight,
+    queued=worker_pool_queued,
+    completed=worker_pool_completed,
+    wait=worker_pool_wait,
+    interval=metrics_settings.pool_interval_seconds,
+)
+admission_metrics = AdmissionMetrics(
+    active=admission_active,
+    waiting=admission_waiting,
+    admitted=admission_admitted,
+    queued=admission_queued,
+    shed=admission_shed,
+    interval=metrics_settings.pool_interval_seconds,
+)
+cache_metrics = CacheMetrics(
+    entries=cache_entries,
+    hits=cache_hits,
+    misses=cache_misses,
+    evictions=cache_evictions,
+    expirations=cache_expirations,
+    interval=metrics_settings.pool_interval_seconds,
+)
+
+loop_monitor = LoopMonitor(
+    event_loop_lag,
+    interval=metrics_settings.loop_lag_interval_ms / 1000,
+    block_threshold=(
+        metrics_settings.loop_block_threshold_ms / 1000
+        if main_settings.debug and metrics_settings.loop_block_threshold_ms
+        else None
+    ),
+)
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get(metrics_settings.path, include_in_schema=False)
+async def metrics() -> Response:
+    """
+    Serves the metrics of all workers in the Prometheus text format.
+    """
+    pool_metrics.sync()
+    worker_pool_metrics.sync()
+    admission_metrics.sync()
+    cache_metrics.sync()
+    body, content_type = render()
+    return Response(body, media_type=content_type)
@@ -1,6 +1,21 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from src.config.cors import settings as cors_settings
+from src.config.database.settings import settings as db_settings
+from src.config.metrics import settings as metrics_settings
+from src.config.profiler import settings as profiler_settings
+from src.config.project import settings as main_settings
+from src.libs.loop_monitor import RequestTaskMiddleware
+from src.libs.metrics import HTTPMetricsMiddleware
+from src.libs.profiler import ProfilerMiddleware
+from src.libs.query_stats import QueryStatsMiddleware
+from src.libs.server_timing import ServerTimingMiddleware
+from src.metrics import (
+    http_request_duration,
+    http_requests,
+    http_requests_in_progress,
+    loop_monitor,
+)
 
 
 def init_middleware(app: FastAPI):
@@ -13,3 +28,34 @@ def init_middleware(app: FastAPI):
         allow_origin_regex=cors_settings.allow_origin_regex,
         max_age=cors_settings.max_age,
     )
+
+    if metrics_settings.loop_monitor and loop_monitor.block_threshold is not None:
+        app.add_middleware(RequestTaskMiddleware, monitor=loop_monitor)
+
+    if main_settings.debug or profiler_settings.keys:
+        app.add_middleware(
+            ProfilerMiddleware,
+            directory=profiler_settings.directory,
+            keys=profiler_settings.keys,
+            allow_unsigned=main_settings.debug,
+            interval=profiler_settings.interval_ms / 1000,
+        )
+
+    if metrics_settings.server_timing:
+        app.add_middleware(ServerTimingMiddleware)
+
+    if db_settings.db_query_stats:
+        app.add_middleware(
+            QueryStatsMiddleware,
+            repeat_threshold=db_settings.db_query_repeat_threshold,
+        )
+
+    if metrics_settings.enabled:
+        # added last, so it wraps everything else
+        app.add_middleware(
+            HTTPMetricsMiddleware,
+            requests=http_requests,
+            latency=http_request_duration,
+            in_progress=http_requests_in_progress,
+            exclude=(metrics_settings.path,),
+        )
@@ -6,7 +6,12 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sess
 
 from src.app import app
 from src.libs.base_model import Base
+from src.libs.unit_of_work import unit_of_work
 from src.config.database.engine import db_helper
+from src.auth.cache.user_agent import user_agent_ids
+from src.auth.service.token_cache import access_token_cache
+from src.config.cache.backend import cache
+from src.libs.cache.memory import MemoryCacheBackend
 
 # Use SQLite in-memory for fast testing
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
@@ -30,6 +35,18 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """
+    Drops in-process caches so state does not leak between tests.
+    """
+    access_token_cache.clear()
+    user_agent_ids.clear()
+    if isinstance(cache.backend, MemoryCacheBackend):
+        cache.backend.clear()
+    yield
+
+
 @pytest.fixture(scope="function")
 async def db_session() -> AsyncGenerator[AsyncSession, None]:
     """
@@ -52,11 +69,13 @@ async def client(db_session) -> AsyncGenerator[AsyncClient, None]:
     """
     Creates an asynchronous HTTP client for E2E testing.
 
-    Overrides the production database dependency with the test session.
+    Overrides the production database dependency with the test session,
+    wrapped in a unit of work like the production one.
     """
 
     async def override_get_db():
-        yield db_session
+        async with unit_of_work(db_session):
+            yield db_session
 
     app.dependency_overrides[db_helper.get_session] = override_get_db
 
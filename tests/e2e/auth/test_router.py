@@ -3,8 +3,14 @@ import asyncio
 import pytest
 from httpx import AsyncClient
 from sqlalchemy import select
+from src.auth.dto import MAX_LOOKUP_KEYS
+from src.auth.exceptions.token import InvalidTokenError
 from src.auth.models.user import UserModel
+from src.auth.repositories.user import UserRepository
 from src.auth.service.password import PasswordService
+from src.config.jwt import settings as jwt_settings
+from src.libs.exceptions import ServiceOverloaded
+from src.libs.unit_of_work import commit
 from tests.factories import RegistrationDTOFactory
 
 pytestmark = pytest.mark.asyncio
@@ -112,3 +118,93 @@ async def test_refresh_token_flow(client: AsyncClient, db_session):
 
     assert new_access != original_access
     assert new_refresh != original_refresh
+
+
+async def test_login_returns_503_when_hashing_is_saturated(client: AsyncClient, mocker):
+    """
+    Verifies that shed credential checks surface as 503 with Retry-After.
+    """
+    mocker.patch(
+        "src.auth.service.user.UserService.find",
+        return_value=UserModel(
+            id=1, name="A", login="busy", email="b@b.com", password="x"
+        ),
+    )
+    mocker.patch(
+        "src.auth.service.password.PasswordService.averify_and_update",
+        side_effect=ServiceOverloaded(2),
+    )
+
+    response = await client.post(
+        "/v1/auth/login", json={"login": "busy", "password": "pw"}
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
+
+
+async def test_lookup_users_by_ids_and_logins(client: AsyncClient, db_session):
+    """
+    Verifies that /auth/users/lookup resolves ids and logins in request order.
+    """
+    password = "pw"
+    users = [
+        UserModel(
+            name=f"User {i}",
+            login=f"lookup{i}",
+            email=f"lookup{i}@test.com",
+            password=PasswordService.get_password_hash(password),
+        )
+        for i in range(3)
+    ]
+    db_session.add_all(users)
+    await db_session.commit()
+
+    payload = {
+        "ids": [users[2].id, 999, users[0].id],
+        "logins": ["lookup1", "lookup0", "nobody"],
+    }
+    assert (await client.post("/v1/auth/users/lookup", json=payload)).status_code == 401
+
+    await client.post("/v1/auth/login", json={"login": "lookup0", "password": password})
+    response = await client.post("/v1/auth/users/lookup", json=payload)
+
+    assert response.status_code == 200
+    assert [user["login"] for user in response.json()] == [
+        "lookup2",
+        "lookup0",
+        "lookup1",
+    ]
+    assert all(set(user) == {"id", "name", "login"} for user in response.json())
+
+    too_many = {"ids": list(range(MAX_LOOKUP_KEYS + 1))}
+    assert (
+        await client.post("/v1/auth/users/lookup", json=too_many)
+    ).status_code == 422
+
+
+async def test_lookup_users_rejects_deleted_callers(
+    client: AsyncClient, db_session, monkeypatch
+):
+    """
+    Verifies that /auth/users/lookup reads the caller from the database, while
+    /me keeps trusting the user claims embedded in the access token.
+    """
+    monkeypatch.setattr(jwt_settings, "access_token_embed_user", True)
+    password = "pw"
+    user = UserModel(
+        name="Gone",
+        login="gone",
+        email="gone@test.com",
+        password=PasswordService.get_password_hash(password),
+    )
+    db_session.add(user)
+    await db_session.commit()
+
+    await client.post("/v1/auth/login", json={"login": "gone", "password": password})
+    await UserRepository(db_session).delete(user.id)
+    await commit(db_session)
+
+    assert (await client.get("/v1/auth/me")).status_code == 200
+    with pytest.raises(InvalidTokenError):
+        await client.post("/v1/auth/users/lookup", json={"ids": [user.id]})
@@ -0,0 +1,26 @@
+import pytest
+from httpx import AsyncClient
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_metrics_endpoint_reports_routes(client: AsyncClient):
+    """
+    Verifies that requests are counted by route template and exposed at /metrics.
+    """
+    await client.get("/v1/auth/me")
+    await client.get("/no/such/path")
+
+    response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/v1/auth/me",status="401"}' in body
+    assert 'route="unmatched",status="404"' in body
+    assert 'route="/metrics"' not in body
+    assert "db_pool_connections" in body
+    assert 'admission_shed_total{controller="password"}' in body
+    assert 'worker_pool_queued{pool="password"}' in body
+    assert 'cache_hits_total{cache="user"}' in body
+    assert 'cache_misses_total{cache="access_token"}' in body
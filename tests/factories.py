@@ -1,7 +1,9 @@
+import uuid
+
 from polyfactory.factories.pydantic_factory import ModelFactory
 from polyfactory.factories.sqlalchemy_factory import SQLAlchemyFactory
 
-from src.auth.dto import RegistrationDTO, UserDTO, TokenDTO, BaseUserDTO
+from src.auth.dto import RegistrationDTO, UserDTO, TokenPairDTO, BaseUserDTO
 from src.auth.models.user import UserModel
 
 
@@ -29,13 +31,18 @@ class BaseUserDTOFactory(ModelFactory[BaseUserDTO]):
     __model__ = BaseUserDTO
 
 
-class TokenDTOFactory(ModelFactory[TokenDTO]):
-    """Factory for generating TokenDTO objects."""
+class TokenPairDTOFactory(ModelFactory[TokenPairDTO]):
+    """Factory for generating TokenPairDTO objects."""
 
-    __model__ = TokenDTO
+    __model__ = TokenPairDTO
 
 
 class UserModelFactory(SQLAlchemyFactory[UserModel]):
     """Factory for generating SQLAlchemy User models."""
 
     __model__ = UserModel
+
+
+def fake_jti(label: str) -> str:
+    """Returns a stable refresh token jti (a UUID) for a readable test label."""
+    return str(uuid.uuid5(uuid.NAMESPACE_OID, label))
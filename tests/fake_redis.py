@@ -0,0 +1,101 @@
+import asyncio
+import time
+from typing import Optional
+
+
+class FakeRedisServer:
+    """
+    Minimal in-process server speaking RESP2, for testing Redis clients.
+
+    Supports PING, AUTH, SELECT, GET, MGET, SET (with PX) and DEL.
+    """
+
+    def __init__(self, password: Optional[str] = None) -> None:
+        self.password = password
+        self.data: dict[bytes, tuple[bytes, Optional[float]]] = {}
+        self.commands: list[list[bytes]] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        auth = f":{self.password}@" if self.password else ""
+        return f"redis://{auth}{host}:{port}/1"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        item = self.data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.time():
+            del self.data[key]
+            return None
+        return value
+
+    @staticmethod
+    def _bulk(value: Optional[bytes]) -> bytes:
+        if value is None:
+            return b"$-1\r\n"
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+    async def _read_command(self, reader: asyncio.StreamReader) -> list[bytes]:
+        header = await reader.readline()
+        if not header:
+            raise ConnectionError
+        args = []
+        for _ in range(int(header[1:-2])):
+            length = int((await reader.readline())[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    def _execute(self, authenticated: bool, args: list[bytes]) -> bytes:
+        command = args[0].upper()
+        if self.password and not authenticated and command != b"AUTH":
+            return b"-NOAUTH Authentication required.\r\n"
+        if command == b"PING":
+            return b"+PONG\r\n"
+        if command == b"AUTH":
+            if args[-1].decode() != self.password:
+                return b"-WRONGPASS invalid password\r\n"
+            return b"+OK\r\n"
+        if command == b"SELECT":
+            return b"+OK\r\n"
+        if command == b"GET":
+            return self._bulk(self._get(args[1]))
+        if command == b"MGET":
+            return b"*%d\r\n" % (len(args) - 1) + b"".join(
+                self._bulk(self._get(key)) for key in args[1:]
+            )
+        if command == b"SET":
+            expires_at = None
+            if len(args) == 5 and args[3].upper() == b"PX":
+                expires_at = time.time() + int(args[4]) / 1000
+            self.data[args[1]] = (args[2], expires_at)
+            return b"+OK\r\n"
+        if command == b"DEL":
+            removed = sum(self.data.pop(key, None) is not None for key in args[1:])
+            return b":%d\r\n" % removed
+        return b"-ERR unknown command\r\n"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        authenticated = False
+        try:
+            while True:
+                args = await self._read_command(reader)
+                self.commands.append(args)
+                reply = self._execute(authenticated, args)
+                if args[0].upper() == b"AUTH" and reply == b"+OK\r\n":
+                    authenticated = True
+                writer.write(reply)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,157 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.auth.models.session import UserSessionModel
+from src.auth.models.user import UserModel
+from src.auth.repositories import session as session_repository
+from src.auth.repositories import user as user_repository
+from src.auth.repositories.session import SessionRepository
+from src.auth.repositories.user import UserRepository
+from src.config.database.engine import db_helper
+from src.libs.base_model import Base
+from src.libs.dataloader import DataLoader
+from src.libs.replicas import RoutingSession
+from tests.factories import fake_jti
+
+pytestmark = pytest.mark.asyncio
+
+JTIS = [fake_jti(f"session-{i}") for i in (1, 2, 3)]
+
+
+@pytest.fixture
+async def session_factory(tmp_path, monkeypatch):
+    """
+    Routing sessions on a seeded SQLite file, used by the loaders as well.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(UserModel),
+            [
+                {
+                    "id": i,
+                    "name": f"User {i}",
+                    "login": f"user{i}",
+                    "email": f"user{i}@test.com",
+                    "password": "pw",
+                }
+                for i in (1, 2, 3)
+            ],
+        )
+        await conn.execute(
+            insert(UserSessionModel),
+            [
+                {
+                    "user_id": i,
+                    "refresh_token_jti": jti,
+                    "expires_at": datetime.now() + timedelta(days=1),
+                }
+                for i, jti in enumerate(JTIS, start=1)
+            ],
+        )
+
+    factory = async_sessionmaker(
+        bind=engine, sync_session_class=RoutingSession, expire_on_commit=False
+    )
+    monkeypatch.setattr(db_helper, "session_factory", factory)
+    monkeypatch.setattr(
+        user_repository, "user_loader", DataLoader(user_repository._load_users)
+    )
+    monkeypatch.setattr(
+        session_repository,
+        "session_loader",
+        DataLoader(session_repository._load_sessions),
+    )
+    yield factory
+    await engine.dispose()
+
+
+def _count_queries(factory) -> list[str]:
+    statements = []
+    event.listen(
+        factory.kw["bind"].sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    return statements
+
+
+async def _get_user(factory, pk: int):
+    async with factory() as session:
+        return await UserRepository(session).get(pk)
+
+
+async def _get_session(factory, jti: str):
+    async with factory() as session:
+        return await SessionRepository(session).get_by_jti(jti)
+
+
+async def test_concurrent_user_lookups_share_one_query(session_factory):
+    """
+    Verifies that concurrent requests' lookups by id are answered by one IN query.
+    """
+    statements = _count_queries(session_factory)
+
+    users = await asyncio.gather(
+        *(_get_user(session_factory, pk) for pk in (1, 2, 2, 3, 4))
+    )
+
+    assert [user.login if user else None for user in users] == [
+        "user1",
+        "user2",
+        "user2",
+        "user3",
+        None,
+    ]
+    assert len(statements) == 1
+    assert user_repository.user_loader.stats().coalesced == 1
+
+
+async def test_concurrent_session_lookups_share_one_query(session_factory):
+    """
+    Verifies that concurrent lookups by jti are answered by one IN query.
+    """
+    statements = _count_queries(session_factory)
+
+    sessions = await asyncio.gather(
+        *(_get_session(session_factory, jti) for jti in (*JTIS, fake_jti("missing")))
+    )
+
+    assert [session.user_id if session else None for session in sessions] == [
+        1,
+        2,
+        3,
+        None,
+    ]
+    assert len(statements) == 1
+
+
+async def test_sessions_that_wrote_read_their_own_writes(session_factory):
+    """
+    Verifies that lookups after a write skip the loader and see the uncommitted row.
+    """
+    async with session_factory() as session:
+        repo = UserRepository(session)
+        await repo.update_password(1, "new hash")
+
+        assert (await repo.get(1)).password == "new hash"
+    assert user_repository.user_loader.stats().loads == 0
+
+
+async def test_get_many_chunks_ids(session_factory, monkeypatch):
+    """
+    Verifies that get_many splits long id lists into several IN queries.
+    """
+    monkeypatch.setattr(user_repository, "IN_CHUNK_SIZE", 2)
+    statements = _count_queries(session_factory)
+
+    async with session_factory() as session:
+        users = await UserRepository(session).get_many([3, 1, 1, 2, 9])
+
+    assert sorted(users) == [1, 2, 3]
+    assert len(statements) == 2
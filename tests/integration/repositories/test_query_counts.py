@@ -0,0 +1,100 @@
+"""
+Statements the hot repository paths run, guards against extra round trips
+such as re-reading a row after a write.
+"""
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.auth.cache.user import user_cache
+from src.auth.dto import FindUserDTO
+from src.auth.entities import UserEntity
+from src.auth.repositories.user import UserRepository
+from src.libs.base_model import Base
+from src.libs.query_stats import instrument_queries, track_queries
+from src.libs.replicas import RoutingSession
+from src.libs.unit_of_work import unit_of_work
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+async def sessions(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    instrument_queries(engine, slow_threshold=None)
+    yield async_sessionmaker(
+        engine, sync_session_class=RoutingSession, expire_on_commit=False
+    )
+    await engine.dispose()
+
+
+@pytest.fixture
+async def session(sessions):
+    async with sessions() as session:
+        yield session
+
+
+def _kinds(stats) -> list[str]:
+    return [
+        statement.split()[0]
+        for statement, count in stats.statements.items()
+        for _ in range(count)
+    ]
+
+
+async def test_create_user_runs_a_single_insert(session):
+    """
+    Verifies that the created row comes back from RETURNING, not another SELECT.
+    """
+    with track_queries() as stats:
+        async with unit_of_work(session):
+            await UserRepository(session).create(
+                UserEntity(name="N", login="counted", email="c@test.com", password="pw")
+            )
+
+    assert _kinds(stats).count("INSERT") == 1
+    assert "SELECT" not in _kinds(stats)
+
+
+async def test_lookups_run_one_select_and_then_hit_the_cache(sessions, session):
+    """
+    Verifies one SELECT per uncached lookup and none for cached ones.
+    """
+    async with sessions() as writer, unit_of_work(writer):
+        user = await UserRepository(writer).create(
+            UserEntity(name="N", login="cached", email="cached@test.com", password="pw")
+        )
+    repo = UserRepository(session)
+
+    with track_queries() as stats:
+        await repo.find(FindUserDTO(login="cached"))
+        await repo.find(FindUserDTO(login="cached"))
+        await repo.get(user.id)
+
+    assert _kinds(stats) == ["SELECT"]
+
+
+async def test_reads_after_a_write_are_cached_on_commit(session):
+    """
+    Verifies that users read by a session that wrote reach the cache only
+    once committed, never after a rollback.
+    """
+    repo = UserRepository(session)
+    async with unit_of_work(session):
+        await repo.create(
+            UserEntity(name="N", login="pending", email="p@test.com", password="pw")
+        )
+        await repo.find(FindUserDTO(login="pending"))
+        assert await user_cache.lookup("login", "pending") == (False, None)
+    assert (await user_cache.lookup("login", "pending"))[0]
+
+    with pytest.raises(RuntimeError):
+        async with unit_of_work(session):
+            await repo.create(
+                UserEntity(name="N", login="rolled", email="r@test.com", password="pw")
+            )
+            await repo.find(FindUserDTO(login="rolled"))
+            raise RuntimeError
+    assert await user_cache.lookup("login", "rolled") == (False, None)
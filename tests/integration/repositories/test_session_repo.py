@@ -0,0 +1,223 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from src.auth.cache.session import session_cache
+from src.auth.cache.user_agent import user_agent_ids
+from src.auth.entities import SessionEntity, UserEntity
+from src.auth.exceptions.session import SessionNotFound
+from src.auth.models.user_agent import UserAgentModel
+from src.auth.repositories.session import SessionRepository
+from src.auth.repositories.user import UserRepository
+from src.libs.unit_of_work import unit_of_work
+from tests.factories import fake_jti
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _create_user(db_session, login: str = "owner") -> int:
+    user = await UserRepository(db_session).create(
+        UserEntity(name="Owner", login=login, email=f"{login}@test.com", password="pw")
+    )
+    return user.id
+
+
+def _session_entity(user_id: int, jti: str) -> SessionEntity:
+    return SessionEntity(
+        user_id=user_id,
+        refresh_token_jti=jti,
+        expires_at=datetime.now() + timedelta(days=1),
+        user_agent="pytest",
+        ip_address="127.0.0.1",
+    )
+
+
+async def test_get_by_jti_reads_through_cache(db_session):
+    """
+    Verifies that sessions are cached by jti after the first lookup.
+    """
+    repo = SessionRepository(db_session)
+    user_id = await _create_user(db_session)
+    created = await repo.create(_session_entity(user_id, fake_jti("1")))
+
+    assert await session_cache.get(fake_jti("1")) is None
+    found = await repo.get_by_jti(fake_jti("1"))
+
+    assert found == created
+    assert await session_cache.get(fake_jti("1")) == created
+
+
+async def test_revoking_sessions_invalidates_cache(db_session):
+    """
+    Verifies that revoked sessions are not served from the cache.
+    """
+    repo = SessionRepository(db_session)
+    user_id = await _create_user(db_session)
+    for jti in (fake_jti("a"), fake_jti("b"), fake_jti("c")):
+        await repo.create(_session_entity(user_id, jti))
+        await repo.get_by_jti(jti)
+
+    async with unit_of_work(db_session):
+        await repo.delete_by_jti(fake_jti("a"))
+        await repo.delete_all_for_user(user_id)
+
+    for jti in (fake_jti("a"), fake_jti("b"), fake_jti("c")):
+        assert await repo.get_by_jti(jti) is None
+
+
+async def test_rotate_jti_returns_session_and_owner(db_session):
+    """
+    Verifies that rotation swaps the jti and returns the session owner.
+    """
+    repo = SessionRepository(db_session)
+    user_id = await _create_user(db_session)
+    await repo.create(_session_entity(user_id, fake_jti("old")))
+    await repo.get_by_jti(fake_jti("old"))
+    new_expires_at = datetime.now() + timedelta(days=7)
+
+    async with unit_of_work(db_session):
+        session, user = await repo.rotate_jti(
+            user_id, fake_jti("old"), fake_jti("new"), new_expires_at
+        )
+
+    assert session.refresh_token_jti == fake_jti("new")
+    assert session.expires_at == new_expires_at
+    assert user.id == user_id
+    assert user.login == "owner"
+    assert await repo.get_by_jti(fake_jti("old")) is None
+    assert await repo.get_by_jti(fake_jti("new")) == session
+
+
+async def test_rotate_jti_only_once(db_session):
+    """
+    Verifies that a refresh token jti cannot be rotated twice.
+    """
+    repo = SessionRepository(db_session)
+    user_id = await _create_user(db_session)
+    await repo.create(_session_entity(user_id, fake_jti("old")))
+    expires_at = datetime.now() + timedelta(days=7)
+
+    await repo.rotate_jti(user_id, fake_jti("old"), fake_jti("first"), expires_at)
+
+    with pytest.raises(SessionNotFound):
+        await repo.rotate_jti(user_id, fake_jti("old"), fake_jti("second"), expires_at)
+
+
+async def test_rotate_jti_checks_owner(db_session):
+    """
+    Verifies that a jti cannot be rotated on behalf of another user.
+    """
+    repo = SessionRepository(db_session)
+    user_id = await _create_user(db_session)
+    other_id = await _create_user(db_session, login="other")
+    await repo.create(_session_entity(user_id, fake_jti("old")))
+
+    with pytest.raises(SessionNotFound):
+        await repo.rotate_jti(
+            other_id,
+            fake_jti("old"),
+            fake_jti("new"),
+            datetime.now() + timedelta(days=7),
+        )
+
+
+async def test_create_returns_server_defaults(db_session):
+    """
+    Verifies that the created session carries its generated id and timestamp.
+    """
+    repo = SessionRepository(db_session)
+    user_id = await _create_user(db_session)
+
+    created = await repo.create(_session_entity(user_id, fake_jti("1")))
+
+    assert created.id is not None
+    assert created.created_at is not None
+    assert created.refresh_token_jti == fake_jti("1")
+
+
+async def test_update_jti(db_session):
+    """
+    Verifies that update_jti replaces the jti and fails for unknown ones.
+    """
+    repo = SessionRepository(db_session)
+    user_id = await _create_user(db_session)
+    await repo.create(_session_entity(user_id, fake_jti("old")))
+    expires_at = datetime.now() + timedelta(days=7)
+
+    async with unit_of_work(db_session):
+        await repo.update_jti(fake_jti("old"), fake_jti("new"), expires_at)
+
+    assert (await repo.get_by_jti(fake_jti("new"))).expires_at == expires_at
+    with pytest.raises(SessionNotFound):
+        await repo.update_jti(fake_jti("old"), fake_jti("other"), expires_at)
+
+
+async def test_delete_expired(db_session):
+    """
+    Verifies that only expired sessions are deleted, at most `limit` at a time.
+    """
+    repo = SessionRepository(db_session)
+    user_id = await _create_user(db_session)
+    for i in range(3):
+        entity = _session_entity(user_id, fake_jti(f"expired-{i}"))
+        entity.expires_at = datetime.now() - timedelta(minutes=1)
+        await repo.create(entity)
+    await repo.create(_session_entity(user_id, fake_jti("active")))
+    await repo.get_by_jti(fake_jti("expired-0"))
+
+    async with unit_of_work(db_session):
+        assert await repo.delete_expired(before=datetime.now(), limit=2) == 2
+        assert await repo.delete_expired(before=datetime.now(), limit=2) == 1
+        assert await repo.delete_expired(before=datetime.now(), limit=2) == 0
+    assert await repo.get_by_jti(fake_jti("expired-0")) is None
+    assert await repo.get_by_jti(fake_jti("active")) is not None
+
+
+async def test_user_agents_are_interned(db_session):
+    """
+    Verifies that equal user agents share one row and are returned as strings.
+    """
+    repo = SessionRepository(db_session)
+    user_id = await _create_user(db_session)
+    first = await repo.create(_session_entity(user_id, fake_jti("first")))
+    user_agent_ids.clear()
+    await repo.create(_session_entity(user_id, fake_jti("second")))
+    entity = _session_entity(user_id, fake_jti("invalid-ip"))
+    entity.ip_address = "not-an-ip"
+    await repo.create(entity)
+
+    count = await db_session.scalar(select(func.count()).select_from(UserAgentModel))
+    found = await repo.get_by_jti(fake_jti("second"))
+    session, _ = await repo.rotate_jti(
+        user_id,
+        fake_jti("first"),
+        fake_jti("rotated"),
+        datetime.now() + timedelta(days=1),
+    )
+
+    assert count == 1
+    assert first.user_agent == found.user_agent == session.user_agent == "pytest"
+    assert found.ip_address == "127.0.0.1"
+    assert (await repo.get_by_jti(fake_jti("invalid-ip"))).ip_address is None
+
+
+async def test_rollback_discards_writes_and_keeps_cache(db_session):
+    """
+    Verifies that a failed unit of work undoes every write and leaves the cache alone.
+    """
+    repo = SessionRepository(db_session)
+    user_id = await _create_user(db_session)
+    async with unit_of_work(db_session):
+        await repo.create(_session_entity(user_id, fake_jti("kept")))
+    cached = await repo.get_by_jti(fake_jti("kept"))
+
+    with pytest.raises(RuntimeError):
+        async with unit_of_work(db_session):
+            await repo.create(_session_entity(user_id, fake_jti("discarded")))
+            await repo.delete_by_jti(fake_jti("kept"))
+            raise RuntimeError
+
+    assert await session_cache.get(fake_jti("kept")) == cached
+    assert await repo.get_by_jti(fake_jti("discarded")) is None
+    assert await repo.get_by_jti(fake_jti("kept")) == cached
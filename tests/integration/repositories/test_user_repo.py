@@ -1,11 +1,13 @@
 import pytest
-from sqlalchemy import select
+from sqlalchemy import delete, select
 
 from src.auth.repositories.user import UserRepository
+from src.auth.service.user import UserService
 from src.auth.entities import UserEntity
 from src.auth.models.user import UserModel
 from src.auth.exceptions.user import UserAlreadyExist, UserNotFound
 from src.auth.dto import UpdateUserDTO, FindUserDTO
+from src.libs.unit_of_work import commit, unit_of_work
 
 pytestmark = pytest.mark.asyncio
 
@@ -45,11 +47,14 @@ async def test_create_duplicate_user_raises_error(db_session):
         email="unique@example.com",
         password="hashed",
     )
-    await repo.create(entity)
+    first = await repo.create(entity)
 
     with pytest.raises(UserAlreadyExist):
         await repo.create(entity)
 
+    # only the savepoint is rolled back, the transaction keeps the first user
+    assert (await repo.get(first.id)).login == "unique_login"
+
 
 async def test_find_user_by_criteria(db_session):
     """
@@ -69,6 +74,34 @@ async def test_find_user_by_criteria(db_session):
     assert found_user.login == "find_me"
 
 
+async def test_find_many_reads_through_cache(db_session):
+    """
+    Verifies batch lookups by id and login, and that answers are cached.
+    """
+    repo = UserRepository(db_session)
+    db_session.add_all(
+        UserModel(name=name, login=name, email=f"{name}@a.com", password="pw")
+        for name in ("first", "second")
+    )
+    await db_session.commit()
+
+    by_login = await repo.find_many("login", ["second", "first", "second", "ghost"])
+    assert {login: user.login for login, user in by_login.items()} == {
+        "second": "second",
+        "first": "first",
+    }
+    # the session wrote, its reads reach the cache on commit
+    await commit(db_session)
+
+    ids = [user.id for user in by_login.values()]
+    await db_session.execute(delete(UserModel))
+    await db_session.commit()
+
+    # served from the cache, the rows are gone
+    assert sorted(await repo.find_many("id", ids)) == sorted(ids)
+    assert await repo.find_many("login", ["ghost"]) == {}
+
+
 async def test_update_user_not_found(db_session):
     """
     Verifies that updating a non-existent user raises UserNotFound.
@@ -78,3 +111,62 @@ async def test_update_user_not_found(db_session):
 
     with pytest.raises(UserNotFound):
         await repo.update(update_dto, pk=9999)
+
+
+async def test_update_password(db_session):
+    """
+    Verifies that the password hash can be replaced.
+    """
+    repo = UserRepository(db_session)
+    user = await repo.create(
+        UserEntity(name="A", login="rehash_me", email="r@a.com", password="old")
+    )
+
+    await repo.update_password(user.id, "new")
+
+    refreshed = await repo.get(user.id)
+    assert refreshed.password == "new"
+
+    with pytest.raises(UserNotFound):
+        await repo.update_password(9999, "new")
+
+
+async def test_writes_invalidate_user_cache(db_session):
+    """
+    Verifies that repository writes are visible through the cached service.
+    """
+    repo = UserRepository(db_session)
+    service = UserService(repo)
+
+    assert await service.find(FindUserDTO(login="late")) is None
+
+    async with unit_of_work(db_session):
+        user = await repo.create(
+            UserEntity(name="A", login="late", email="late@a.com", password="pw")
+        )
+    assert (await service.find(FindUserDTO(login="late"))).id == user.id
+
+    async with unit_of_work(db_session):
+        await repo.update(UpdateUserDTO(name="Renamed"), pk=user.id)
+    assert (await service.get(user.id)).name == "Renamed"
+
+    async with unit_of_work(db_session):
+        await repo.delete(user.id)
+    assert await service.get(user.id) is None
+
+
+async def test_credential_lookups_bypass_the_user_cache(db_session):
+    """
+    Verifies that cached users carry no password and login lookups still get it.
+    """
+    repo = UserRepository(db_session)
+    async with unit_of_work(db_session):
+        await repo.create(
+            UserEntity(name="A", login="warm", email="warm@a.com", password="pw-hash")
+        )
+
+    await repo.find(FindUserDTO(login="warm"))
+    await commit(db_session)
+    assert (await repo.find(FindUserDTO(login="warm"))).password is None
+    found = await repo.find(FindUserDTO(login="warm"), with_password=True)
+    assert found.password == "pw-hash"
@@ -0,0 +1,192 @@
+"""
+Repositories over two local SQLite databases acting as shards. The sequence
+test needs a real PostgreSQL, set TEST_POSTGRES_URL to enable it. The
+database is wiped.
+"""
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.auth.dto import FindUserDTO, UpdateUserDTO
+from src.auth.entities import SessionEntity, UserEntity
+from src.auth.exceptions.user import UserAlreadyExist
+from src.auth.repositories.session import SessionRepository
+from src.auth.repositories.user import UserRepository
+from src.libs.base_model import Base
+from src.libs.replicas import RoutingSession
+from src.libs.shards import ShardRouter, configure_sequence
+from src.libs.unit_of_work import unit_of_work
+from tests.factories import fake_jti
+
+pytestmark = [pytest.mark.asyncio, pytest.mark.integration]
+
+
+@pytest.fixture
+async def router(tmp_path):
+    engines = [
+        create_async_engine(f"sqlite+aiosqlite:///{tmp_path / f'shard{shard}.db'}")
+        for shard in range(2)
+    ]
+    for engine in engines:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    yield ShardRouter(engines)
+    for engine in engines:
+        await engine.dispose()
+
+
+@pytest.fixture
+async def sharded_session(router):
+    factory = async_sessionmaker(
+        bind=router.engines[0],
+        sync_session_class=RoutingSession,
+        shards=router,
+        expire_on_commit=False,
+    )
+    async with factory() as session:
+        yield session
+
+
+def _login_on(router: ShardRouter, shard: int, prefix: str = "user") -> str:
+    return next(
+        f"{prefix}{i}"
+        for i in range(100)
+        if router.shard_for_key(f"{prefix}{i}") == shard
+    )
+
+
+async def _create(session, login: str, email: str | None = None):
+    async with unit_of_work(session):
+        return await UserRepository(session).create(
+            UserEntity(
+                name="N", login=login, email=email or f"{login}@test.com", password="pw"
+            )
+        )
+
+
+async def test_users_are_placed_and_found_across_shards(router, sharded_session):
+    """
+    Verifies shard placement by login and lookups by id, login and email.
+    """
+    users = [
+        await _create(sharded_session, _login_on(router, shard)) for shard in (0, 1)
+    ]
+    repo = UserRepository(sharded_session)
+
+    for shard, user in enumerate(users):
+        assert router.shard_for_user(user.id) == shard
+        assert (await repo.get(user.id)).login == user.login
+        assert (await repo.find(FindUserDTO(login=user.login))).id == user.id
+        assert (await repo.find(FindUserDTO(email=user.email))).id == user.id
+    assert await repo.find(FindUserDTO(login="missing")) is None
+    assert [user.id for user in await repo.get_list()] == sorted(
+        user.id for user in users
+    )
+
+
+async def test_logins_and_emails_are_unique_across_shards(router, sharded_session):
+    """
+    Verifies that the directory rejects duplicates that live on other shards.
+    """
+    user = await _create(sharded_session, _login_on(router, 0))
+
+    with pytest.raises(UserAlreadyExist):
+        await _create(sharded_session, _login_on(router, 1), email=user.email)
+    with pytest.raises(UserAlreadyExist):
+        await _create(sharded_session, user.login, email="other@test.com")
+
+
+async def test_batch_lookups_span_shards(router, sharded_session):
+    """
+    Verifies get_many and get_many_by_login over users on both shards.
+    """
+    users = [
+        await _create(sharded_session, _login_on(router, shard)) for shard in (0, 1)
+    ]
+    repo = UserRepository(sharded_session)
+
+    by_id = await repo.get_many([user.id for user in users] + [999])
+    by_login = await repo.get_many_by_login(
+        [user.login for user in users] + ["missing"]
+    )
+
+    assert {pk: user.login for pk, user in by_id.items()} == {
+        u.id: u.login for u in users
+    }
+    assert {login: user.id for login, user in by_login.items()} == {
+        u.login: u.id for u in users
+    }
+
+
+async def test_login_change_moves_directory_entry(router, sharded_session):
+    """
+    Verifies that a renamed user is found by the new login only.
+    """
+    user = await _create(sharded_session, _login_on(router, 0))
+    new_login = _login_on(router, 1, prefix="renamed")
+    repo = UserRepository(sharded_session)
+
+    async with unit_of_work(sharded_session):
+        await repo.update(UpdateUserDTO(login=new_login), pk=user.id)
+
+    assert await repo.find(FindUserDTO(login=user.login)) is None
+    assert (await repo.find(FindUserDTO(login=new_login))).id == user.id
+
+
+async def test_sessions_live_on_the_user_shard(router, sharded_session):
+    """
+    Verifies session writes on the owner's shard and lookups by jti alone.
+    """
+    user = await _create(sharded_session, _login_on(router, 1))
+    repo = SessionRepository(sharded_session)
+    async with unit_of_work(sharded_session):
+        await repo.create(
+            SessionEntity(
+                user_id=user.id,
+                refresh_token_jti=fake_jti("old"),
+                expires_at=datetime.now() + timedelta(days=1),
+                user_agent="pytest",
+                ip_address=None,
+            )
+        )
+
+    async with unit_of_work(sharded_session):
+        session, owner = await repo.rotate_jti(
+            user.id,
+            fake_jti("old"),
+            fake_jti("new"),
+            datetime.now() + timedelta(days=1),
+        )
+    assert owner.login == user.login
+    assert session.user_agent == "pytest"
+    assert (await repo.get_by_jti(fake_jti("new"))).user_id == user.id
+
+    async with unit_of_work(sharded_session):
+        await repo.delete_by_jti(fake_jti("new"))
+    assert await repo.get_by_jti(fake_jti("new")) is None
+
+
+@pytest.mark.skipif(
+    not os.getenv("TEST_POSTGRES_URL"), reason="TEST_POSTGRES_URL is not set"
+)
+async def test_configure_sequence_strides_ids():
+    """
+    Verifies that a configured PostgreSQL sequence only hands out the shard's ids.
+    """
+    engine = create_async_engine(os.environ["TEST_POSTGRES_URL"])
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        assert await configure_sequence(conn, "users", shard=2, count=3) == 3
+
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    async with factory() as session:
+        ids = [(await _create(session, f"pg{i}")).id for i in range(3)]
+
+    assert ids == [3, 6, 9]
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
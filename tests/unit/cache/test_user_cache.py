@@ -0,0 +1,94 @@
+from src.auth.cache.user import UserCache
+from src.libs.cache.base import Cache
+from src.libs.cache.memory import MemoryCacheBackend
+from tests.factories import BaseUserDTOFactory
+
+
+def _user_cache(negative_ttl: float = 5) -> UserCache:
+    return UserCache(Cache(MemoryCacheBackend(100)), ttl=60, negative_ttl=negative_ttl)
+
+
+async def test_lookup_by_any_field_after_store():
+    user_cache = _user_cache()
+    user = BaseUserDTOFactory.build(id=1, password="hash")
+
+    assert await user_cache.lookup("id", 1) == (False, None)
+    await user_cache.store("id", 1, user)
+
+    cached = user.model_copy(update={"password": None})
+    assert await user_cache.lookup("id", 1) == (True, cached)
+    assert await user_cache.lookup("login", user.login) == (True, cached)
+    assert await user_cache.lookup("email", str(user.email)) == (True, cached)
+
+    stats = user_cache.stats()
+    assert stats.hits == 3
+    assert stats.misses == 1
+
+
+async def test_password_hashes_are_not_cached():
+    user_cache = _user_cache()
+    await user_cache.store(
+        "id", 2, BaseUserDTOFactory.build(id=2, password="secret-hash")
+    )
+
+    assert b"secret-hash" not in await user_cache.cache.get("id:2")
+    assert (await user_cache.lookup_many("id", [2]))[2].password is None
+
+
+async def test_negative_lookups_are_cached_until_invalidated():
+    user_cache = _user_cache()
+
+    await user_cache.store("login", "ghost", None)
+    assert await user_cache.lookup("login", "ghost") == (True, None)
+
+    await user_cache.invalidate(login="ghost")
+    assert await user_cache.lookup("login", "ghost") == (False, None)
+
+
+async def test_negative_caching_can_be_disabled():
+    user_cache = _user_cache(negative_ttl=0)
+
+    await user_cache.store("login", "ghost", None)
+    assert await user_cache.lookup("login", "ghost") == (False, None)
+
+
+async def test_stale_alias_after_rename_is_a_miss():
+    user_cache = _user_cache()
+    user = BaseUserDTOFactory.build(id=3, login="old")
+    await user_cache.store("id", 3, user)
+
+    # the user was renamed and re-read, the old login alias must not resolve
+    await user_cache.invalidate(pk=3)
+    await user_cache.store("id", 3, user.model_copy(update={"login": "new"}))
+
+    assert await user_cache.lookup("login", "old") == (False, None)
+    assert (await user_cache.lookup("login", "new"))[1].id == 3
+
+
+async def test_store_many_caches_found_and_missing_users():
+    user_cache = _user_cache()
+    user = BaseUserDTOFactory.build(id=4)
+
+    await user_cache.store_many("login", {user.login: user, "ghost": None})
+
+    found = await user_cache.lookup_many("login", [user.login, "ghost"])
+    assert found == {
+        user.login: user.model_copy(update={"password": None}),
+        "ghost": None,
+    }
+    assert (await user_cache.lookup("id", 4))[1].id == 4
+
+
+async def test_hits_are_not_validated_again():
+    user_cache = _user_cache()
+    # an entry written before passwords were excluded, with a value the
+    # validators would reject: the cache trusts what it stored
+    await user_cache.cache.set(
+        "id:5",
+        b'{"id": 5, "name": "n", "login": "l", "email": "x", "password": "h"}',
+    )
+
+    cached, user = await user_cache.lookup("id", 5)
+
+    assert cached
+    assert (user.email, user.password) == ("x", None)
@@ -1,12 +1,18 @@
+import time
+
 import pytest
 from unittest.mock import AsyncMock
-from src.auth.dependencies.current_user import get_current_user
+from src.auth.dependencies.current_user import get_current_user, get_fresh_current_user
 from src.auth.exceptions.token import AccessTokenMissing, InvalidTokenError
 from src.auth.dto import UserDTO
 
 pytestmark = pytest.mark.asyncio
 
 
+def _payload(**claims) -> dict:
+    return {"token_type": "access", "exp": int(time.time()) + 60, **claims}
+
+
 async def test_get_current_user_success():
     """Verify dependency returns user when everything is valid."""
     # Arrange
@@ -14,7 +20,7 @@ async def test_get_current_user_success():
     mock_token_service = AsyncMock()
 
     token = "valid_token"
-    mock_token_service.decode_token.return_value = {"user": {"user_id": "1"}}
+    mock_token_service.verify_access_token.return_value = _payload(sub="1")
 
     expected_user = UserDTO(id=1, name="A", login="a", email="a@a.com")
     mock_user_service.get.return_value = expected_user
@@ -42,7 +48,79 @@ async def test_get_current_user_missing_cookie():
 async def test_get_current_user_invalid_payload():
     """Verify token without user_id raises error."""
     mock_token_service = AsyncMock()
-    mock_token_service.decode_token.return_value = {}  # Empty payload
+    mock_token_service.verify_access_token.return_value = _payload()  # No subject
 
     with pytest.raises(InvalidTokenError):
         await get_current_user(AsyncMock(), mock_token_service, access_token="token")
+
+
+async def test_get_current_user_verifies_token_once():
+    """Verify repeated calls with the same token hit the verified token cache."""
+    mock_user_service = AsyncMock()
+    mock_user_service.get.return_value = UserDTO(
+        id=1, name="A", login="a", email="a@a.com"
+    )
+    mock_token_service = AsyncMock()
+    mock_token_service.verify_access_token.return_value = _payload(sub="1")
+
+    for _ in range(3):
+        await get_current_user(
+            mock_user_service, mock_token_service, access_token="cached"
+        )
+
+    mock_token_service.verify_access_token.assert_awaited_once_with("cached")
+
+
+async def test_get_current_user_does_not_reuse_expired_tokens():
+    """Verify cache entries never outlive the token exp claim."""
+    mock_user_service = AsyncMock()
+    mock_user_service.get.return_value = UserDTO(
+        id=1, name="A", login="a", email="a@a.com"
+    )
+    mock_token_service = AsyncMock()
+    mock_token_service.verify_access_token.return_value = {
+        "sub": "1",
+        "exp": int(time.time()) - 1,
+    }
+
+    for _ in range(2):
+        await get_current_user(
+            mock_user_service, mock_token_service, access_token="stale"
+        )
+
+    assert mock_token_service.verify_access_token.await_count == 2
+
+
+async def test_get_current_user_from_self_contained_token():
+    """Verify embedded user claims are used without a database lookup."""
+    mock_user_service = AsyncMock()
+    mock_token_service = AsyncMock()
+    mock_token_service.verify_access_token.return_value = _payload(
+        sub="5", name="A", login="a", email="a@a.com"
+    )
+
+    result = await get_current_user(
+        mock_user_service, mock_token_service, access_token="t"
+    )
+
+    assert result == UserDTO(id=5, name="A", login="a", email="a@a.com")
+    mock_user_service.get.assert_not_called()
+
+
+async def test_get_fresh_current_user_reads_database():
+    """Verify the fresh variant ignores embedded claims."""
+    mock_user_service = AsyncMock()
+    mock_user_service.get.return_value = UserDTO(
+        id=5, name="B", login="a", email="a@a.com"
+    )
+    mock_token_service = AsyncMock()
+    mock_token_service.verify_access_token.return_value = _payload(
+        sub="5", name="A", login="a", email="a@a.com"
+    )
+
+    result = await get_fresh_current_user(
+        mock_user_service, mock_token_service, access_token="t"
+    )
+
+    assert result.name == "B"
+    mock_user_service.get.assert_awaited_once_with(5)
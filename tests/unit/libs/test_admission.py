@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from src.libs.admission import AdmissionController
+from src.libs.exceptions import ServiceOverloaded
+
+
+async def _hold(controller: AdmissionController, release: asyncio.Event):
+    async with controller.admit():
+        await release.wait()
+
+
+async def test_admits_up_to_concurrency_and_queues_the_rest():
+    controller = AdmissionController(max_concurrency=1, max_queue=1, max_wait=1)
+    release = asyncio.Event()
+
+    first = asyncio.create_task(_hold(controller, release))
+    second = asyncio.create_task(_hold(controller, release))
+    await asyncio.sleep(0)
+
+    stats = controller.stats()
+    assert stats.active == 1
+    assert stats.waiting == 1
+
+    release.set()
+    await asyncio.gather(first, second)
+
+    stats = controller.stats()
+    assert stats.admitted == 2
+    assert stats.queued == 1
+    assert stats.active == 0
+
+
+async def test_sheds_when_queue_is_full():
+    controller = AdmissionController(max_concurrency=1, max_queue=0, max_wait=3)
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(controller, release))
+    await asyncio.sleep(0)
+
+    with pytest.raises(ServiceOverloaded) as exc:
+        async with controller.admit():
+            pass
+
+    assert exc.value.retry_after == 3
+    assert controller.stats().shed == 1
+    release.set()
+    await holder
+
+
+async def test_sheds_after_max_wait():
+    controller = AdmissionController(max_concurrency=1, max_queue=5, max_wait=0.01)
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(controller, release))
+    await asyncio.sleep(0)
+
+    with pytest.raises(ServiceOverloaded):
+        async with controller.admit():
+            pass
+
+    stats = controller.stats()
+    assert stats.shed == 1
+    assert stats.waiting == 0
+    release.set()
+    await holder
+    assert controller.stats().active == 0
+
+
+async def test_cancelled_waiter_does_not_leak_slot():
+    controller = AdmissionController(max_concurrency=1, max_queue=5, max_wait=5)
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(controller, release))
+    waiter = asyncio.create_task(_hold(controller, asyncio.Event()))
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    release.set()
+    await holder
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert controller.stats().active == 0
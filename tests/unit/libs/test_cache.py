@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+
+from src.libs.cache.base import Cache, CacheError
+from src.libs.cache.memory import MemoryCacheBackend
+from src.libs.cache.redis import RedisCacheBackend, _Connection
+from tests.fake_redis import FakeRedisServer
+
+
+@pytest.fixture
+async def redis_server():
+    server = FakeRedisServer(password="secret")
+    await server.start()
+    yield server
+    await server.stop()
+
+
+@pytest.fixture(params=["memory", "redis"])
+async def backend(request, redis_server):
+    if request.param == "memory":
+        yield MemoryCacheBackend(maxsize=100)
+        return
+    backend = RedisCacheBackend(redis_server.url, pool_size=2)
+    await backend.connect()
+    yield backend
+    await backend.close()
+
+
+async def test_get_set_delete(backend):
+    cache = Cache(backend, namespace="test")
+
+    assert await cache.get("a") is None
+    await cache.set("a", b"1")
+    assert await cache.get("a") == b"1"
+
+    await cache.delete("a", "missing")
+    assert await cache.get("a") is None
+
+
+async def test_mget_keeps_key_order(backend):
+    cache = Cache(backend)
+    await cache.set("a", b"1")
+    await cache.set("c", b"3")
+
+    assert await cache.mget(["a", "b", "c"]) == [b"1", None, b"3"]
+    assert await cache.mget([]) == []
+
+
+async def test_ttl_expires_entries(backend):
+    cache = Cache(backend)
+    await cache.set("short", b"1", ttl=0.01)
+    await cache.set("long", b"2", ttl=60)
+    await asyncio.sleep(0.05)
+
+    assert await cache.get("short") is None
+    assert await cache.get("long") == b"2"
+
+
+async def test_set_many(backend):
+    cache = Cache(backend, namespace="test")
+    await cache.set_many({"a": b"1", "b": b"2"}, ttl=0.01)
+    await cache.set_many({"c": b"3"})
+    await cache.set_many({})
+
+    assert await cache.mget(["a", "b", "c"]) == [b"1", b"2", b"3"]
+    await asyncio.sleep(0.05)
+    assert await cache.mget(["a", "b", "c"]) == [None, None, b"3"]
+
+
+async def test_namespaces_do_not_collide(backend):
+    cache = Cache(backend, namespace="app")
+    users, sessions = cache.namespace("user"), cache.namespace("session")
+
+    await users.set("1", b"user")
+    await sessions.set("1", b"session")
+
+    assert await users.get("1") == b"user"
+    assert await sessions.get("1") == b"session"
+
+
+async def test_redis_keys_are_prefixed(redis_server):
+    backend = RedisCacheBackend(redis_server.url)
+    await Cache(backend, namespace="app").namespace("user").set("1", b"x", ttl=5)
+
+    assert [b"SET", b"app:user:1", b"x", b"PX", b"5000"] in redis_server.commands
+    assert [b"SELECT", b"1"] in redis_server.commands
+    await backend.close()
+
+
+async def test_redis_concurrent_commands_share_pool(redis_server):
+    backend = RedisCacheBackend(redis_server.url, pool_size=2)
+    await asyncio.gather(*(backend.set(f"k{i}", b"v") for i in range(20)))
+
+    assert await backend.mget([f"k{i}" for i in range(20)]) == [b"v"] * 20
+    assert len(backend._idle) <= 2
+    await backend.close()
+
+
+async def test_redis_set_many_is_one_round_trip(redis_server, mocker):
+    backend = RedisCacheBackend(redis_server.url)
+    await backend.connect()
+    execute = mocker.spy(_Connection, "execute")
+    pipeline = mocker.spy(_Connection, "pipeline")
+
+    await backend.set_many({f"k{i}": b"v" for i in range(100)}, ttl=5)
+
+    assert execute.call_count == 0
+    assert pipeline.call_count == 1
+    assert [b"SET", b"k99", b"v", b"PX", b"5000"] in redis_server.commands
+    await backend.close()
+
+
+async def test_redis_pipeline_error_keeps_connection_in_sync(redis_server):
+    backend = RedisCacheBackend(redis_server.url, pool_size=1)
+
+    with pytest.raises(CacheError, match="unknown command"):
+        await backend.pipeline([("SET", "a", "1"), ("NOPE",), ("SET", "b", "2")])
+
+    assert await backend.mget(["a", "b"]) == [b"1", b"2"]
+    assert len(backend._idle) == 1
+    await backend.close()
+
+
+async def test_redis_error_reply_raises(redis_server):
+    backend = RedisCacheBackend(redis_server.url.replace("secret", "wrong"))
+
+    with pytest.raises(CacheError):
+        await backend.get("a")
+
+
+async def test_rejected_auth_does_not_poison_the_pool(redis_server):
+    backend = RedisCacheBackend(redis_server.url.replace("secret", "wrong"))
+
+    for _ in range(2):
+        with pytest.raises(CacheError, match="WRONGPASS|invalid"):
+            await backend.get("a")
+
+    assert backend._idle == []
+
+
+async def test_unreachable_backend_degrades_to_miss():
+    backend = RedisCacheBackend("redis://127.0.0.1:1/0", timeout=0.1)
+    cache = Cache(backend)
+
+    # the application still starts
+    await cache.connect()
+
+    await cache.set("a", b"1")
+    assert await cache.get("a") is None
+    assert await cache.mget(["a"]) == [None]
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from src.libs.dataloader import DataLoader
+
+
+def _recording_loader(**kwargs) -> tuple[DataLoader, list[list[int]]]:
+    batches = []
+
+    async def batch_fn(keys):
+        batches.append(keys)
+        await asyncio.sleep(0)
+        return {key: key * 10 for key in keys if key > 0}
+
+    return DataLoader(batch_fn, **kwargs), batches
+
+
+async def test_concurrent_loads_are_batched_and_deduplicated():
+    loader, batches = _recording_loader()
+
+    results = await asyncio.gather(*(loader.load(key) for key in (1, 2, 1, -1, 2)))
+
+    assert results == [10, 20, 10, None, 20]
+    assert batches == [[1, 2, -1]]
+    stats = loader.stats()
+    assert (stats.loads, stats.coalesced, stats.batches, stats.keys) == (5, 2, 1, 3)
+
+
+async def test_loads_join_a_running_batch():
+    loader, batches = _recording_loader()
+
+    first = asyncio.create_task(loader.load(1))
+    await asyncio.sleep(0)  # the batch is sent and waits on the "database"
+    assert await asyncio.gather(loader.load(1), first) == [10, 10]
+
+    assert batches == [[1]]
+
+
+async def test_window_and_max_batch_size():
+    loader, batches = _recording_loader(window=0.01, max_batch_size=2)
+
+    first = asyncio.create_task(loader.load(1))
+    await asyncio.sleep(0)
+    late = asyncio.create_task(loader.load(2))  # still within the window
+    assert await asyncio.gather(first, late, loader.load(3)) == [10, 20, 30]
+
+    assert batches == [[1, 2], [3]]
+
+
+async def test_batch_errors_reach_every_caller():
+    async def batch_fn(keys):
+        raise RuntimeError("database down")
+
+    loader = DataLoader(batch_fn)
+
+    results = await asyncio.gather(
+        loader.load(1), loader.load(2), return_exceptions=True
+    )
+
+    assert [str(result) for result in results] == ["database down"] * 2
+
+
+async def test_cancelled_caller_does_not_cancel_the_batch():
+    loader, batches = _recording_loader(window=0.01)
+
+    first = asyncio.create_task(loader.load(1))
+    second = asyncio.create_task(loader.load(1))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == 10
+    with pytest.raises(asyncio.CancelledError):
+        await first
@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import exc
+
+from src.config.database.engine import DatabaseHelper
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+async def helper(tmp_path):
+    helper = DatabaseHelper(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        pool_size=2,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    yield helper
+    await helper.dispose()
+
+
+async def test_warm_up_fills_pool(helper):
+    """
+    Verifies that warm-up opens connections and returns them to the pool.
+    """
+    assert await helper.warm_up() == 2
+
+    stats = helper.pool_stats()
+    assert stats.checked_in == 2
+    assert stats.checked_out == 0
+    assert stats.checkouts == 2
+    # never more than the persistent connections
+    assert await helper.warm_up(10) == 2
+
+
+async def test_pool_stats_count_checkouts_and_timeouts(helper):
+    """
+    Verifies that checked out connections and exhausted pool waits are reported.
+    """
+    async with helper.engine.connect(), helper.engine.connect():
+        assert helper.pool_stats().checked_out == 2
+        with pytest.raises(exc.TimeoutError):
+            async with helper.engine.connect():
+                pass
+
+    stats = helper.pool_stats()
+    assert stats.checked_out == 0
+    assert stats.checkouts == 2
+    assert stats.timeouts == 1
+    assert stats.max_wait_seconds >= 0.05
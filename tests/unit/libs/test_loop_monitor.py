@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import time
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from prometheus_client import CollectorRegistry, Histogram
+
+from src.libs import loop_monitor
+from src.libs.loop_monitor import LoopMonitor, RequestTaskMiddleware
+
+
+class ListHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.messages: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
+
+@pytest.fixture
+def records():
+    handler = ListHandler()
+    loop_monitor.logger.addHandler(handler)
+    yield handler.messages
+    loop_monitor.logger.removeHandler(handler)
+
+
+def _lag() -> tuple[Histogram, CollectorRegistry]:
+    registry = CollectorRegistry()
+    return Histogram("loop_lag_seconds", "lag", registry=registry), registry
+
+
+def _hash_password_on_the_loop() -> None:
+    time.sleep(0.2)
+
+
+async def test_lag_is_measured():
+    lag, registry = _lag()
+    monitor = LoopMonitor(lag, interval=0.01)
+    monitor.start()
+    await asyncio.sleep(0.03)
+    time.sleep(0.1)
+    await asyncio.sleep(0.03)
+    await monitor.stop()
+
+    assert registry.get_sample_value("loop_lag_seconds_count") >= 2
+    assert registry.get_sample_value("loop_lag_seconds_sum") >= 0.08
+
+
+async def test_blocking_code_is_logged_with_its_request(records):
+    lag, _ = _lag()
+    monitor = LoopMonitor(lag, interval=0.01, block_threshold=0.05)
+
+    app = FastAPI()
+
+    @app.get("/users/{id}")
+    async def block(id: int):
+        _hash_password_on_the_loop()
+        return "done"
+
+    app.add_middleware(RequestTaskMiddleware, monitor=monitor)
+    monitor.start()
+    await asyncio.sleep(0.02)
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get("/users/7")
+    await monitor.stop()
+
+    assert response.json() == "done"
+    assert len(records) == 1
+    assert "Event loop blocked" in records[0]
+    assert "GET /users/{id}" in records[0]
+    assert "in _hash_password_on_the_loop" in records[0]
+    # the stack starts at the blocking task, not in the event loop
+    assert "base_events" not in records[0]
+    assert monitor.requests == {}
+
+
+async def test_watchdog_is_off_without_threshold(records):
+    lag, _ = _lag()
+    monitor = LoopMonitor(lag, interval=0.01)
+    monitor.start()
+    await asyncio.sleep(0.01)
+    time.sleep(0.1)
+    await monitor.stop()
+
+    assert records == []
@@ -0,0 +1,41 @@
+import time
+
+from src.libs.lru import LRUCache
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats().evictions == 1
+
+
+def test_expired_entries_are_misses():
+    cache = LRUCache(maxsize=10)
+    cache.set("past", 1, expires_at=time.time() - 1)
+    cache.set("ttl", 2, ttl=60, expires_at=time.time() - 1)
+    cache.set("live", 3, ttl=60)
+
+    assert cache.get("past") is None
+    assert cache.get("ttl") is None
+    assert cache.get("live") == 3
+
+    stats = cache.stats()
+    assert stats.hits == 1
+    assert stats.misses == 2
+    assert stats.expirations == 2
+    assert stats.hit_ratio == 1 / 3
+
+
+def test_zero_size_disables_cache():
+    cache = LRUCache(maxsize=0)
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
@@ -0,0 +1,190 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.libs.db_pool import InstrumentedAsyncPool
+from src.libs.exceptions import ServiceOverloaded
+from src.libs.admission import AdmissionController
+from src.libs.metrics import (
+    AdmissionMetrics,
+    CacheMetrics,
+    PoolMetrics,
+    WorkerPoolMetrics,
+    instrument_engine,
+    statement_kind,
+)
+from src.libs.lru import LRUCache
+from src.libs.worker_pool import WorkerPool
+
+# a worker process recording into the shared directory
+WORKER = """
+from prometheus_client import Counter
+Counter("logins_total", "Logins").inc({count})
+"""
+
+# the scraping process, reads every worker's files
+SCRAPE = """
+import sys
+from src.libs.metrics import render
+sys.stdout.write(render()[0].decode())
+"""
+
+
+def test_statement_kind():
+    assert statement_kind("  select 1") == "SELECT"
+    assert statement_kind("INSERT INTO users") == "INSERT"
+    assert statement_kind("WITH x AS (SELECT 1) SELECT * FROM x") == "OTHER"
+
+
+async def test_instrument_engine_times_statements():
+    registry = CollectorRegistry()
+    latency = Histogram(
+        "query_seconds", "q", ["database", "statement"], registry=registry
+    )
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    instrument_engine(engine, latency, "primary")
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        await conn.execute(text("SELECT 2"))
+    await engine.dispose()
+
+    labels = {"database": "primary", "statement": "SELECT"}
+    assert registry.get_sample_value("query_seconds_count", labels) == 2
+
+
+async def test_pool_metrics_report_deltas_and_survive_resets():
+    registry = CollectorRegistry()
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:", poolclass=InstrumentedAsyncPool, pool_size=2
+    )
+    pool_metrics = PoolMetrics(
+        lambda: {"primary": engine},
+        connections=Gauge("conn", "c", ["database", "state"], registry=registry),
+        checkouts=Counter("checkouts", "c", ["database"], registry=registry),
+        timeouts=Counter("timeouts", "c", ["database"], registry=registry),
+        wait=Counter("wait", "c", ["database"], registry=registry),
+    )
+
+    async with engine.connect():
+        pool_metrics.sync()
+        assert (
+            registry.get_sample_value(
+                "conn", {"database": "primary", "state": "checked_out"}
+            )
+            == 1
+        )
+    async with engine.connect():
+        pass
+    pool_metrics.sync()
+    pool_metrics.sync()
+    assert registry.get_sample_value("checkouts_total", {"database": "primary"}) == 2
+
+    await engine.dispose()  # a new pool, counting from zero
+    async with engine.connect():
+        pass
+    pool_metrics.sync()
+    assert registry.get_sample_value("checkouts_total", {"database": "primary"}) == 3
+    await engine.dispose()
+
+
+async def test_admission_metrics_report_deltas():
+    registry = CollectorRegistry()
+    controller = AdmissionController(max_concurrency=1, max_queue=0, max_wait=1)
+    admission_metrics = AdmissionMetrics(
+        active=Gauge("active", "a", ["controller"], registry=registry),
+        waiting=Gauge("waiting", "w", ["controller"], registry=registry),
+        admitted=Counter("admitted", "a", ["controller"], registry=registry),
+        queued=Counter("queued", "q", ["controller"], registry=registry),
+        shed=Counter("shed", "s", ["controller"], registry=registry),
+    )
+    admission_metrics.add("password", controller)
+    labels = {"controller": "password"}
+
+    async with controller.admit():
+        with pytest.raises(ServiceOverloaded):
+            async with controller.admit():
+                pass
+        admission_metrics.sync()
+        assert registry.get_sample_value("active", labels) == 1
+    admission_metrics.sync()
+    admission_metrics.sync()
+
+    assert registry.get_sample_value("active", labels) == 0
+    assert registry.get_sample_value("admitted_total", labels) == 1
+    assert registry.get_sample_value("shed_total", labels) == 1
+    assert registry.get_sample_value("queued_total", labels) == 0
+
+
+async def test_worker_pool_metrics_report_deltas():
+    registry = CollectorRegistry()
+    pool = WorkerPool("thread", max_workers=1)
+    worker_pool_metrics = WorkerPoolMetrics(
+        in_flight=Gauge("in_flight", "i", ["pool"], registry=registry),
+        queued=Gauge("queued", "q", ["pool"], registry=registry),
+        completed=Counter("calls", "c", ["pool"], registry=registry),
+        wait=Counter("wait", "w", ["pool"], registry=registry),
+    )
+    worker_pool_metrics.add("password", pool)
+    labels = {"pool": "password"}
+
+    await asyncio.gather(*(pool.run(time.sleep, 0.01) for _ in range(3)))
+    worker_pool_metrics.sync()
+    worker_pool_metrics.sync()
+    pool.shutdown()
+
+    assert registry.get_sample_value("in_flight", labels) == 0
+    assert registry.get_sample_value("calls_total", labels) == 3
+    # the last two calls queued behind the first
+    assert registry.get_sample_value("wait_total", labels) >= 0.02
+
+
+def test_cache_metrics_report_deltas():
+    registry = CollectorRegistry()
+    cache = LRUCache(1)
+    cache_metrics = CacheMetrics(
+        entries=Gauge("entries", "e", ["cache"], registry=registry),
+        hits=Counter("hits", "h", ["cache"], registry=registry),
+        misses=Counter("misses", "m", ["cache"], registry=registry),
+        evictions=Counter("evictions", "e", ["cache"], registry=registry),
+        expirations=Counter("expirations", "e", ["cache"], registry=registry),
+    )
+    cache_metrics.add("user", cache.stats)
+    labels = {"cache": "user"}
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.get("b")
+    cache_metrics.sync()
+    cache_metrics.sync()
+
+    assert registry.get_sample_value("entries", labels) == 1
+    assert registry.get_sample_value("hits_total", labels) == 1
+    assert registry.get_sample_value("misses_total", labels) == 1
+    assert registry.get_sample_value("evictions_total", labels) == 1
+
+
+def test_workers_are_aggregated(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    for count in (2, 3):
+        subprocess.run(
+            [sys.executable, "-c", WORKER.format(count=count)], env=env, check=True
+        )
+
+    scraped = subprocess.run(
+        [sys.executable, "-c", SCRAPE],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+    assert "logins_total 5.0" in scraped
@@ -0,0 +1,51 @@
+from datetime import date, datetime, timedelta
+
+from alembic.script import ScriptDirectory
+
+from src.auth.service.session_reaper import session_reapers
+from src.libs.partitions import DailyRangePartitions, partition_days
+
+TODAY = date(2026, 3, 30)
+
+
+def test_partition_days_cover_the_horizon():
+    days = partition_days(TODAY, timedelta(days=30, hours=1))
+
+    assert days[0] == TODAY
+    assert days[-1] == date(2026, 4, 29)
+    assert len(days) == 31
+
+
+def test_partition_days_reach_the_latest_stored_value():
+    latest = datetime(2026, 5, 2, 23, 59)
+
+    assert partition_days(TODAY, timedelta(days=2), latest)[-1] == date(2026, 5, 2)
+    # an older latest value never shortens the horizon
+    assert partition_days(TODAY, timedelta(days=2), datetime(2026, 1, 1))[-1] == date(
+        2026, 4, 1
+    )
+
+
+def test_migration_partitions_like_the_reaper():
+    """
+    Verifies that the partitioning migration, which cannot import the
+    settings, creates the window the session reaper keeps with the defaults.
+    """
+    migration = ScriptDirectory("migrations").get_revision("b7d41c2e9f03").module
+    latest = datetime(2026, 5, 2, 23, 59)
+
+    assert migration.HORIZON == session_reapers[0].partition_horizon
+    assert migration._partition_days(TODAY, latest) == partition_days(
+        TODAY, migration.HORIZON, latest
+    )
+    assert migration._partition_days(TODAY, None) == partition_days(
+        TODAY, migration.HORIZON
+    )
+
+
+def test_partition_names_and_bounds():
+    partition = DailyRangePartitions("user_sessions", "expires_at").partition_for(TODAY)
+
+    assert partition.name == "user_sessions_p20260330"
+    assert partition.lower == datetime(2026, 3, 30)
+    assert partition.upper == datetime(2026, 3, 31)
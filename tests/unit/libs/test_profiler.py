@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from src.libs.profiler import ProfilerMiddleware, SamplingProfiler, sign, verify
+
+
+def _busy(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _app(tmp_path, **kwargs) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work():
+        _busy(0.05)
+        await asyncio.sleep(0.05)
+        return {"done": True}
+
+    app.add_middleware(
+        ProfilerMiddleware, directory=str(tmp_path), interval=0.001, **kwargs
+    )
+    return app
+
+
+async def _get(app: FastAPI, url: str, **kwargs):
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        return await client.get(url, **kwargs)
+
+
+def test_signatures_are_bound_to_request_and_expiry():
+    expires = int(time.time()) + 60
+    token = sign("key", "GET", "/work", expires)
+
+    assert verify(token, ["other", "key"], "GET", "/work")
+    assert not verify(token, ["other"], "GET", "/work")
+    assert not verify(token, ["key"], "POST", "/work")
+    assert not verify(
+        sign("key", "GET", "/work", int(time.time()) - 1), ["key"], "GET", "/work"
+    )
+    assert not verify("garbage", ["key"], "GET", "/work")
+
+
+async def test_profiler_samples_running_and_waiting_stacks():
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    _busy(0.05)
+    await asyncio.sleep(0.05)
+    profiler.stop()
+
+    stacks = profiler.samples
+    assert any(stack.endswith(":_busy") for stack in stacks)
+    assert any(stack.endswith("<waiting>") for stack in stacks)
+    # event loop frames are cut, stacks start at the task's coroutine
+    assert not any("asyncio.events" in stack for stack in stacks)
+
+
+async def test_signed_requests_are_profiled(tmp_path):
+    app = _app(tmp_path, keys=["key"])
+    token = sign("key", "GET", "/work", int(time.time()) + 60)
+
+    response = await _get(app, "/work", headers={"X-Profile": token})
+
+    assert response.json() == {"done": True}
+    lines = (tmp_path / response.headers["x-profile"]).read_text().splitlines()
+    assert any(".work;test_profiler:_busy " in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+async def test_unsigned_requests_are_profiled_in_debug_only(tmp_path):
+    response = await _get(_app(tmp_path, keys=["key"]), "/work?profile=1")
+    assert "x-profile" not in response.headers
+    assert list(tmp_path.iterdir()) == []
+
+    response = await _get(_app(tmp_path, allow_unsigned=True), "/work?profile=1")
+    assert (tmp_path / response.headers["x-profile"]).exists()
@@ -0,0 +1,94 @@
+import logging
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from src.libs import query_stats
+from src.libs.query_stats import (
+    QueryStatsMiddleware,
+    instrument_queries,
+    parameter_shape,
+    track_queries,
+)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.messages: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
+
+@pytest.fixture
+def records():
+    # the slow query logger propagates to the module logger
+    handler = ListHandler()
+    query_stats.logger.addHandler(handler)
+    yield handler.messages
+    query_stats.logger.removeHandler(handler)
+
+
+@pytest.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    yield engine
+    await engine.dispose()
+
+
+def test_parameter_shape_hides_values():
+    assert parameter_shape({"value": "secret", "id": 1}) == "{value: str, id: int}"
+    assert parameter_shape(tuple(range(500)) + ("x",)) == "(int*500, str)"
+    assert parameter_shape([("a", 1), ("b", 2)]) == "2 x (str, int)"
+
+
+async def test_queries_are_counted_per_context(engine):
+    instrument_queries(engine, slow_threshold=None)
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))  # outside of any tracked block
+        with track_queries() as stats:
+            for i in range(3):
+                await conn.execute(text("SELECT :i"), {"i": i})
+
+    assert stats.count == 3
+    assert stats.total_seconds > 0
+    assert stats.repeated(2) == [("SELECT ?", 3)]
+    assert stats.repeated(3) == []
+
+
+async def test_slow_queries_are_logged_without_values(engine, records):
+    instrument_queries(engine, slow_threshold=0)
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT :password"), {"password": "hunter2"})
+
+    assert len(records) == 1
+    assert "SELECT ?" in records[0] and "(str)" in records[0]
+    assert "hunter2" not in records[0]
+
+
+async def test_middleware_flags_repeated_queries(engine, records):
+    instrument_queries(engine, slow_threshold=None)
+
+    async def endpoint(request):
+        async with engine.connect() as conn:
+            for i in range(4):
+                await conn.execute(text("SELECT :i"), {"i": i})
+        return PlainTextResponse("ok")
+
+    app = QueryStatsMiddleware(
+        Starlette(routes=[Route("/items", endpoint)]), repeat_threshold=3
+    )
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        await client.get("/items")
+
+    assert any("ran the same query 4 times" in message for message in records)
@@ -0,0 +1,142 @@
+import pytest
+from sqlalchemy import event, insert, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.auth.entities import UserEntity
+from src.auth.models.user import UserModel
+from src.auth.repositories.user import UserRepository
+from src.libs.base_model import Base
+from src.libs.replicas import ReplicaSet, RoutingSession
+from src.libs.unit_of_work import commit
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+async def engines(tmp_path):
+    primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    for engine, name in ((primary, "primary"), (replica, "replica")):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(
+                insert(UserModel).values(
+                    id=1,
+                    name=name,
+                    login="shared",
+                    email="shared@test.com",
+                    password="pw",
+                )
+            )
+    yield primary, replica
+    await primary.dispose()
+    await replica.dispose()
+
+
+def _session_factory(primary, replicas: ReplicaSet):
+    return async_sessionmaker(
+        bind=primary,
+        sync_session_class=RoutingSession,
+        replicas=replicas,
+        expire_on_commit=False,
+    )
+
+
+async def test_reads_go_to_replica_until_the_session_writes(engines):
+    """
+    Verifies read routing and that writes pin the session to the primary.
+    """
+    primary, replica = engines
+    async with _session_factory(primary, ReplicaSet([replica]))() as session:
+        repo = UserRepository(session)
+        assert [user.name for user in await repo.get_list()] == ["replica"]
+
+        await repo.create(
+            UserEntity(name="New", login="new", email="new@test.com", password="pw")
+        )
+
+        assert [user.name for user in await repo.get_list()] == ["primary", "New"]
+
+
+async def test_replica_miss_is_read_from_primary(engines):
+    """
+    Verifies that rows not replicated yet are found on the primary.
+    """
+    primary, replica = engines
+    async with primary.begin() as conn:
+        await conn.execute(
+            insert(UserModel).values(
+                id=2, name="fresh", login="fresh", email="fresh@test.com", password="pw"
+            )
+        )
+
+    async with _session_factory(primary, ReplicaSet([replica]))() as session:
+        assert (await UserRepository(session).get(2)).name == "fresh"
+
+
+async def test_unhealthy_replicas_are_skipped(engines, tmp_path):
+    """
+    Verifies round-robin over healthy replicas and the primary fallback.
+    """
+    primary, replica = engines
+    broken = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}"
+    )
+    replicas = ReplicaSet([replica, broken])
+    assert {replicas.choose(), replicas.choose()} == {replica, broken}
+
+    assert await replicas.check() == [True, False]
+    assert [replicas.choose(), replicas.choose()] == [replica, replica]
+
+    replicas.mark_down(replica)
+    assert replicas.choose() is None
+    async with _session_factory(primary, replicas)() as session:
+        assert (await UserRepository(session).get(1)).name == "primary"
+    await broken.dispose()
+
+
+async def test_unreachable_replica_is_marked_down(engines, tmp_path):
+    """
+    Verifies that a replica failing to connect is taken out of rotation and
+    the read is served by the primary.
+    """
+    primary, _ = engines
+    broken = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}"
+    )
+    replicas = ReplicaSet([broken])
+    async with _session_factory(primary, replicas)() as session:
+        assert (await UserRepository(session).get(1)).name == "primary"
+        assert [user.name for user in await UserRepository(session).get_list()] == [
+            "primary"
+        ]
+        await commit(session)
+
+    assert replicas.healthy() == []
+    await broken.dispose()
+
+
+async def test_lost_replica_connection_is_retried_on_primary(engines):
+    """
+    Verifies that a select losing its replica connection is re-run on the
+    primary and leaves the session committable, while other errors are raised.
+    """
+    primary, replica = engines
+    async with replica.begin() as conn:
+        await conn.execute(text("DROP TABLE users"))
+
+    replicas = ReplicaSet([replica])
+    async with _session_factory(primary, replicas)() as session:
+        with pytest.raises(OperationalError):
+            await UserRepository(session).get(1)
+    assert replicas.healthy() == [replica]
+
+    @event.listens_for(replica.sync_engine, "handle_error")
+    def disconnect(context):
+        context.is_disconnect = True
+
+    async with _session_factory(primary, replicas)() as session:
+        assert (await UserRepository(session).get(1)).name == "primary"
+        await commit(session)
+    assert replicas.healthy() == []
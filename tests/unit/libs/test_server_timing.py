@@ -0,0 +1,77 @@
+import asyncio
+
+from fastapi import APIRouter, FastAPI
+from httpx import ASGITransport, AsyncClient
+from pydantic import BaseModel
+
+from src.libs import server_timing
+from src.libs.server_timing import (
+    ServerTiming,
+    ServerTimingMiddleware,
+    ServerTimingRoute,
+    record,
+    timed,
+)
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+
+
+def _app() -> FastAPI:
+    router = APIRouter(route_class=ServerTimingRoute)
+
+    @router.get("/items/{item_id}")
+    async def get_item(item_id: int) -> Item:
+        with timed("password"):
+            await asyncio.sleep(0.01)
+        record("db", 0.002)
+        record("db", 0.003)
+        return Item(id=item_id, name="item")
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(ServerTimingMiddleware)
+    return app
+
+
+def _phases(header: str) -> dict[str, str]:
+    return {metric.split(";", 1)[0]: metric for metric in header.split(", ")}
+
+
+async def test_header_reports_the_phases_of_the_request():
+    app = _app()
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get("/items/7")
+
+    assert response.json() == {"id": 7, "name": "item"}
+    phases = _phases(response.headers["server-timing"])
+    assert list(phases) == ["password", "db", "serialize", "total"]
+    assert float(phases["password"].split("dur=")[1]) >= 10
+    assert phases["db"] == 'db;dur=5.00;desc="2 calls"'
+
+
+def test_route_keeps_the_endpoint_signature():
+    schema = _app().openapi()["paths"]["/items/{item_id}"]["get"]
+
+    assert schema["parameters"][0]["name"] == "item_id"
+    assert schema["responses"]["200"]["content"]["application/json"]["schema"] == {
+        "$ref": "#/components/schemas/Item"
+    }
+
+
+def test_timing_outside_of_a_request_is_a_no_op():
+    with timed("password"):
+        record("db", 1.0)
+
+    assert server_timing.current_timing() is None
+
+
+def test_header_format():
+    timing = ServerTiming()
+    timing.add("jwt_encode", 0.0004)
+
+    assert timing.header(total=0.0125) == "jwt_encode;dur=0.40, total;dur=12.50"
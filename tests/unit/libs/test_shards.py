@@ -0,0 +1,48 @@
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.auth.models.user import UserModel
+from src.libs.base_model import Base
+from src.libs.shards import ShardRouter, next_user_id
+
+
+def test_router_maps_ids_and_keys():
+    """
+    Verifies the stride id mapping and that key hashing is stable and spread.
+    """
+    router = ShardRouter([object(), object(), object()])
+
+    assert [router.shard_for_user(user_id) for user_id in range(1, 7)] == [
+        0,
+        1,
+        2,
+        0,
+        1,
+        2,
+    ]
+    assert router.shard_for_key("alice") == ShardRouter([None] * 3).shard_for_key(
+        "alice"
+    )
+    assert {router.shard_for_key(f"user{i}") for i in range(50)} == {0, 1, 2}
+    assert not ShardRouter([object()]).enabled
+
+
+async def test_next_user_id_keeps_the_shard_residue():
+    """
+    Verifies that ids allocated without sequences map back to their shard.
+    """
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    router = ShardRouter([engine, engine, engine])
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        table = UserModel.__table__
+
+        assert await next_user_id(conn, table, 1, 3) == 2
+        await conn.execute(
+            insert(table).values(id=7, name="n", login="l", email="e", password="p")
+        )
+        for shard in router.shards():
+            user_id = await next_user_id(conn, table, shard, 3)
+            assert user_id > 7
+            assert router.shard_for_user(user_id) == shard
+    await engine.dispose()
@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from src.auth.dto import BaseUserDTO, SessionDTO
+from src.libs.trusted import construct_trusted
+
+
+def test_construct_trusted_equals_validated():
+    """
+    Verifies that trusted construction yields the same model as validation.
+    """
+    values = {
+        "id": 1,
+        "name": "Test",
+        "login": "test",
+        "email": "test@example.com",
+        "password": "hash",
+    }
+
+    user = construct_trusted(BaseUserDTO, dict(values))
+
+    assert user == BaseUserDTO(**values)
+    assert user.model_fields_set == set(values)
+    assert user.model_dump() == values
+
+
+def test_construct_trusted_skips_validation():
+    """
+    Verifies that values are stored as given, without coercion.
+    """
+    session = construct_trusted(
+        SessionDTO,
+        {
+            "id": 1,
+            "user_id": 2,
+            "refresh_token_jti": "jti",
+            "expires_at": datetime(2030, 1, 1),
+            "created_at": "not a datetime",
+            "user_agent": None,
+            "ip_address": None,
+        },
+    )
+
+    assert session.created_at == "not a datetime"
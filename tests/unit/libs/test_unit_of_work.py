@@ -0,0 +1,43 @@
+import pytest
+
+from src.libs.unit_of_work import after_commit, unit_of_work
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_after_commit_callbacks_run_on_commit(db_session):
+    """
+    Verifies that sync and async callbacks run once, after the commit.
+    """
+    calls = []
+
+    async def async_callback():
+        calls.append("async")
+
+    async with unit_of_work(db_session):
+        after_commit(db_session, lambda: calls.append("sync"))
+        after_commit(db_session, async_callback)
+        assert calls == []
+
+    assert calls == ["sync", "async"]
+
+    async with unit_of_work(db_session):
+        pass
+    assert calls == ["sync", "async"]
+
+
+async def test_after_commit_callbacks_dropped_on_rollback(db_session):
+    """
+    Verifies that callbacks of a rolled back unit of work never run.
+    """
+    calls = []
+
+    with pytest.raises(ValueError):
+        async with unit_of_work(db_session):
+            after_commit(db_session, lambda: calls.append("rolled back"))
+            raise ValueError
+
+    async with unit_of_work(db_session):
+        pass
+
+    assert calls == []
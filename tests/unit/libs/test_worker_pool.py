@@ -0,0 +1,43 @@
+import asyncio
+import time
+
+from src.libs.worker_pool import WorkerPool
+
+
+async def test_run_returns_result_and_records_stats():
+    pool = WorkerPool(kind="thread", max_workers=2)
+    try:
+        assert await pool.run(pow, 2, 10) == 1024
+
+        stats = pool.stats()
+        assert stats.completed == 1
+        assert stats.in_flight == 0
+        assert stats.queued == 0
+    finally:
+        pool.shutdown()
+
+
+async def test_saturated_pool_reports_queue_and_wait():
+    pool = WorkerPool(kind="thread", max_workers=1)
+    try:
+        tasks = [asyncio.create_task(pool.run(time.sleep, 0.05)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+
+        stats = pool.stats()
+        assert stats.in_flight == 3
+        assert stats.queued == 2
+
+        await asyncio.gather(*tasks)
+        stats = pool.stats()
+        assert stats.completed == 3
+        assert stats.max_wait_seconds >= 0.05
+    finally:
+        pool.shutdown()
+
+
+async def test_process_pool():
+    pool = WorkerPool(kind="process", max_workers=1)
+    try:
+        assert await pool.run(pow, 3, 3) == 27
+    finally:
+        pool.shutdown()
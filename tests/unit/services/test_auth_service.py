@@ -2,12 +2,18 @@ import pytest
 from unittest.mock import AsyncMock
 from src.auth.service.auth import AuthService
 from src.auth.service.password import PasswordService
-from src.auth.dto import LoginDTO, TokenDTO
+from src.auth.dto import (
+    LoginDTO,
+    UserSessionInfoDTO,
+    AccessTokenDTO,
+    RefreshTokenDTO,
+    FindUserDTO,
+)
 from src.auth.exceptions.auth import CredentialsException
 from src.auth.dependencies.user.service import IUserService
 from src.auth.dependencies.token.service import ITokenService
+from src.auth.dependencies.session.service import ISessionService
 
-# UPDATE IMPORT
 from tests.factories import BaseUserDTOFactory
 
 pytestmark = pytest.mark.asyncio
@@ -17,25 +23,32 @@ async def test_login_success(mocker):
     # Arrange
     mock_user_service = AsyncMock(spec=IUserService)
     mock_token_service = AsyncMock(spec=ITokenService)
+    mock_session_service = AsyncMock(spec=ISessionService)
 
     user_dto = BaseUserDTOFactory.build(
-        password=PasswordService.get_password_hash("secret")
+        id=1, password=PasswordService.get_password_hash("secret")
     )
     mock_user_service.find.return_value = user_dto
 
-    expected_tokens = TokenDTO(
-        access_token="acc", refresh_token="ref", token_type="bearer"
+    mock_token_service.generate_access_token.return_value = AccessTokenDTO(token="acc")
+    mock_token_service.generate_refresh_token.return_value = RefreshTokenDTO(
+        token="ref", jti="jti", expire="2030-01-01T00:00:00"
     )
-    mock_token_service.create_tokens.return_value = expected_tokens
 
-    service = AuthService(mock_user_service, mock_token_service)
+    service = AuthService(mock_user_service, mock_token_service, mock_session_service)
     login_dto = LoginDTO(login=user_dto.login, password="secret")
 
     # Act
-    result = await service.login(login_dto)
+    result = await service.login(login_dto, UserSessionInfoDTO())
 
     # Assert
-    assert result == expected_tokens
+    assert result.access_token == "acc"
+    assert result.refresh_token == "ref"
+    mock_session_service.create.assert_awaited_once()
+    # the user cache holds no password hashes
+    mock_user_service.find.assert_awaited_once_with(
+        FindUserDTO(login=user_dto.login), with_password=True
+    )
 
 
 async def test_login_wrong_password_raises_exception(mocker):
@@ -43,26 +56,49 @@ async def test_login_wrong_password_raises_exception(mocker):
     mock_user_service = AsyncMock(spec=IUserService)
     mock_token_service = AsyncMock(spec=ITokenService)
 
-    # FIX: Use BaseUserDTOFactory
     user_dto = BaseUserDTOFactory.build(
         password=PasswordService.get_password_hash("correct_password")
     )
     mock_user_service.find.return_value = user_dto
 
-    service = AuthService(mock_user_service, mock_token_service)
+    service = AuthService(mock_user_service, mock_token_service, AsyncMock())
     login_dto = LoginDTO(login=user_dto.login, password="wrong_password")
 
     # Act & Assert
     with pytest.raises(CredentialsException):
-        await service.login(login_dto)
+        await service.login(login_dto, UserSessionInfoDTO())
 
 
 async def test_login_user_not_found(mocker):
     mock_user_service = AsyncMock(spec=IUserService)
     mock_user_service.find.return_value = None
 
-    service = AuthService(mock_user_service, AsyncMock())
+    service = AuthService(mock_user_service, AsyncMock(), AsyncMock())
     login_dto = LoginDTO(login="ghost", password="pw")
 
     with pytest.raises(CredentialsException):
-        await service.login(login_dto)
+        await service.login(login_dto, UserSessionInfoDTO())
+
+
+async def test_login_rehashes_stale_password(mocker):
+    mock_user_service = AsyncMock(spec=IUserService)
+    mock_token_service = AsyncMock(spec=ITokenService)
+
+    user_dto = BaseUserDTOFactory.build(id=7, password="stale_hash")
+    mock_user_service.find.return_value = user_dto
+    mock_token_service.generate_access_token.return_value = AccessTokenDTO(token="acc")
+    mock_token_service.generate_refresh_token.return_value = RefreshTokenDTO(
+        token="ref", jti="jti", expire="2030-01-01T00:00:00"
+    )
+    mocker.patch.object(
+        PasswordService,
+        "averify_and_update",
+        AsyncMock(return_value=(True, "new_hash")),
+    )
+
+    service = AuthService(mock_user_service, mock_token_service, AsyncMock())
+    await service.login(
+        LoginDTO(login=user_dto.login, password="secret"), UserSessionInfoDTO()
+    )
+
+    mock_user_service.update_password_hash.assert_awaited_once_with(7, "new_hash")
@@ -1,4 +1,15 @@
+from prometheus_client import REGISTRY
+
+from src.auth.service.hashers import Argon2Hasher, BcryptHasher
 from src.auth.service.password import PasswordService
+from src.libs.worker_pool import WorkerPool
+
+
+def count(operation: str) -> float:
+    labels = {"operation": operation}
+    return (
+        REGISTRY.get_sample_value("password_hash_duration_seconds_count", labels) or 0
+    )
 
 
 def test_hashing_consistency():
@@ -21,3 +32,66 @@ def test_hashing_randomness():
     hash2 = PasswordService.get_password_hash(pwd)
 
     assert hash1 != hash2
+
+
+async def test_async_hashing_consistency():
+    """Verify async helpers produce and check hashes through the worker pool."""
+    hashed = await PasswordService.ahash("super_secret")
+
+    assert await PasswordService.averify("super_secret", hashed) is True
+    assert await PasswordService.averify("wrong_password", hashed) is False
+
+
+async def test_hashing_in_a_process_pool_is_timed(mocker):
+    """Verify hashing durations are recorded by the caller, not the worker process."""
+    pool = WorkerPool("process", max_workers=1)
+    mocker.patch("src.auth.service.password.password_pool", pool)
+
+    hashes, verifies = count("hash"), count("verify")
+    try:
+        hashed = await PasswordService.ahash("secret")
+        assert await PasswordService.averify("secret", hashed) is True
+    finally:
+        pool.shutdown()
+
+    assert count("hash") == hashes + 1
+    assert count("verify") == verifies + 1
+
+
+def test_verifies_hashes_of_other_schemes(mocker):
+    """Verify legacy hashes still verify and are flagged for rehash."""
+    mocker.patch("src.auth.service.password.default_hasher", Argon2Hasher(1, 1024, 1))
+    legacy_hash = BcryptHasher(rounds=4).hash("secret")
+
+    assert PasswordService.verify_password("secret", legacy_hash) is True
+    assert PasswordService.needs_rehash(legacy_hash) is True
+
+    verified, new_hash = PasswordService.verify_and_update("secret", legacy_hash)
+    assert verified is True
+    assert new_hash.startswith("$argon2id$")
+    assert PasswordService.needs_rehash(new_hash) is False
+
+
+def test_stale_cost_parameters_trigger_rehash(mocker):
+    """Verify hashes with outdated cost parameters are upgraded."""
+    mocker.patch("src.auth.service.password.default_hasher", Argon2Hasher(2, 1024, 1))
+    stale_hash = Argon2Hasher(1, 1024, 1).hash("secret")
+
+    assert PasswordService.verify_and_update("wrong", stale_hash) == (False, None)
+    verified, new_hash = PasswordService.verify_and_update("secret", stale_hash)
+    assert verified is True
+    assert "t=2" in new_hash
+
+
+async def test_rehashing_verifies_are_timed_apart(mocker):
+    """Verify verifies that also rehash are recorded under their own label."""
+    mocker.patch("src.auth.service.password.default_hasher", Argon2Hasher(1, 1024, 1))
+    legacy_hash = BcryptHasher(rounds=4).hash("secret")
+    verifies, rehashes = count("verify"), count("verify_rehash")
+
+    verified, new_hash = await PasswordService.averify_and_update("secret", legacy_hash)
+    assert verified is True
+    assert await PasswordService.averify_and_update("secret", new_hash) == (True, None)
+
+    assert count("verify_rehash") == rehashes + 1
+    assert count("verify") == verifies + 1
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.auth.entities import SessionEntity, UserEntity
+from src.auth.repositories.session import SessionRepository
+from src.auth.repositories.user import UserRepository
+from src.auth.service.session_reaper import SessionReaper
+from tests.factories import fake_jti
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _seed(db_session, expired: int, active: int) -> SessionRepository:
+    user = await UserRepository(db_session).create(
+        UserEntity(name="Owner", login="owner", email="owner@test.com", password="pw")
+    )
+    repo = SessionRepository(db_session)
+    for i in range(expired + active):
+        offset = timedelta(hours=-1) if i < expired else timedelta(hours=1)
+        await repo.create(
+            SessionEntity(
+                user_id=user.id,
+                refresh_token_jti=fake_jti(f"{i}"),
+                expires_at=datetime.now() + offset,
+                user_agent=None,
+                ip_address=None,
+            )
+        )
+    return repo
+
+
+def _reaper(db_session, batch_size: int, max_batches: int = 100) -> SessionReaper:
+    return SessionReaper(
+        engine=db_session.bind,
+        interval=60,
+        batch_size=batch_size,
+        batch_pause=0,
+        max_batches=max_batches,
+    )
+
+
+async def test_reap_once_deletes_expired_in_batches(db_session):
+    """
+    Verifies that a run deletes all expired sessions batch by batch.
+    """
+    repo = await _seed(db_session, expired=5, active=2)
+    reaper = _reaper(db_session, batch_size=2)
+
+    result = await reaper.reap_once()
+
+    assert result.reaped == 5
+    assert result.batches == 3
+    assert not result.skipped
+    assert reaper.total_reaped == 5
+    assert reaper.last_result == result
+    assert await repo.get_by_jti(fake_jti("5")) is not None
+
+
+async def test_reap_once_stops_after_max_batches(db_session):
+    """
+    Verifies that a run leaves the rest for the next run after `max_batches`.
+    """
+    await _seed(db_session, expired=5, active=0)
+    reaper = _reaper(db_session, batch_size=2, max_batches=1)
+
+    assert (await reaper.reap_once()).reaped == 2
+    assert (await reaper.reap_once()).reaped == 2
+    assert reaper.total_reaped == 4
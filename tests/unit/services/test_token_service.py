@@ -22,13 +22,29 @@ async def test_generate_access_token_structure(token_service):
 
     # Manually decode to check payload without verification first
     payload = jwt.decode(
-        token, security_settings.secret_key, algorithms=[security_settings.algorithm]
+        token.token,
+        security_settings.secret_key,
+        algorithms=[security_settings.algorithm],
     )
 
     assert payload["token_type"] == "access"
-    assert payload["user"]["user_id"] == "123"
+    assert payload["sub"] == "123"
     assert "exp" in payload
     assert "iat" in payload
+    assert "login" not in payload
+
+
+async def test_generate_self_contained_access_token(token_service):
+    """Verify public user fields are embedded when the profile is enabled."""
+    token_service.embed_user = True
+    user_dto = UserDTO(id=123, name="Test", login="test", email="t@t.com")
+
+    token = await token_service.generate_access_token(user_dto)
+    payload = await token_service.verify_access_token(token.token)
+
+    assert payload["name"] == "Test"
+    assert payload["login"] == "test"
+    assert payload["email"] == "t@t.com"
 
 
 async def test_decode_valid_token(token_service):
@@ -36,8 +52,8 @@ async def test_decode_valid_token(token_service):
     user_dto = UserDTO(id=1, name="A", login="a", email="a@a.com")
     token = await token_service.generate_access_token(user_dto)
 
-    payload = await token_service.decode_token(token)
-    assert payload["user"]["user_id"] == "1"
+    payload = await token_service.decode_token(token.token)
+    assert payload["sub"] == "1"
 
 
 async def test_decode_expired_token(token_service, mocker):
@@ -61,6 +77,6 @@ async def test_verify_refresh_token_logic(token_service):
 
     # Try to pass it as a REFRESH token
     with pytest.raises(InvalidTokenError) as exc:
-        await token_service.verify_refresh_token(access_token)
+        await token_service.verify_refresh_token(access_token.token)
 
     assert "Expected 'refresh'" in str(exc.value)